@@ -0,0 +1,131 @@
+import time
+
+from kb_citations import source_uri
+
+# Stream event kinds, yielded by AgentStreamParser.stream() and used as callback names
+FIRST_CHUNK = 'first_chunk'
+CHUNK = 'chunk'
+CITATIONS = 'citations'
+DONE = 'done'
+
+def _reference_key(reference):
+    return source_uri(reference), reference.get('content', {}).get('text', '')
+
+class AgentStreamParser:
+    """Incremental parser for a Bedrock invoke_agent completion stream
+
+    Text chunks go into a list buffer (joined once at the end). Citations come from
+    chunk attributions, which Bedrock sends with or without enableTrace. Knowledge
+    base lookups and token usage in traces are only read when collect_traces is set.
+
+    callbacks: optional functions keyed by FIRST_CHUNK / CHUNK (text), CITATIONS
+    (newly added references) and DONE (result dict).
+    """
+
+    def __init__(self, callbacks=None, collect_traces=False, clock=time.monotonic):
+        self.callbacks = callbacks or {}
+        self.collect_traces = collect_traces
+        self.clock = clock
+        self.started_at = clock()
+        self.chunks = []
+        self.citations = []
+        self._seen = set()
+        self.trace_counts = {}
+        self.usage = {'input_tokens': 0, 'output_tokens': 0}
+        self.first_chunk_ms = None
+        self.done_ms = None
+
+    def _emit(self, kind, payload):
+        callback = self.callbacks.get(kind)
+        if callback:
+            callback(payload)
+        return kind, payload
+
+    def _add_references(self, references):
+        added = []
+        for reference in references:
+            key = _reference_key(reference)
+            if key not in self._seen:
+                self._seen.add(key)
+                added.append(reference)
+        self.citations.extend(added)
+        return added
+
+    def feed(self, event):
+        """Parse one stream event; returns the (kind, payload) pairs it produced"""
+        produced = []
+
+        chunk = event.get('chunk')
+        if chunk is not None:
+            data = chunk.get('bytes')
+            if data:
+                text = data.decode('utf-8')
+                if not self.chunks:
+                    self.first_chunk_ms = round((self.clock() - self.started_at) * 1000)
+                    produced.append(self._emit(FIRST_CHUNK, text))
+                self.chunks.append(text)
+                produced.append(self._emit(CHUNK, text))
+
+            attribution = chunk.get('attribution')
+            if attribution:
+                references = [ref for citation in attribution.get('citations', [])
+                              for ref in citation.get('retrievedReferences', [])]
+                added = self._add_references(references)
+                if added:
+                    produced.append(self._emit(CITATIONS, added))
+            return produced
+
+        if self.collect_traces and 'trace' in event:
+            trace = event['trace'].get('trace', {})
+            for trace_type, part in trace.items():
+                self.trace_counts[trace_type] = self.trace_counts.get(trace_type, 0) + 1
+                # Model calls (pre-processing, orchestration steps, post-processing) report tokens
+                if isinstance(part, dict) and 'modelInvocationOutput' in part:
+                    usage = part['modelInvocationOutput'].get('metadata', {}).get('usage', {})
+                    self.usage['input_tokens'] += usage.get('inputTokens', 0)
+                    self.usage['output_tokens'] += usage.get('outputTokens', 0)
+
+            # Only orchestration observations carry knowledge base results
+            observation = trace.get('orchestrationTrace', {}).get('observation')
+            if observation and 'knowledgeBaseLookupOutput' in observation:
+                added = self._add_references(
+                    observation['knowledgeBaseLookupOutput'].get('retrievedReferences', [])
+                )
+                if added:
+                    produced.append(self._emit(CITATIONS, added))
+
+        return produced
+
+    @property
+    def text(self):
+        return ''.join(self.chunks)
+
+    def result(self):
+        result = {
+            'response': self.text,
+            'citations': self.citations,
+            'first_chunk_ms': self.first_chunk_ms,
+            'done_ms': self.done_ms
+        }
+        if self.collect_traces:
+            result['trace_counts'] = self.trace_counts
+            result['usage'] = self.usage
+        return result
+
+    def finish(self):
+        self.done_ms = round((self.clock() - self.started_at) * 1000)
+        result = self.result()
+        self._emit(DONE, result)
+        return result
+
+    def stream(self, events):
+        """Yield (kind, payload) pairs as events arrive, ending with (DONE, result)"""
+        for event in events:
+            yield from self.feed(event)
+        yield DONE, self.finish()
+
+    def consume(self, events):
+        """Parse a whole stream (callbacks still fire as it arrives) and return the result"""
+        for event in events:
+            self.feed(event)
+        return self.finish()
@@ -0,0 +1,154 @@
+import json
+import time
+from datetime import datetime, timezone
+
+from aws_clients import lazy_table
+from query_normalization import normalize_query
+from ttl_cache import TTLCache
+
+# Pre-warmed answers for the most frequent questions, keyed by (domain, normalized query).
+# Partitioning by domain lets governance drop a whole domain with one query.
+ANSWER_CACHE_TABLE = 'hcg-demo-answer-cache'
+ANSWER_TTL_SECONDS = 36 * 3600
+
+# Per-domain counter bumped on every invalidation, so in-container caches
+# (semantic_cache.py) notice document changes within GENERATION_CHECK_SECONDS.
+# normalize_query never produces '#', so this key cannot collide with a question.
+GENERATION_KEY = '#generation'
+GENERATION_CHECK_SECONDS = 60
+
+# How often each first question was asked, one row per (UTC day, domain, question).
+# Rows outlive the 8 h session records so the nightly warmer sees a week of traffic.
+QUESTION_COUNTS_TABLE = 'hcg-demo-question-counts'
+QUESTION_COUNT_TTL_SECONDS = 8 * 24 * 3600
+
+answer_table = lazy_table(ANSWER_CACHE_TABLE)
+counts_table = lazy_table(QUESTION_COUNTS_TABLE)
+
+stats = {'lookups': 0, 'hits': 0, 'errors': 0, 'invalidated': 0}
+
+_generations = TTLCache(max_size=16, ttl=GENERATION_CHECK_SECONDS)
+
+def lookup_answer(domain, query):
+    """Cached response for a question, or None"""
+    stats['lookups'] += 1
+    try:
+        response = answer_table.get_item(
+            Key={'domain': domain, 'normalized_query': normalize_query(query)}
+        )
+    except Exception:
+        # Cache is an optimisation; never fail the request because of it
+        stats['errors'] += 1
+        return None
+
+    item = response.get('Item')
+    # DynamoDB TTL deletion lags, so check expiry here too
+    if not item or int(item.get('ttl', 0)) < time.time():
+        return None
+
+    stats['hits'] += 1
+    return json.loads(item['response_data'])
+
+def store_answer(domain, query, response_data, frequency=0):
+    """Store a validated response for a question"""
+    now = int(time.time())
+    answer_table.put_item(Item={
+        'domain': domain,
+        'normalized_query': normalize_query(query),
+        'query': query,
+        'response_data': json.dumps(response_data),
+        'frequency': frequency,
+        'created_at': now,
+        'ttl': now + ANSWER_TTL_SECONDS
+    })
+
+def invalidate_domain(domain):
+    """Drop every cached answer for a domain (called when its documents change)"""
+    removed = 0
+    kwargs = {
+        'KeyConditionExpression': '#d = :domain',
+        'ExpressionAttributeNames': {'#d': 'domain'},
+        'ExpressionAttributeValues': {':domain': domain},
+        'ProjectionExpression': '#d, normalized_query'
+    }
+
+    with answer_table.batch_writer() as batch:
+        while True:
+            response = answer_table.query(**kwargs)
+            for item in response['Items']:
+                if item['normalized_query'] == GENERATION_KEY:
+                    continue
+                batch.delete_item(Key={'domain': item['domain'], 'normalized_query': item['normalized_query']})
+                removed += 1
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    answer_table.update_item(
+        Key={'domain': domain, 'normalized_query': GENERATION_KEY},
+        UpdateExpression='ADD generation :one',
+        ExpressionAttributeValues={':one': 1}
+    )
+    _generations.delete(domain)
+
+    stats['invalidated'] += removed
+    return removed
+
+def get_domain_generation(domain):
+    """Content generation for a domain (re-read at most every GENERATION_CHECK_SECONDS), or None"""
+    generation = _generations.get(domain)
+    if generation is not None:
+        return generation
+
+    try:
+        item = answer_table.get_item(
+            Key={'domain': domain, 'normalized_query': GENERATION_KEY}
+        ).get('Item')
+    except Exception:
+        stats['errors'] += 1
+        return None
+
+    generation = int(item['generation']) if item else 0
+    _generations.set(domain, generation)
+    return generation
+
+def question_day(timestamp=None):
+    """UTC day bucket for question counts"""
+    moment = datetime.fromtimestamp(timestamp if timestamp is not None else time.time(), timezone.utc)
+    return moment.strftime('%Y-%m-%d')
+
+def record_question(domain, query, timestamp=None):
+    """Count one asking of a first question for the warmer; never fails the request"""
+    normalized = normalize_query(query)
+    if not normalized:
+        return
+    now = int(timestamp if timestamp is not None else time.time())
+    try:
+        counts_table.update_item(
+            Key={'day': question_day(now), 'question': f'{domain}#{normalized}'},
+            UpdateExpression='ADD asked :one SET #d = :domain, #q = if_not_exists(#q, :query), #ttl = :ttl',
+            ExpressionAttributeNames={'#d': 'domain', '#q': 'query', '#ttl': 'ttl'},
+            ExpressionAttributeValues={
+                ':one': 1, ':domain': domain, ':query': query,
+                ':ttl': now + QUESTION_COUNT_TTL_SECONDS
+            }
+        )
+    except Exception:
+        stats['errors'] += 1
+
+def iter_question_counts(days, now=None):
+    """Yield (domain, query, asked) rows for the last `days` UTC days, today included"""
+    now = now if now is not None else time.time()
+    for offset in range(days):
+        kwargs = {
+            'KeyConditionExpression': '#day = :day',
+            'ExpressionAttributeNames': {'#day': 'day'},
+            'ExpressionAttributeValues': {':day': question_day(now - offset * 86400)}
+        }
+        while True:
+            response = counts_table.query(**kwargs)
+            for item in response['Items']:
+                yield item['domain'], item['query'], int(item['asked'])
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
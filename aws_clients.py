@@ -0,0 +1,74 @@
+import threading
+
+REGION = 'ap-southeast-1'
+
+# Shared per container: each client is built on first use and reused across invocations.
+# boto3 itself is imported lazily too, since importing it dominates cold start.
+_clients = {}
+_lock = threading.Lock()
+
+def _build(kind, service, region_name, config):
+    import boto3
+
+    kwargs = {'region_name': region_name} if region_name else {}
+    if config:
+        from botocore.config import Config
+        kwargs['config'] = Config(**config)
+
+    if kind == 'resource':
+        return boto3.resource(service, **kwargs)
+    return boto3.client(service, **kwargs)
+
+def get_client(service, region_name=REGION, **config):
+    """Get a cached boto3 client, building it on first use"""
+    # repr: config values may be dicts (e.g. retries), which are not hashable
+    key = ('client', service, region_name, repr(sorted(config.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _build('client', service, region_name, config)
+    return client
+
+def get_resource(service, region_name=REGION):
+    """Get a cached boto3 resource, building it on first use"""
+    key = ('resource', service, region_name)
+    resource = _clients.get(key)
+    if resource is None:
+        with _lock:
+            resource = _clients.get(key)
+            if resource is None:
+                resource = _clients[key] = _build('resource', service, region_name, None)
+    return resource
+
+class LazyProxy:
+    """Stands in for a boto3 object at module level; builds it on first attribute access"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+
+    def _get(self):
+        if self._target is None:
+            self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+def lazy_client(service, region_name=REGION, **config):
+    """Module-level client that is only created when first used"""
+    return LazyProxy(lambda: get_client(service, region_name, **config))
+
+def lazy_resource(service, region_name=REGION):
+    """Module-level resource that is only created when first used"""
+    return LazyProxy(lambda: get_resource(service, region_name))
+
+def lazy_table(name, region_name=REGION):
+    """Module-level DynamoDB table that is only created when first used"""
+    return LazyProxy(lambda: get_resource('dynamodb', region_name).Table(name))
+
+def is_initialized(service, region_name=REGION):
+    """Check whether a client or resource for the service has been built"""
+    return any(key[1] == service and key[2] == region_name for key in _clients)
@@ -0,0 +1,100 @@
+import json
+import statistics
+import time
+
+import lambda_supervisor_agent
+from kb_fast_path import FAST_PATH_MODEL_ID
+
+# Token prices (USD per million tokens, on-demand)
+MODEL_PRICES = {
+    'agent': {'input': 3.00, 'output': 15.00},      # claude-3-sonnet (specialist agents)
+    'kb_direct': {'input': 0.25, 'output': 1.25}    # claude-3-haiku (FAST_PATH_MODEL_ID)
+}
+
+# FAQ questions from test_kb_retrieval.py
+QUERIES = [
+    "What is the parental leave policy?",
+    "What health insurance benefits are available?",
+    "How do I reset my password?",
+    "How do I set up VPN access?",
+    "How do I submit an expense report?",
+    "Where is the Singapore office located?"
+]
+ROUNDS = 2
+
+# Agent token usage is only reported in traces
+lambda_supervisor_agent.AGENT_TRACE_ENABLED = True
+lambda_supervisor_agent.SEMANTIC_CACHE_ENABLED = False
+lambda_supervisor_agent.REDIRECTS_ENABLED = False
+
+def token_cost(path, usage):
+    prices = MODEL_PRICES[path]
+    return (usage.get('input_tokens', 0) * prices['input'] + usage.get('output_tokens', 0) * prices['output']) / 1_000_000
+
+def run(path, query, session_id):
+    lambda_supervisor_agent.ANSWER_PATH = 'auto' if path == 'kb_direct' else 'agent'
+    start = time.perf_counter()
+    result = lambda_supervisor_agent.handle_query(query, session_id, use_cache=False)
+    latency_ms = (time.perf_counter() - start) * 1000
+    usage = result.get('usage', {})
+    return {
+        'path': result['path'],
+        'latency_ms': latency_ms,
+        'tokens': usage.get('input_tokens', 0) + usage.get('output_tokens', 0),
+        'cost': token_cost(result['path'], usage),
+        'safe': result['safe_to_respond']
+    }
+
+def summarize(samples):
+    latencies = sorted(s['latency_ms'] for s in samples)
+    return {
+        'requests': len(samples),
+        'p50_ms': round(statistics.median(latencies), 1),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        'mean_tokens': round(sum(s['tokens'] for s in samples) / len(samples)),
+        'mean_cost_usd': sum(s['cost'] for s in samples) / len(samples),
+        'answered': sum(s['safe'] for s in samples)
+    }
+
+print("="*70)
+print("⏱️  Benchmarking Answer Paths: Agent vs Direct KB")
+print("="*70 + "\n")
+print(f"Fast path model: {FAST_PATH_MODEL_ID}\n")
+
+samples = {'agent': [], 'kb_direct': []}
+
+for round_num in range(ROUNDS):
+    for i, query in enumerate(QUERIES):
+        for path in samples:
+            try:
+                sample = run(path, query, f'paths-{round_num}-{i}-{path}')
+                if sample['path'] != path:
+                    print(f"  {path:9} ⚠️  took {sample['path']} path: {query[:45]}")
+                    continue
+                samples[path].append(sample)
+                print(f"  {path:9} {sample['latency_ms']:8.0f} ms {sample['tokens']:6} tok  {query[:45]}")
+            except Exception as e:
+                print(f"  {path:9} ❌ {str(e)[:100]}")
+
+results = {path: summarize(s) for path, s in samples.items() if s}
+
+print("\n" + "="*70)
+print("📊 Results")
+print("="*70)
+for path, summary in results.items():
+    print(f"\n{path.upper()}:")
+    print(f"  p50 latency: {summary['p50_ms']} ms")
+    print(f"  p95 latency: {summary['p95_ms']} ms")
+    print(f"  Tokens/request: {summary['mean_tokens']}")
+    print(f"  Model cost/request: ${summary['mean_cost_usd']:.6f}")
+    print(f"  Answered: {summary['answered']}/{summary['requests']}")
+
+if 'agent' in results and 'kb_direct' in results:
+    saved_ms = results['agent']['p50_ms'] - results['kb_direct']['p50_ms']
+    saved_cost = results['agent']['mean_cost_usd'] - results['kb_direct']['mean_cost_usd']
+    print(f"\nDirect KB path saves {saved_ms:.0f} ms (p50) and ${saved_cost * 1000:.2f} per thousand requests")
+
+with open('answer_path_benchmark.json', 'w') as f:
+    json.dump(results, f, indent=2)
+
+print(f"\n✅ Results saved to answer_path_benchmark.json")
@@ -0,0 +1,103 @@
+import json
+import time
+from collections import Counter
+
+from query_classifier import classify, rank_domains
+
+ROUTING_EXAMPLES = {
+    "expense for a new laptop": 'finance',
+    "reimbursement for my laptop bag": 'finance'
+}
+
+def legacy_classify(query):
+    """Original keyword-list classifier (first match wins in fixed priority order)"""
+    query_lower = query.lower()
+
+    hr_keywords = ['leave', 'vacation', 'maternity', 'paternity', 'benefit', 'insurance', 'medical', 'salary', 'bonus', 'hr', 'employee', 'onboarding']
+    if any(kw in query_lower for kw in hr_keywords):
+        return 'hr', 0.9
+
+    it_keywords = ['password', 'laptop', 'vpn', 'software', 'install', 'computer', 'network', 'login', 'access', 'it support', 'troubleshoot']
+    if any(kw in query_lower for kw in it_keywords):
+        return 'it', 0.9
+
+    finance_keywords = ['expense', 'reimbursement', 'procurement', 'purchase', 'invoice', 'payment', 'budget', 'finance', 'cost']
+    if any(kw in query_lower for kw in finance_keywords):
+        return 'finance', 0.9
+
+    return 'general', 0.7
+
+def load_validation_queries(path='validation_dataset.json'):
+    with open(path, 'r') as f:
+        dataset = json.load(f)
+    return [(item['query'], item['expected_domain']) for items in dataset.values() for item in items]
+
+def accuracy_report(classifier, queries):
+    correct = 0
+    per_domain = Counter()
+    per_domain_total = Counter()
+    misses = []
+
+    for query, expected in queries:
+        domain, confidence = classifier(query)
+        per_domain_total[expected] += 1
+        if domain == expected:
+            correct += 1
+            per_domain[expected] += 1
+        else:
+            misses.append({'query': query, 'expected': expected, 'actual': domain, 'confidence': confidence})
+
+    return {
+        'accuracy': correct / len(queries),
+        'per_domain': {d: per_domain[d] / per_domain_total[d] for d in per_domain_total},
+        'misses': misses
+    }
+
+def throughput(classifier, queries, seconds=1.0):
+    """Queries classified per second"""
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for query, _ in queries:
+            classifier(query)
+        count += len(queries)
+    return count / (time.perf_counter() - start)
+
+print("="*70)
+print("🧪 Query Classifier Accuracy & Throughput")
+print("="*70 + "\n")
+
+queries = load_validation_queries()
+results = {}
+
+for name, classifier in (('legacy', legacy_classify), ('compiled', classify)):
+    report = accuracy_report(classifier, queries)
+    report['queries_per_second'] = round(throughput(classifier, queries))
+    results[name] = report
+
+    print(f"{name.upper()}:")
+    print(f"  Accuracy: {report['accuracy']*100:.1f}% ({len(queries)} queries)")
+    for domain, acc in sorted(report['per_domain'].items()):
+        print(f"    {domain:8} {acc*100:5.1f}%")
+    print(f"  Throughput: {report['queries_per_second']:,} queries/s")
+    for miss in report['misses']:
+        print(f"    ❌ {miss['query'][:45]:45} expected {miss['expected']}, got {miss['actual']}")
+    print()
+
+print("Confidence distribution examples:")
+for query in ["expense for a new laptop", "What is the IT helpdesk number?", "hello"]:
+    ranked = ', '.join(f"{d}={p:.2f}" for d, p in rank_domains(query))
+    print(f"  {query:35} {ranked}")
+print()
+
+# Queries naming both a money action and an IT item must not tie
+print("Cross-domain examples:")
+for query, expected in ROUTING_EXAMPLES.items():
+    domain, confidence = classify(query)
+    print(f"  {'✅' if domain == expected else '❌'} {query:35} {domain} ({confidence:.2f}), expected {expected}")
+assert all(classify(query)[0] == expected for query, expected in ROUTING_EXAMPLES.items())
+
+with open('classifier_benchmark.json', 'w') as f:
+    json.dump(results, f, indent=2)
+
+print(f"\n✅ Results saved to classifier_benchmark.json")
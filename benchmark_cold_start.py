@@ -0,0 +1,81 @@
+import glob
+import json
+import subprocess
+import sys
+
+# Import + module init budget per handler (ms), measured in a fresh interpreter
+DEFAULT_BUDGET_MS = 150
+COLD_START_BUDGETS_MS = {
+    'lambda_webhook_handler_complete': 200,
+    'lambda_supervisor_agent': 200
+}
+RUNS = 3
+
+# Runs in a fresh interpreter so nothing is already imported
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import importlib
+module = importlib.import_module(sys.argv[1])
+elapsed_ms = (time.perf_counter() - start) * 1000
+import aws_clients
+print(json.dumps({
+    'import_ms': elapsed_ms,
+    'aws_clients_built': len(aws_clients._clients),
+    'boto3_imported': 'boto3' in sys.modules
+}))
+"""
+
+def measure(module_name):
+    """Best-of-N import time for a module in fresh interpreters"""
+    samples = []
+    for _ in range(RUNS):
+        proc = subprocess.run(
+            [sys.executable, '-c', PROBE, module_name],
+            capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            return {'error': proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'import failed'}
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    best = min(samples, key=lambda s: s['import_ms'])
+    return best
+
+print("="*70)
+print("⏱️  Cold-Start Budget Check")
+print("="*70 + "\n")
+
+modules = sorted(path[:-3] for path in glob.glob('lambda_*.py'))
+results = {}
+failures = []
+
+for module_name in modules:
+    budget = COLD_START_BUDGETS_MS.get(module_name, DEFAULT_BUDGET_MS)
+    result = measure(module_name)
+    result['budget_ms'] = budget
+    results[module_name] = result
+
+    if 'error' in result:
+        print(f"❌ {module_name:40} import error: {result['error'][:80]}")
+        failures.append(module_name)
+        continue
+
+    over_budget = result['import_ms'] > budget
+    eager_clients = result['aws_clients_built'] > 0 or result['boto3_imported']
+    status = "❌" if over_budget or eager_clients else "✅"
+    print(f"{status} {module_name:40} {result['import_ms']:7.1f} ms / {budget} ms"
+          f"{'  (AWS clients built at import)' if eager_clients else ''}")
+
+    if over_budget or eager_clients:
+        failures.append(module_name)
+
+with open('cold_start_results.json', 'w') as f:
+    json.dump(results, f, indent=2)
+
+print(f"\n✅ Results saved to cold_start_results.json")
+
+if failures:
+    print(f"\n❌ {len(failures)} module(s) over cold-start budget: {', '.join(failures)}")
+    sys.exit(1)
+
+print("\n🎉 All handler modules within cold-start budget")
@@ -0,0 +1,90 @@
+import json
+import random
+import re
+import time
+
+from safe_failure_handler import scan_pii
+
+def legacy_detect_pii(text):
+    """Original detection: four uncompiled searches"""
+    pii_patterns = {
+        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+        'phone': r'\b\d{4}[-.\s]?\d{4}\b|\b\+65[-.\s]?\d{4}[-.\s]?\d{4}\b',
+        'nric': r'\b[STFG]\d{7}[A-Z]\b',
+        'credit_card': r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'
+    }
+    return [pii_type for pii_type, pattern in pii_patterns.items() if re.search(pattern, text, re.IGNORECASE)]
+
+def legacy_sanitize_response(response):
+    """Original redaction: three uncompiled substitutions"""
+    response = re.sub(r'\b[A-Za-z0-9._%+-]+@(?!starhub\.com)[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL REDACTED]', response, flags=re.IGNORECASE)
+    response = re.sub(r'\b(?!\+65\s?6825)\d{4}[-.\s]?\d{4}\b', '[PHONE REDACTED]', response)
+    response = re.sub(r'\b[STFG]\d{7}[A-Z]\b', '[NRIC REDACTED]', response)
+    return response
+
+def legacy_scan(text):
+    """What validate_response did before: detect, then redact if anything was found"""
+    detected = legacy_detect_pii(text)
+    return detected, legacy_sanitize_response(text) if detected else text
+
+SENTENCES = [
+    "Employees are entitled to 14 days of annual leave in their first year of service.",
+    "Leave entitlement increases by one day for every completed year, up to 21 days.",
+    "Submit your leave request in Workday at least two weeks in advance.",
+    "Medical leave of up to 14 days per year is available with a valid certificate.",
+    "To reset your password, open the self-service portal and follow the prompts.",
+    "If the VPN client fails to connect, restart it and check your network settings.",
+    "Expense claims above SGD 500 require approval from your department head.",
+    "Claims must be submitted within 30 days of the expense being incurred.",
+    "The policy was last updated in March 2024 and applies to all permanent staff.",
+    "For questions, contact HR at hr@starhub.com or extension 2100."
+]
+
+PII_SENTENCES = [
+    "You can also reach John at john.doe@personal.com or 9123-4567.",
+    "The record for S1234567A shows the claim was paid to card 4111 1111 1111 1111."
+]
+
+def agent_response(rng, sentences, with_pii):
+    """A long agent answer (~sentences sentences), optionally with one line of PII"""
+    body = [rng.choice(SENTENCES) for _ in range(sentences)]
+    if with_pii:
+        body.insert(rng.randrange(len(body)), rng.choice(PII_SENTENCES))
+    return ' '.join(body)
+
+def per_call_us(fn, texts, seconds=1.0):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for text in texts:
+            fn(text)
+        count += len(texts)
+    return (time.perf_counter() - start) / count * 1e6
+
+print("="*70)
+print("🧪 PII Scanner: Legacy vs Single-Pass")
+print("="*70 + "\n")
+
+rng = random.Random(7)
+results = {}
+for sentences in (5, 40, 200):
+    for with_pii in (False, True):
+        texts = [agent_response(rng, sentences, with_pii) for _ in range(50)]
+        assert all(scan_pii(t) == legacy_scan(t) for t in texts), "outputs differ"
+
+        legacy_us = per_call_us(legacy_scan, texts)
+        scan_us = per_call_us(scan_pii, texts)
+        name = f"{sentences} sentences, {'with' if with_pii else 'no'} PII"
+        results[name] = {
+            'chars': sum(map(len, texts)) // len(texts),
+            'legacy_us': round(legacy_us, 1),
+            'scan_us': round(scan_us, 1),
+            'speedup': round(legacy_us / scan_us, 2)
+        }
+        row = results[name]
+        print(f"{name:32} {row['chars']:6} chars  legacy {row['legacy_us']:8.1f} µs  scan {row['scan_us']:8.1f} µs  {row['speedup']:5.2f}x")
+
+with open('pii_scanner_benchmark.json', 'w') as f:
+    json.dump(results, f, indent=2)
+
+print(f"\n✅ Outputs identical; results saved to pii_scanner_benchmark.json")
@@ -0,0 +1,120 @@
+import boto3
+import json
+import time
+import base64
+import re
+import statistics
+
+import lambda_supervisor_agent
+
+REGION = 'ap-southeast-1'
+SUPERVISOR_FUNCTION = 'hcg-demo-supervisor-orchestrator'
+
+# Lambda pricing (x86, ap-southeast-1)
+PRICE_PER_GB_SECOND = 0.0000166667
+PRICE_PER_REQUEST = 0.0000002
+WEBHOOK_MEMORY_MB = 512
+SUPERVISOR_MEMORY_MB = 512
+
+lambda_client = boto3.client('lambda', region_name=REGION)
+
+QUERIES = [
+    "How many days of annual leave do I get?",
+    "How do I reset my password?",
+    "What is the expense reimbursement policy?",
+    "Where is the office located?"
+]
+ROUNDS = 3
+
+# Measure invocation, not cache hits: the two modes ask the same questions back to back
+lambda_supervisor_agent.REDIRECTS_ENABLED = False
+lambda_supervisor_agent.COALESCE_ENABLED = False
+lambda_supervisor_agent.SEMANTIC_CACHE_ENABLED = False
+
+def lambda_cost(duration_ms, memory_mb):
+    """Cost of one invocation billed for duration_ms at memory_mb"""
+    return (duration_ms / 1000.0) * (memory_mb / 1024.0) * PRICE_PER_GB_SECOND + PRICE_PER_REQUEST
+
+def billed_duration_ms(log_result):
+    """Extract billed duration from a tail log"""
+    log = base64.b64decode(log_result).decode('utf-8', errors='ignore')
+    match = re.search(r'Billed Duration: (\d+) ms', log)
+    return int(match.group(1)) if match else None
+
+def run_remote(query, session_id):
+    start = time.perf_counter()
+    response = lambda_client.invoke(
+        FunctionName=SUPERVISOR_FUNCTION,
+        InvocationType='RequestResponse',
+        LogType='Tail',
+        Payload=json.dumps({'body': json.dumps({'query': query, 'session_id': session_id, 'use_cache': False})})
+    )
+    json.loads(response['Payload'].read())
+    latency_ms = (time.perf_counter() - start) * 1000
+    billed = billed_duration_ms(response.get('LogResult', '')) or latency_ms
+
+    # Webhook is billed while it waits, plus the supervisor's own invocation
+    cost = lambda_cost(latency_ms, WEBHOOK_MEMORY_MB) + lambda_cost(billed, SUPERVISOR_MEMORY_MB)
+    return latency_ms, cost
+
+def run_local(query, session_id):
+    start = time.perf_counter()
+    lambda_supervisor_agent.handle_query(query, session_id, use_cache=False)
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    # Only the webhook invocation is billed, request fee included as in run_remote
+    cost = lambda_cost(latency_ms, WEBHOOK_MEMORY_MB)
+    return latency_ms, cost
+
+def summarize(samples):
+    latencies = sorted(s[0] for s in samples)
+    return {
+        'requests': len(samples),
+        'p50_ms': round(statistics.median(latencies), 1),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 1),
+        'mean_cost_usd': sum(s[1] for s in samples) / len(samples)
+    }
+
+print("="*70)
+print("⏱️  Benchmarking Supervisor Invocation Modes")
+print("="*70)
+print("Local mode runs on this machine, not inside the webhook Lambda\n")
+
+samples = {'remote': [], 'local': []}
+
+for round_num in range(ROUNDS):
+    for i, query in enumerate(QUERIES):
+        session_id = f'bench-{round_num}-{i}'
+        # Alternate which mode goes first so neither always finds Bedrock warm
+        modes = [('remote', run_remote), ('local', run_local)]
+        if (round_num + i) % 2:
+            modes.reverse()
+        for mode, runner in modes:
+            try:
+                latency_ms, cost = runner(query, f'{session_id}-{mode}')
+                samples[mode].append((latency_ms, cost))
+                print(f"  {mode:6} {latency_ms:8.0f} ms  {query[:45]}")
+            except Exception as e:
+                print(f"  {mode:6} ❌ {str(e)[:100]}")
+
+results = {mode: summarize(s) for mode, s in samples.items() if s}
+
+print("\n" + "="*70)
+print("📊 Results")
+print("="*70)
+for mode, summary in results.items():
+    print(f"\n{mode.upper()}:")
+    print(f"  p50 latency: {summary['p50_ms']} ms")
+    print(f"  p95 latency: {summary['p95_ms']} ms")
+    print(f"  Lambda cost/request: ${summary['mean_cost_usd']:.8f}")
+
+if 'remote' in results and 'local' in results:
+    saved_ms = results['remote']['p50_ms'] - results['local']['p50_ms']
+    saved_cost = results['remote']['mean_cost_usd'] - results['local']['mean_cost_usd']
+    print(f"\nLocal mode saves {saved_ms:.0f} ms (p50) and ${saved_cost * 1_000_000:.2f} per million requests")
+    print("(local timings are from this machine; inside Lambda they also depend on the webhook's memory size)")
+
+with open('supervisor_mode_benchmark.json', 'w') as f:
+    json.dump(results, f, indent=2)
+
+print(f"\n✅ Results saved to supervisor_mode_benchmark.json")
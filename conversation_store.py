@@ -0,0 +1,129 @@
+import time
+
+from ttl_cache import TTLCache
+
+# Sessions expire after 8 hours (DynamoDB TTL)
+SESSION_TTL_SECONDS = 28800
+
+# Per-thread record stays compact: bounded history, truncated turns
+MAX_TURNS = 10
+MAX_TURN_CHARS = 500
+CACHE_TTL_SECONDS = 900
+# Containers writing the same thread at once retry on the other's record
+MAX_WRITE_ATTEMPTS = 3
+
+def _error_code(e):
+    # botocore ClientError, matched by code to keep botocore off the import path
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+class ConversationStore:
+    """Per-thread conversation records in hcg-demo-sessions, fronted by a TTL cache"""
+
+    def __init__(self, table, cache=None):
+        self.table = table
+        self.cache = cache if cache is not None else TTLCache(max_size=2048, ttl=CACHE_TTL_SECONDS)
+        self.stats = {'reads': 0, 'route_reuses': 0, 'write_conflicts': 0}
+
+    def get(self, session_id):
+        """Get the conversation for a thread (cache first, then DynamoDB)"""
+        conversation = self.cache.get(session_id)
+        if conversation is not None:
+            return conversation
+
+        self.stats['reads'] += 1
+        response = self.table.get_item(Key={'sessionId': session_id})
+        conversation = response.get('Item')
+
+        if conversation is not None:
+            self.cache.set(session_id, conversation)
+        return conversation
+
+    def get_route(self, session_id):
+        """Routing decision already made for this thread, if any"""
+        conversation = self.get(session_id)
+        if not conversation or not conversation.get('domain'):
+            return None
+
+        self.stats['route_reuses'] += 1
+        confidence = conversation.get('route_confidence')
+        return {
+            'domain': conversation['domain'],
+            'agent_id': conversation.get('agent_id'),
+            'confidence': float(confidence) if confidence else None,
+            'bedrock_session_id': conversation.get('bedrock_session_id')
+        }
+
+    def has_answered(self, session_id, job_key):
+        """Whether a job's answer is already recorded for the thread (consistent read,
+        for redelivered jobs)"""
+        if not job_key:
+            return False
+        conversation = self._read(session_id)
+        return bool(conversation) and job_key in conversation.get('answered_jobs', [])
+
+    def _read(self, session_id):
+        """Current record straight from DynamoDB, bypassing the cache"""
+        self.stats['reads'] += 1
+        return self.table.get_item(Key={'sessionId': session_id}, ConsistentRead=True).get('Item')
+
+    def _put(self, conversation, version):
+        """Write the record unless another container changed it since version was read"""
+        if version is None:
+            # New thread, or a record written before records were versioned
+            condition = {'ConditionExpression': 'attribute_not_exists(#version)'}
+        else:
+            condition = {
+                'ConditionExpression': '#version = :version',
+                'ExpressionAttributeValues': {':version': version}
+            }
+        self.table.put_item(Item=conversation, ExpressionAttributeNames={'#version': 'version'}, **condition)
+
+    def record_turn(self, session_id, user_id, query, result=None, job_key=None):
+        """Append a question (and the answer, if any) and store the routing decision
+
+        Builds on the stored record (read through on a cache miss) and writes it back
+        only if its version is unchanged; a concurrent write is re-read and the turn
+        appended to it. Only a validated answer's route is kept for the thread: a
+        fallback or escalation would otherwise pin later questions to a domain that
+        could not answer. job_key marks the work item as answered (see has_answered).
+        """
+        current = self.get(session_id)
+
+        for attempt in range(MAX_WRITE_ATTEMPTS):
+            version = current.get('version') if current else None
+            conversation = self._append(current, session_id, user_id, query, result, job_key)
+            conversation['version'] = int(version or 0) + 1
+            try:
+                self._put(conversation, version)
+                break
+            except Exception as e:
+                if _error_code(e) != 'ConditionalCheckFailedException' or attempt == MAX_WRITE_ATTEMPTS - 1:
+                    raise
+                self.stats['write_conflicts'] += 1
+                current = self._read(session_id)
+
+        self.cache.set(session_id, conversation)
+        return conversation
+
+    def _append(self, current, session_id, user_id, query, result, job_key=None):
+        conversation = dict(current or {'sessionId': session_id, 'userId': user_id, 'turns': []})
+        now = int(time.time())
+
+        turns = list(conversation.get('turns', []))
+        turns.append({'role': 'user', 'text': query[:MAX_TURN_CHARS], 'ts': now})
+
+        if result and 'error' not in result:
+            turns.append({'role': 'assistant', 'text': result.get('response', '')[:MAX_TURN_CHARS], 'ts': now})
+            if result.get('safe_to_respond'):
+                conversation['domain'] = result.get('domain')
+                conversation['agent_id'] = result.get('agent_id')
+                conversation['route_confidence'] = str(result.get('route_confidence', result.get('confidence', '')))
+                conversation['bedrock_session_id'] = result.get('bedrock_session_id', session_id)
+
+        conversation['turns'] = turns[-MAX_TURNS:]
+        if job_key:
+            conversation['answered_jobs'] = (list(conversation.get('answered_jobs', [])) + [job_key])[-MAX_TURNS:]
+        conversation['query'] = query
+        conversation['timestamp'] = now
+        conversation['ttl'] = now + SESSION_TTL_SECONDS
+        return conversation
@@ -22,6 +22,16 @@ tables = [
         'attrs': [{'AttributeName': 'feedbackId', 'AttributeType': 'S'}, {'AttributeName': 'timestamp', 'AttributeType': 'S'},
                   {'AttributeName': 'sessionId', 'AttributeType': 'S'}],
         'gsi': {'IndexName': 'session-index', 'Keys': [{'AttributeName': 'sessionId', 'KeyType': 'HASH'}, {'AttributeName': 'timestamp', 'KeyType': 'RANGE'}]}
+    },
+    {
+        'name': 'hcg-demo-processed-events',
+        'key': [{'AttributeName': 'eventKey', 'KeyType': 'HASH'}],
+        'attrs': [{'AttributeName': 'eventKey', 'AttributeType': 'S'}]
+    },
+    {
+        'name': 'hcg-demo-inflight-queries',
+        'key': [{'AttributeName': 'flight_key', 'KeyType': 'HASH'}],
+        'attrs': [{'AttributeName': 'flight_key', 'AttributeType': 'S'}]
     }
 ]
 
@@ -64,4 +74,6 @@ print("✅ Day 8: DynamoDB Tables")
 print("  - hcg-demo-sessions")
 print("  - hcg-demo-users (with email-index)")
 print("  - hcg-demo-feedback (with session-index)")
+print("  - hcg-demo-processed-events (Slack event dedup)")
+print("  - hcg-demo-inflight-queries (coalesced questions)")
 print("✅ Secrets Manager: 2 secrets")
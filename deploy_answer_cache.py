@@ -0,0 +1,141 @@
+import boto3
+import json
+import zipfile
+import io
+import time
+
+REGION = 'ap-southeast-1'
+ACCOUNT_ID = '026138522123'
+
+dynamodb = boto3.client('dynamodb', region_name=REGION)
+lambda_client = boto3.client('lambda', region_name=REGION)
+events = boto3.client('events', region_name=REGION)
+
+TABLE_NAME = 'hcg-demo-answer-cache'
+COUNTS_TABLE_NAME = 'hcg-demo-question-counts'
+FUNCTION_NAME = 'hcg-demo-answer-cache-warmer'
+
+# Warmer runs the supervisor pipeline in-process
+MODULES = [
+    'agent_stream.py', 'aws_clients.py', 'answer_cache.py', 'grounding.py', 'kb_citations.py', 'kb_fast_path.py', 'lambda_deep_linking.py', 'lambda_supervisor_agent.py', 'redirect_router.py', 'resilience.py',
+    'query_classifier.py', 'query_normalization.py', 'safe_failure_handler.py', 'semantic_cache.py', 'single_flight.py', 'slack_client.py', 'slack_stream.py', 'statistical_router.py',
+    'tracing.py', 'ttl_cache.py'
+]
+
+print("="*70)
+print("🚀 Deploying Pre-warmed Answer Cache")
+print("="*70 + "\n")
+
+# 1. Cache table (partitioned by domain for cheap invalidation)
+print("1. Creating cache table...")
+try:
+    dynamodb.describe_table(TableName=TABLE_NAME)
+    print(f"   ✅ Table exists: {TABLE_NAME}\n")
+except dynamodb.exceptions.ResourceNotFoundException:
+    dynamodb.create_table(
+        TableName=TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'domain', 'KeyType': 'HASH'},
+            {'AttributeName': 'normalized_query', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'domain', 'AttributeType': 'S'},
+            {'AttributeName': 'normalized_query', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST',
+        Tags=[{'Key': 'Project', 'Value': 'HCG_Demo'}]
+    )
+    dynamodb.get_waiter('table_exists').wait(TableName=TABLE_NAME)
+    dynamodb.update_time_to_live(
+        TableName=TABLE_NAME,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'ttl'}
+    )
+    print(f"   ✅ Created table: {TABLE_NAME}\n")
+
+# Daily question counts written by the webhook, mined by the warmer
+try:
+    dynamodb.describe_table(TableName=COUNTS_TABLE_NAME)
+    print(f"   ✅ Table exists: {COUNTS_TABLE_NAME}\n")
+except dynamodb.exceptions.ResourceNotFoundException:
+    dynamodb.create_table(
+        TableName=COUNTS_TABLE_NAME,
+        KeySchema=[
+            {'AttributeName': 'day', 'KeyType': 'HASH'},
+            {'AttributeName': 'question', 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=[
+            {'AttributeName': 'day', 'AttributeType': 'S'},
+            {'AttributeName': 'question', 'AttributeType': 'S'}
+        ],
+        BillingMode='PAY_PER_REQUEST',
+        Tags=[{'Key': 'Project', 'Value': 'HCG_Demo'}]
+    )
+    dynamodb.get_waiter('table_exists').wait(TableName=COUNTS_TABLE_NAME)
+    dynamodb.update_time_to_live(
+        TableName=COUNTS_TABLE_NAME,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'ttl'}
+    )
+    print(f"   ✅ Created table: {COUNTS_TABLE_NAME}\n")
+
+# 2. Warmer Lambda
+print("2. Deploying warmer Lambda...")
+zip_buffer = io.BytesIO()
+with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+    with open('lambda_answer_cache_warmer.py', 'r') as f:
+        zf.writestr('lambda_function.py', f.read())
+    for module in MODULES:
+        with open(module, 'r') as f:
+            zf.writestr(module, f.read())
+zip_buffer.seek(0)
+
+try:
+    lambda_client.get_function(FunctionName=FUNCTION_NAME)
+    lambda_client.update_function_code(FunctionName=FUNCTION_NAME, ZipFile=zip_buffer.read())
+    print(f"   ✅ Updated: {FUNCTION_NAME}\n")
+except lambda_client.exceptions.ResourceNotFoundException:
+    lambda_client.create_function(
+        FunctionName=FUNCTION_NAME,
+        Runtime='python3.11',
+        Role=f'arn:aws:iam::{ACCOUNT_ID}:role/hcg-demo-lambda-bedrock',
+        Handler='lambda_function.lambda_handler',
+        Code={'ZipFile': zip_buffer.read()},
+        Timeout=900,
+        MemorySize=512,
+        Environment={'Variables': {'REGION': REGION}}
+    )
+    print(f"   ✅ Created: {FUNCTION_NAME}\n")
+    time.sleep(5)
+
+# 3. Nightly schedule (02:00 SGT)
+print("3. Scheduling nightly warm-up...")
+rule = events.put_rule(
+    Name='hcg-demo-answer-cache-nightly',
+    ScheduleExpression='cron(0 18 * * ? *)',
+    State='ENABLED',
+    Description='Pre-warm answers for the most frequent questions'
+)
+function_arn = lambda_client.get_function(FunctionName=FUNCTION_NAME)['Configuration']['FunctionArn']
+
+try:
+    lambda_client.add_permission(
+        FunctionName=FUNCTION_NAME,
+        StatementId='answer-cache-nightly',
+        Action='lambda:InvokeFunction',
+        Principal='events.amazonaws.com',
+        SourceArn=rule['RuleArn']
+    )
+except lambda_client.exceptions.ResourceConflictException:
+    pass
+
+events.put_targets(
+    Rule='hcg-demo-answer-cache-nightly',
+    Targets=[{'Id': 'warmer', 'Arn': function_arn, 'Input': json.dumps({'top_n': 25, 'min_frequency': 3})}]
+)
+print("   ✅ Scheduled: cron(0 18 * * ? *)\n")
+
+print("="*70)
+print("✅ Answer Cache Deployed")
+print("="*70)
+print("\nRedeploy the webhook (deploy_slack_ux.py) to start counting questions, the")
+print("supervisor (deploy_orchestration.py) and governance")
+print("(deploy_content_governance.py) Lambdas to enable lookups and invalidation.")
@@ -7,6 +7,9 @@ from datetime import datetime
 lambda_client = boto3.client('lambda', region_name='ap-southeast-1')
 iam = boto3.client('iam', region_name='ap-southeast-1')
 
+# Shared modules bundled with each function (governance invalidates the answer cache)
+SHARED_MODULES = ['aws_clients.py', 'answer_cache.py', 'query_normalization.py', 'ttl_cache.py']
+
 def create_lambda_role():
     role_name = 'hcg-demo-content-governance-role'
     
@@ -55,6 +58,9 @@ def create_lambda_function(name, code_file, role_arn):
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         with open(code_file, 'r') as f:
             zip_file.writestr('lambda_function.py', f.read())
+        for module in SHARED_MODULES:
+            with open(module, 'r') as f:
+                zip_file.writestr(module, f.read())
     
     zip_buffer.seek(0)
     
@@ -52,6 +52,9 @@ def create_lambda_function(name, code_file, role_arn):
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         with open(code_file, 'r') as f:
             zip_file.writestr('lambda_function.py', f.read())
+        # Shared lazy AWS client factory
+        with open('aws_clients.py', 'r') as f:
+            zip_file.writestr('aws_clients.py', f.read())
     
     zip_buffer.seek(0)
     
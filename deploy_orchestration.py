@@ -22,9 +22,17 @@ print("1. Creating Lambda deployment package...")
 with open('lambda_supervisor_agent.py', 'r') as f:
     lambda_code = f.read()
 
+# Helper modules imported by the handler
+HELPER_MODULES = ['agent_stream.py', 'answer_cache.py', 'aws_clients.py', 'grounding.py', 'kb_citations.py', 'kb_fast_path.py', 'lambda_deep_linking.py', 'query_classifier.py', 'query_normalization.py', 'redirect_router.py', 'resilience.py', 'safe_failure_handler.py', 'semantic_cache.py', 'single_flight.py', 'slack_client.py', 'slack_stream.py', 'statistical_router.py', 'tracing.py', 'ttl_cache.py']
+
 zip_buffer = io.BytesIO()
 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
     zip_file.writestr('lambda_function.py', lambda_code)
+    for module in HELPER_MODULES:
+        with open(module, 'r') as f:
+            zip_file.writestr(module, f.read())
+    # Trained router (train_router.py); numpy comes from a layer
+    zip_file.write('router_model.npz', 'router_model.npz')
 zip_buffer.seek(0)
 
 print("   ✅ Package created\n")
@@ -28,6 +28,8 @@ with open('lambda_servicenow_action.py', 'r') as f:
 zip_buffer = io.BytesIO()
 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
     zf.writestr('lambda_function.py', code)
+    with open('aws_clients.py', 'r') as f:
+        zf.writestr('aws_clients.py', f.read())
 zip_buffer.seek(0)
 print("   ✅ Package created\n")
 
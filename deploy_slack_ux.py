@@ -17,9 +17,19 @@ print("1. Creating Lambda package...")
 with open('lambda_webhook_handler_complete.py', 'r') as f:
     code = f.read()
 
+# Helper modules imported by the handler
+HELPER_MODULES = ['answer_cache.py', 'aws_clients.py', 'conversation_store.py', 'event_dedup.py', 'kb_citations.py', 'query_normalization.py', 'slack_client.py', 'tracing.py', 'ttl_cache.py', 'work_queue.py', 'write_behind.py']
+
+# Supervisor pipeline, bundled for SUPERVISOR_MODE=local
+HELPER_MODULES += ['agent_stream.py', 'grounding.py', 'kb_fast_path.py', 'lambda_deep_linking.py', 'lambda_supervisor_agent.py', 'query_classifier.py', 'redirect_router.py', 'resilience.py', 'safe_failure_handler.py', 'semantic_cache.py', 'single_flight.py', 'slack_stream.py', 'statistical_router.py']
+
 zip_buffer = io.BytesIO()
 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
     zf.writestr('lambda_function.py', code)
+    for module in HELPER_MODULES:
+        with open(module, 'r') as f:
+            zf.writestr(module, f.read())
+    zf.write('router_model.npz', 'router_model.npz')
 zip_buffer.seek(0)
 print("   ✅ Package created\n")
 
@@ -46,4 +56,10 @@ print("  ✅ Domain-specific follow-up suggestions")
 print("  ✅ Smart action buttons (View Policy, Create Ticket)")
 print("  ✅ Inline feedback collection (👍/👎)")
 print("  ✅ Agent orchestration integration")
+print("  ✅ Pooled, rate-limit-aware Slack client")
+print("  ✅ Multi-turn threads reuse their routing decision")
+print("  ✅ Co-located supervisor (SUPERVISOR_MODE=local)")
+print("  ✅ Streamed answers (STREAM_RESPONSES=true)")
+print("  ✅ Idempotent event processing (Slack retries suppressed)")
+print("  ✅ Ack-then-process mode (PROCESSING_MODE=async, see deploy_work_queue.py)")
 print("\nSlack is now the complete UX layer!")
@@ -0,0 +1,72 @@
+import boto3
+import json
+
+REGION = 'ap-southeast-1'
+ACCOUNT_ID = '026138522123'
+
+sqs = boto3.client('sqs', region_name=REGION)
+lambda_client = boto3.client('lambda', region_name=REGION)
+
+function_name = 'hcg-demo-webhook-handler'
+
+print("="*70)
+print("🚀 Deploying Webhook Work Queue")
+print("="*70 + "\n")
+
+# 1. Create queues (dead-letter queue first)
+print("1. Creating SQS queues...")
+dlq = sqs.create_queue(
+    QueueName='hcg-demo-webhook-jobs-dlq',
+    Attributes={'MessageRetentionPeriod': '1209600'}
+)
+dlq_arn = sqs.get_queue_attributes(
+    QueueUrl=dlq['QueueUrl'],
+    AttributeNames=['QueueArn']
+)['Attributes']['QueueArn']
+
+queue = sqs.create_queue(
+    QueueName='hcg-demo-webhook-jobs',
+    Attributes={
+        # Must exceed the webhook Lambda timeout
+        'VisibilityTimeout': '180',
+        'RedrivePolicy': json.dumps({'deadLetterTargetArn': dlq_arn, 'maxReceiveCount': '3'})
+    }
+)
+queue_url = queue['QueueUrl']
+queue_arn = sqs.get_queue_attributes(
+    QueueUrl=queue_url,
+    AttributeNames=['QueueArn']
+)['Attributes']['QueueArn']
+print(f"   ✅ Queue: {queue_url}\n")
+
+# 2. Feed the queue back into the webhook Lambda (worker stage)
+print("2. Creating event source mapping...")
+try:
+    lambda_client.create_event_source_mapping(
+        EventSourceArn=queue_arn,
+        FunctionName=function_name,
+        BatchSize=1
+    )
+    print("   ✅ Mapping created\n")
+except lambda_client.exceptions.ResourceConflictException:
+    print("   ✅ Mapping already exists\n")
+
+# 3. Switch the webhook to ack-then-process mode
+print("3. Enabling async processing mode...")
+config = lambda_client.get_function_configuration(FunctionName=function_name)
+variables = config.get('Environment', {}).get('Variables', {})
+variables.update({
+    'PROCESSING_MODE': 'async',
+    'WORK_QUEUE_URL': queue_url
+})
+lambda_client.update_function_configuration(
+    FunctionName=function_name,
+    Environment={'Variables': variables}
+)
+print("   ✅ PROCESSING_MODE=async\n")
+
+print("="*70)
+print("✅ Webhook Work Queue Deployed")
+print("="*70)
+print("\nNote: the webhook role needs sqs:SendMessage, sqs:ReceiveMessage,")
+print("sqs:DeleteMessage and sqs:GetQueueAttributes on the queue.")
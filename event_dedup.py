@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+
+DEDUP_TABLE = 'hcg-demo-processed-events'
+
+# Slack retries within minutes; keep claims a little longer than that
+DEDUP_TTL_SECONDS = 3600
+LRU_MAX_SIZE = 2048
+
+class EventDeduplicator:
+    """Claims Slack event keys once: in-container LRU first, then a conditional DynamoDB write"""
+
+    def __init__(self, table=None, max_size=LRU_MAX_SIZE, ttl=DEDUP_TTL_SECONDS):
+        self.table = table
+        self.max_size = max_size
+        self.ttl = ttl
+        self.seen = OrderedDict()
+        self.stats = {'checked': 0, 'suppressed': 0, 'suppressed_local': 0, 'suppressed_remote': 0}
+
+    def _remember(self, key):
+        self.seen[key] = True
+        self.seen.move_to_end(key)
+        while len(self.seen) > self.max_size:
+            self.seen.popitem(last=False)
+
+    def claim(self, key):
+        """Return True if this is the first time the key is seen, False for duplicates"""
+        if not key:
+            return True
+
+        self.stats['checked'] += 1
+
+        if key in self.seen:
+            self.seen.move_to_end(key)
+            self.stats['suppressed'] += 1
+            self.stats['suppressed_local'] += 1
+            return False
+
+        if self.table is not None:
+            now = int(time.time())
+            try:
+                self.table.put_item(
+                    Item={'eventKey': key, 'timestamp': now, 'ttl': now + self.ttl},
+                    ConditionExpression='attribute_not_exists(eventKey)'
+                )
+            except Exception as e:
+                # botocore ClientError, matched by code to keep botocore off the import path
+                error_code = getattr(e, 'response', {}).get('Error', {}).get('Code')
+                if error_code == 'ConditionalCheckFailedException':
+                    self._remember(key)
+                    self.stats['suppressed'] += 1
+                    self.stats['suppressed_remote'] += 1
+                    return False
+                # Fail open: a dedup outage must not drop user questions
+
+        self._remember(key)
+        return True
+
+    def release(self, key):
+        """Forget a claim whose processing failed, so Slack's retry is handled"""
+        if not key:
+            return
+
+        self.seen.pop(key, None)
+        if self.table is not None:
+            try:
+                self.table.delete_item(Key={'eventKey': key})
+            except Exception as e:
+                # The retry will be suppressed until the claim's TTL runs out
+                print(f"Failed to release event claim {key}: {str(e)}")
+
+def get_event_key(body):
+    """Idempotency key for a Slack payload (event_id, or action_ts for block actions)"""
+    if body.get('type') == 'event_callback':
+        event_id = body.get('event_id')
+        return f"event:{event_id}" if event_id else None
+
+    if body.get('type') == 'block_actions':
+        actions = body.get('actions') or []
+        action_ts = actions[0].get('action_ts') if actions else None
+        return f"action:{action_ts}" if action_ts else None
+
+    return None
@@ -0,0 +1,141 @@
+import re
+
+# Lexical grounding of an answer in its retrieved passages: how much of each sentence
+# is backed by cited text, and which numbers, dates and email addresses are not.
+# Runs on every answer in well under a millisecond; the LLM judge (llm_evaluator.py)
+# is only needed when this is inconclusive.
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n+')
+# "1." / "2)" list markers are formatting, not facts
+LIST_MARKER = re.compile(r'^\s*\d{1,2}[.)]\s', re.MULTILINE)
+# "1,000" and "1000" are the same number
+THOUSANDS_SEPARATOR = re.compile(r',(?<=\d,)(?=\d)')
+EMAIL = re.compile(r'[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}')
+
+# Punctuation becomes whitespace, so words are a str.split() away (much faster than
+# a word regex over several kilobytes of passages)
+_PUNCTUATION = ''.join(chr(c) for c in range(128) if not chr(c).isalnum() and not chr(c).isspace()) + '‘’“”–—…•·'
+WORD_TABLE = str.maketrans(_PUNCTUATION, ' ' * len(_PUNCTUATION))
+
+MONTHS = {
+    'january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+    'november', 'december', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec'
+}
+
+STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 'am', 'do', 'does', 'did', 'can', 'could',
+    'will', 'would', 'should', 'may', 'might', 'must', 'shall', 'have', 'has', 'had', 'i', 'you', 'your',
+    'we', 'our', 'they', 'their', 'it', 'its', 'this', 'that', 'these', 'those', 'to', 'of', 'for', 'in',
+    'on', 'at', 'by', 'with', 'from', 'as', 'and', 'or', 'but', 'if', 'so', 'not', 'no', 'please', 'also',
+    'any', 'all', 'there', 'here', 'about', 'into', 'than', 'then', 'which', 'who', 'what', 'when', 'how'
+}
+
+# A sentence with less support than this counts as unsupported
+SENTENCE_SUPPORT_MIN = 0.5
+
+def citation_text(citation):
+    """Passage text of a retrieved reference, or of the supervisor's citation summary"""
+    content = citation.get('content', '')
+    if isinstance(content, dict):
+        return content.get('text', '')
+    return content or ''
+
+def words(text):
+    """Lowercase words and numbers, punctuation dropped"""
+    return THOUSANDS_SEPARATOR.sub('', text.lower()).translate(WORD_TABLE).split()
+
+def numbers(tokens):
+    return {token for token in tokens if token.isdigit()}
+
+def dated_months(tokens, present=None):
+    """Month names next to a number ("12 March", "March 2024"); "may" is usually a verb"""
+    months = set()
+    for month in MONTHS.intersection(tokens if present is None else present):
+        i = -1
+        try:
+            while True:
+                i = tokens.index(month, i + 1)
+                before = tokens[i - 1] if i else ''
+                after = tokens[i + 1] if i + 1 < len(tokens) else ''
+                # "12th" counts as a number
+                if before[:1].isdigit() or after[:1].isdigit():
+                    months.add(month[:3])
+                    break
+        except ValueError:
+            pass
+    return months
+
+def emails(text):
+    """Lowercase email addresses, found from each '@' rather than by scanning every word"""
+    found = set()
+    text = text.lower()
+    at = text.find('@')
+    while at >= 0:
+        start = max(text.rfind(c, 0, at) for c in ' \n\t(<') + 1
+        match = EMAIL.match(text, start) if start < at else None
+        if match:
+            found.add(match.group())
+        at = text.find('@', at + 1)
+    return found
+
+class CitationIndex:
+    """Word, word-pair and fact lookups over the cited passages"""
+
+    def __init__(self, texts):
+        self.text = '\n'.join(texts).lower()
+        tokens = words(self.text)
+        self.words = set(tokens)
+        # Word pairs are looked up as substrings, which is cheaper than building a set
+        self.joined = f" {' '.join(tokens)} "
+        self.numbers = numbers(self.words)
+        self.months = dated_months(tokens, self.words)
+
+    def support(self, tokens):
+        """(share of a sentence's content words and word pairs found in the passages,
+        number of content words), or None for sentences with no content words"""
+        content = [token for token in tokens if token not in STOPWORDS]
+        if not content:
+            return None
+        unigram = sum(token in self.words for token in content) / len(content)
+        if len(tokens) < 2:
+            return unigram, len(content)
+        pairs = sum(f' {a} {b} ' in self.joined for a, b in zip(tokens, tokens[1:]))
+        return (unigram + pairs / (len(tokens) - 1)) / 2, len(content)
+
+def score_grounding(response, citations):
+    """Lexical grounding of a response in its citations, or None when the citations
+    carry no passage text to check against"""
+    texts = [text for text in map(citation_text, citations or []) if text]
+    if not texts:
+        return None
+
+    index = CitationIndex(texts)
+    response = LIST_MARKER.sub(' ', response)
+    supported = total = 0.0
+    sentences = unsupported = 0
+    response_tokens = []
+    for sentence in SENTENCE_BREAK.split(response):
+        tokens = words(sentence)
+        response_tokens.extend(tokens)
+        result = index.support(tokens)
+        if result is None:
+            continue
+        support, weight = result
+        sentences += 1
+        supported += support * weight
+        total += weight
+        if support < SENTENCE_SUPPORT_MIN:
+            unsupported += 1
+
+    facts = sorted(numbers(response_tokens) - index.numbers)
+    facts += sorted(dated_months(response_tokens) - index.months)
+    if '@' in response:
+        # Addresses are rare in answers, so they are looked up in the passages directly
+        facts += sorted(email for email in emails(response) if email not in index.text)
+
+    return {
+        'score': supported / total if total else 1.0,
+        'sentences': sentences,
+        'unsupported_sentences': unsupported,
+        'unsupported_facts': facts
+    }
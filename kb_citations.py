@@ -0,0 +1,59 @@
+# Citations as they travel from Bedrock to Slack. invoke_agent attributions and knowledge
+# base retrieve results both become
+#
+#   {'content': passage text, 'location': source URI, 'chunk_id': ..., 'score': ..., 'domain': ...}
+#
+# 'content' and 'location' keep the names the Slack renderer and cached answers already
+# use. 'score' is the retrieve relevance score; agent attributions carry none (None).
+
+SOURCE_URI_KEY = 'x-amz-bedrock-kb-source-uri'
+CHUNK_ID_KEY = 'x-amz-bedrock-kb-chunk-id'
+
+# Where each data source type keeps its document address
+LOCATION_FIELDS = (
+    ('s3Location', 'uri'),
+    ('webLocation', 'url'),
+    ('confluenceLocation', 'url'),
+    ('sharePointLocation', 'url'),
+    ('salesforceLocation', 'url'),
+    ('kendraDocumentLocation', 'uri'),
+    ('customDocumentLocation', 'id')
+)
+
+def source_uri(reference):
+    """Document address of a Bedrock reference, whatever its data source type"""
+    location = reference.get('location', {})
+    for location_type, field in LOCATION_FIELDS:
+        uri = location.get(location_type, {}).get(field)
+        if uri:
+            return uri
+    return reference.get('metadata', {}).get(SOURCE_URI_KEY, '')
+
+def from_reference(reference, domain):
+    """Citation for one retrievedReferences / retrievalResults item"""
+    metadata = reference.get('metadata', {})
+    score = reference.get('score')
+    return {
+        'content': reference.get('content', {}).get('text', ''),
+        'location': source_uri(reference),
+        'chunk_id': metadata.get(CHUNK_ID_KEY),
+        'score': float(score) if score is not None else None,
+        'domain': domain
+    }
+
+def from_references(references, domain):
+    return [from_reference(reference, domain) for reference in references]
+
+def top_sources(citations, limit=3):
+    """Most relevant citation per document, best first (unscored ones keep their order, last)"""
+    ranked = sorted(citations, key=lambda citation: -citation['score'] if citation.get('score') is not None else 0)
+    sources = []
+    seen = set()
+    for citation in ranked:
+        location = citation.get('location') or citation.get('content', '')
+        if location not in seen:
+            seen.add(location)
+            sources.append(citation)
+            if len(sources) == limit:
+                break
+    return sources
@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import time
+
+from aws_clients import lazy_client
+from kb_citations import from_references
+from resilience import BEDROCK_CLIENT_CONFIG
+import tracing
+
+# FAQ answers without agent orchestration: one knowledge base retrieve plus one generation.
+bedrock_agent_runtime = lazy_client('bedrock-agent-runtime', **BEDROCK_CLIENT_CONFIG)
+bedrock_runtime = lazy_client('bedrock-runtime', **BEDROCK_CLIENT_CONFIG)
+
+KNOWLEDGE_BASES = {
+    'hr': 'H0LFPBHIAK',
+    'it': 'X1VW7AMIK8',
+    'finance': '1MFT5GZYTT',
+    'general': 'BOLGBDCUAZ'
+}
+
+FAST_PATH_MODEL_ID = os.environ.get('FAST_PATH_MODEL_ID', 'anthropic.claude-3-haiku-20240307-v1:0')
+NUMBER_OF_RESULTS = 5
+MAX_TOKENS = 600
+MAX_CONTEXT_CHARS = 1500
+
+# Requests the agents' ServiceNow action group handles (create incident, incident status)
+ACTION_PATTERN = re.compile(
+    r'\b(?:create|raise|open|log|file|submit|escalate)\b(?:\W+\w+){0,3}?\W+(?:ticket|incident|case)s?\b'
+    r'|\b(?:ticket|incident|case)\s+(?:status|number|update)\b'
+    r'|\bstatus of (?:my|the|a)\s+(?:ticket|incident|case|request)\b'
+    r'|\bmy (?:ticket|incident|case)s?\b'
+    r'|\bINC\d+',
+    re.IGNORECASE
+)
+
+SYSTEM_PROMPT = (
+    "You are the StarHub {domain} assistant. Answer the employee's question using only the "
+    "numbered sources. If the sources do not contain the answer, say you don't know. "
+    "Be concise and do not invent policies, numbers or contacts."
+)
+
+def needs_action_group(query):
+    """True when answering requires an agent tool (e.g. ServiceNow) rather than a KB lookup"""
+    return bool(ACTION_PATTERN.search(query))
+
+def retrieve(domain, query, number_of_results=NUMBER_OF_RESULTS):
+    """Top knowledge base chunks for a query, in retrievedReferences shape"""
+    response = bedrock_agent_runtime.retrieve(
+        knowledgeBaseId=KNOWLEDGE_BASES[domain],
+        retrievalQuery={'text': query},
+        retrievalConfiguration={
+            'vectorSearchConfiguration': {'numberOfResults': number_of_results}
+        }
+    )
+    return response.get('retrievalResults', [])
+
+def build_prompt(query, references):
+    sources = []
+    for i, reference in enumerate(references, 1):
+        text = reference.get('content', {}).get('text', '')[:MAX_CONTEXT_CHARS]
+        sources.append(f"[{i}] {text}")
+    return "Sources:\n" + "\n\n".join(sources) + f"\n\nQuestion: {query}"
+
+def generate(domain, query, references, on_chunk=None):
+    """One model call over the retrieved context; returns (text, usage)"""
+    body = json.dumps({
+        'anthropic_version': 'bedrock-2023-05-31',
+        'max_tokens': MAX_TOKENS,
+        'temperature': 0,
+        'system': SYSTEM_PROMPT.format(domain=domain.upper()),
+        'messages': [{'role': 'user', 'content': build_prompt(query, references)}]
+    })
+
+    if not on_chunk:
+        response = bedrock_runtime.invoke_model(modelId=FAST_PATH_MODEL_ID, body=body)
+        result = json.loads(response['body'].read())
+        text = ''.join(block.get('text', '') for block in result.get('content', []))
+        usage = result.get('usage', {})
+        return text, {'input_tokens': usage.get('input_tokens', 0), 'output_tokens': usage.get('output_tokens', 0)}
+
+    response = bedrock_runtime.invoke_model_with_response_stream(modelId=FAST_PATH_MODEL_ID, body=body)
+    chunks = []
+    usage = {'input_tokens': 0, 'output_tokens': 0}
+    for event in response['body']:
+        data = json.loads(event['chunk']['bytes'])
+        if data['type'] == 'content_block_delta':
+            text = data['delta'].get('text', '')
+            if text:
+                if not chunks:
+                    tracing.mark('kb.first_byte')
+                chunks.append(text)
+                on_chunk(text)
+        elif data['type'] == 'message_start':
+            usage['input_tokens'] = data['message'].get('usage', {}).get('input_tokens', 0)
+        elif data['type'] == 'message_delta':
+            usage['output_tokens'] = data.get('usage', {}).get('output_tokens', 0)
+    return ''.join(chunks), usage
+
+def answer_from_kb(domain, query, on_chunk=None):
+    """Retrieve-then-generate answer in the same shape invoke_agent returns"""
+    start = time.monotonic()
+    try:
+        with tracing.span('kb.retrieve'):
+            references = retrieve(domain, query)
+        retrieved_at = time.monotonic()
+        if references:
+            with tracing.span('kb.generate'):
+                text, usage = generate(domain, query, references, on_chunk=on_chunk)
+        else:
+            # Nothing to ground on: let validation fall back instead of generating
+            text, usage = '', {'input_tokens': 0, 'output_tokens': 0}
+        done = time.monotonic()
+    except Exception as e:
+        return {
+            'response': '',
+            'citations': [],
+            'confidence': 0.0,
+            'error': str(e)
+        }
+
+    return {
+        'response': text,
+        'citations': from_references(references, domain),
+        'confidence': 0.9,
+        'usage': usage,
+        'retrieve_ms': round((retrieved_at - start) * 1000),
+        'done_ms': round((done - start) * 1000)
+    }
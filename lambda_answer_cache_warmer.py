@@ -0,0 +1,99 @@
+import hashlib
+import json
+from collections import Counter, defaultdict
+from datetime import datetime
+
+from answer_cache import iter_question_counts, store_answer
+from query_normalization import normalize_query
+import lambda_supervisor_agent
+
+# Questions asked at least MIN_FREQUENCY times over the last MINING_DAYS days
+# (answer_cache.record_question counts them); top N per domain
+TOP_N_PER_DOMAIN = 25
+MIN_FREQUENCY = 3
+MINING_DAYS = 7
+
+def lambda_handler(event, context):
+    """Nightly job: answer the most frequent questions once and cache the validated responses"""
+    top_n = event.get('top_n', TOP_N_PER_DOMAIN)
+    min_frequency = event.get('min_frequency', MIN_FREQUENCY)
+    days = event.get('days', MINING_DAYS)
+
+    frequent = mine_frequent_queries(top_n, min_frequency, days)
+
+    results = []
+    for domain, queries in frequent.items():
+        for query, frequency in queries:
+            results.append(warm_query(domain, query, frequency))
+
+    cached = sum(1 for r in results if r['cached'])
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Answer cache warmed',
+            'candidates': len(results),
+            'cached': cached,
+            'skipped': len(results) - cached,
+            'results': results,
+            'timestamp': datetime.now().isoformat()
+        })
+    }
+
+def mine_frequent_queries(top_n=TOP_N_PER_DOMAIN, min_frequency=MIN_FREQUENCY, days=MINING_DAYS):
+    """Most frequent normalized queries per domain over the last `days` days, with a
+    representative original wording"""
+    counts = defaultdict(Counter)
+    wording = {}
+
+    for domain, query, asked in iter_question_counts(days):
+        normalized = normalize_query(query)
+        if not normalized:
+            continue
+        counts[domain][normalized] += asked
+        wording.setdefault((domain, normalized), query)
+
+    return {
+        domain: [
+            (wording[(domain, normalized)], count)
+            for normalized, count in counter.most_common(top_n)
+            if count >= min_frequency
+        ]
+        for domain, counter in counts.items()
+    }
+
+def warm_session_id(domain, query):
+    """Bedrock session for warming one question, the same on every run (hash() is salted
+    per process)"""
+    digest = hashlib.sha256(normalize_query(query).encode('utf-8')).hexdigest()[:16]
+    return f"warm-{domain}-{digest}"
+
+def warm_query(domain, query, frequency):
+    """Answer a query through the supervisor pipeline; cache it only if validated with high confidence
+
+    The query is classified exactly as a live first question is, so the cached entry
+    carries the real route confidence and lands under the domain lookups will use.
+    """
+    try:
+        response_data = lambda_supervisor_agent.handle_query(
+            query,
+            warm_session_id(domain, query),
+            use_cache=False
+        )
+    except Exception as e:
+        return {'domain': domain, 'query': query, 'cached': False, 'reason': str(e)[:200]}
+
+    if response_data.get('path') == 'redirect':
+        return {'domain': domain, 'query': query, 'cached': False, 'reason': 'redirect'}
+
+    if not response_data.get('safe_to_respond') or response_data.get('confidence_level') != 'high':
+        return {'domain': domain, 'query': query, 'cached': False, 'reason': 'not validated'}
+
+    domain = response_data['domain']
+
+    # Session-specific fields are filled in per request on a hit
+    for field in ('bedrock_session_id', 'stream', 'routed_by'):
+        response_data.pop(field, None)
+
+    store_answer(domain, query, response_data, frequency)
+    return {'domain': domain, 'query': query, 'cached': True, 'frequency': frequency}
@@ -2,10 +2,11 @@ import json
 import hashlib
 import hmac
 import time
-import boto3
 import os
 
-secrets_client = boto3.client('secretsmanager')
+from aws_clients import lazy_client
+
+secrets_client = lazy_client('secretsmanager', region_name=None)
 cached_secret = None
 
 def get_signing_secret():
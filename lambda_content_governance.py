@@ -1,13 +1,14 @@
 import json
-import boto3
 from datetime import datetime, timedelta
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-1')
-s3 = boto3.client('s3', region_name='ap-southeast-1')
-bedrock_agent = boto3.client('bedrock-agent', region_name='ap-southeast-1')
+from answer_cache import invalidate_domain
+from aws_clients import lazy_client, lazy_table
 
-governance_table = dynamodb.Table('hcg-demo-content-governance')
-owners_table = dynamodb.Table('hcg-demo-document-owners')
+s3 = lazy_client('s3')
+bedrock_agent = lazy_client('bedrock-agent')
+
+governance_table = lazy_table('hcg-demo-content-governance')
+owners_table = lazy_table('hcg-demo-document-owners')
 
 # Zone definitions
 ZONES = {
@@ -58,6 +59,9 @@ def approve_document(event):
     if zone == 'GREEN' and ZONES[zone]['auto_publish']:
         sync_to_kb(doc_id, domain)
     
+    # Cached answers for the domain may cite the old content
+    invalidated = invalidate_cached_answers(domain.lower())
+    
     return {
         'statusCode': 200,
         'body': json.dumps({
@@ -65,7 +69,8 @@ def approve_document(event):
             'document_id': doc_id,
             'zone': zone,
             'review_date': review_date,
-            'auto_published': zone == 'GREEN'
+            'auto_published': zone == 'GREEN',
+            'cache_entries_invalidated': invalidated
         })
     }
 
@@ -110,6 +115,10 @@ def review_document(event):
     if zone == 'RED':
         remove_from_kb(doc_id, current['domain'])
     
+    invalidated = 0
+    if zone != current['zone']:
+        invalidated = invalidate_cached_answers(current['domain'].lower())
+    
     return {
         'statusCode': 200,
         'body': json.dumps({
@@ -117,10 +126,19 @@ def review_document(event):
             'document_id': doc_id,
             'previous_zone': current['zone'],
             'new_zone': zone,
-            'review_date': review_date
+            'review_date': review_date,
+            'cache_entries_invalidated': invalidated
         })
     }
 
+def invalidate_cached_answers(domain):
+    """Drop a domain's cached answers; None if that failed (the zone change still stands)"""
+    try:
+        return invalidate_domain(domain)
+    except Exception as e:
+        print(f"Answer cache invalidation failed for {domain}: {str(e)}")
+        return None
+
 def check_zone(event):
     doc_id = event['document_id']
     
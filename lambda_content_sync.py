@@ -1,15 +1,15 @@
 import json
-import boto3
 from datetime import datetime
 from urllib import request, parse
 
-s3 = boto3.client('s3', region_name='ap-southeast-1')
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-1')
-bedrock_agent = boto3.client('bedrock-agent', region_name='ap-southeast-1')
-ssm = boto3.client('ssm', region_name='ap-southeast-1')
+from aws_clients import lazy_client, lazy_table
 
-owners_table = dynamodb.Table('hcg-demo-document-owners')
-governance_table = dynamodb.Table('hcg-demo-content-governance')
+s3 = lazy_client('s3')
+bedrock_agent = lazy_client('bedrock-agent')
+ssm = lazy_client('ssm')
+
+owners_table = lazy_table('hcg-demo-document-owners')
+governance_table = lazy_table('hcg-demo-content-governance')
 
 # Content source configurations
 SOURCES = {
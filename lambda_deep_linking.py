@@ -1,9 +1,9 @@
 import json
-import boto3
 from datetime import datetime
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-1')
-catalog_table = dynamodb.Table('hcg-demo-resource-catalog')
+from aws_clients import lazy_table
+
+catalog_table = lazy_table('hcg-demo-resource-catalog')
 
 def lambda_handler(event, context):
     action = event.get('action', 'generate_link')
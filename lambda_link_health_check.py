@@ -1,13 +1,13 @@
 import json
-import boto3
 from datetime import datetime
 from urllib import request, error
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-1')
-cloudwatch = boto3.client('cloudwatch', region_name='ap-southeast-1')
+from aws_clients import lazy_client, lazy_table
 
-catalog_table = dynamodb.Table('hcg-demo-resource-catalog')
-health_table = dynamodb.Table('hcg-demo-link-health')
+cloudwatch = lazy_client('cloudwatch')
+
+catalog_table = lazy_table('hcg-demo-resource-catalog')
+health_table = lazy_table('hcg-demo-link-health')
 
 def lambda_handler(event, context):
     resource_id = event.get('resource_id')
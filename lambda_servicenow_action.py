@@ -1,11 +1,12 @@
 import json
-import boto3
 import urllib.request
 import urllib.parse
 import urllib.error
 from datetime import datetime, timedelta
 
-secrets_client = boto3.client('secretsmanager', region_name='ap-southeast-1')
+from aws_clients import lazy_client
+
+secrets_client = lazy_client('secretsmanager')
 
 # Cache for OAuth token
 token_cache = {'token': None, 'expires_at': None}
@@ -1,16 +1,17 @@
 import json
-import boto3
 from urllib import request, parse, error
 from datetime import datetime, timedelta
 import base64
 import ssl
 
+from aws_clients import lazy_client
+
 # Create SSL context that doesn't verify certificates (for dev instances)
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
 ssl_context.verify_mode = ssl.CERT_NONE
 
-ssm = boto3.client('ssm', region_name='ap-southeast-1')
+ssm = lazy_client('ssm')
 
 # Cache for credentials (valid for Lambda execution context)
 _credentials_cache = {}
@@ -1,8 +1,89 @@
+import contextvars
 import json
-import boto3
+import os
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
-bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name='ap-southeast-1')
+import agent_stream
+from answer_cache import get_domain_generation, lookup_answer
+from aws_clients import lazy_client, lazy_table
+from kb_citations import from_references
+from kb_fast_path import answer_from_kb, needs_action_group
+from redirect_router import format_redirect_response, resolve_redirect
+from resilience import BEDROCK_CLIENT_CONFIG, CircuitBreaker, LatencyTracker, hedged_call
+import query_classifier
+from query_normalization import normalize_query
+from semantic_cache import SemanticCache
+from single_flight import INFLIGHT_TABLE, SingleFlight
+import statistical_router
+from slack_stream import SlackStreamRenderer
+import tracing
+
+bedrock_agent_runtime = lazy_client('bedrock-agent-runtime', **BEDROCK_CLIENT_CONFIG)
+
+# Serve pre-warmed answers for frequent questions (see lambda_answer_cache_warmer.py)
+ANSWER_CACHE_ENABLED = os.environ.get('ANSWER_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Reuse validated answers for near-duplicate first questions within this container
+SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'true').lower() == 'true'
+semantic_cache = SemanticCache()
+
+# 'keywords' (query_classifier) or 'statistical' (router_model.npz, needs numpy)
+ROUTER_MODE = os.environ.get('ROUTER_MODE', 'keywords')
+# Below this top probability the statistical router is near its 0.25 uniform guess
+# (unseen wording such as "What is the IT helpdesk number?"); the keyword scorer decides
+ROUTER_MIN_CONFIDENCE = float(os.environ.get('ROUTER_MIN_CONFIDENCE', '0.5'))
+
+# Answer "where is / link to" questions with a catalog deep link, without Bedrock
+REDIRECTS_ENABLED = os.environ.get('REDIRECTS_ENABLED', 'false').lower() == 'true'
+
+# 'agent' always invokes the specialist agent. 'auto' answers confidently routed FAQ
+# questions with one KB retrieve plus one generation (kb_fast_path.py) and keeps the
+# agents for follow-ups and requests needing action groups such as ServiceNow.
+ANSWER_PATH = os.environ.get('ANSWER_PATH', 'agent')
+FAST_PATH_MIN_CONFIDENCE = 0.8
+
+# Partial answers are shown before validation, so only confidently routed questions
+# stream; the rest show the status message until the validated answer replaces it
+STREAM_MIN_CONFIDENCE = float(os.environ.get('STREAM_MIN_CONFIDENCE', '0.8'))
+
+# Citations come from chunk attributions either way; traces only add debugging detail
+AGENT_TRACE_ENABLED = os.environ.get('AGENT_TRACE_ENABLED', 'false').lower() == 'true'
+
+# One structured log line per agent answer, before validation replaces it. Joined with
+# hcg-demo-feedback rows on (session_id, message_ts), these are threshold_replay.py's input.
+ANSWER_LOG_ENABLED = os.environ.get('ANSWER_LOG_ENABLED', 'true').lower() == 'true'
+
+# Ambiguous first questions are sent to the top-k agents concurrently; the answer with the
+# best validated KB confidence wins. Off by default: it multiplies agent invocations.
+FANOUT_ENABLED = os.environ.get('FANOUT_ENABLED', 'false').lower() == 'true'
+FANOUT_TOP_K = int(os.environ.get('FANOUT_TOP_K', '2'))
+FANOUT_DEADLINE_SECONDS = float(os.environ.get('FANOUT_DEADLINE_SECONDS', '20'))
+# Routing counts as ambiguous below this top probability or margin over the runner-up
+FANOUT_MIN_CONFIDENCE = 0.75
+FANOUT_MARGIN = 0.2
+
+fanout_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='fanout')
+fanout_stats = {'fanouts': 0, 'winner_changed': 0, 'deadline_expired': 0, 'cancelled': 0, 'wins': {}}
+
+# Per-agent circuit breakers: after consecutive failures an agent is answered with its
+# domain fallback message immediately, until a trial call succeeds
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('CIRCUIT_FAILURE_THRESHOLD', '5'))
+CIRCUIT_RESET_SECONDS = float(os.environ.get('CIRCUIT_RESET_SECONDS', '30'))
+
+# Hedging: a first question still unanswered after the agent's observed p95 is re-issued
+# on a fresh Bedrock session; whichever finishes first wins
+HEDGE_ENABLED = os.environ.get('HEDGE_ENABLED', 'false').lower() == 'true'
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY_SECONDS = 2.0
+hedge_stats = {'hedged': 0, 'hedge_won': 0}
+
+# Identical first questions asked concurrently (an outage, an all-hands announcement)
+# share one agent call across containers, and its answer for a short window afterwards
+COALESCE_ENABLED = os.environ.get('COALESCE_ENABLED', 'true').lower() == 'true'
+single_flight = SingleFlight(lazy_table(INFLIGHT_TABLE))
 
 # Import safe failure handler
 import sys
@@ -12,7 +93,9 @@ try:
     from safe_failure_handler import (
         validate_response,
         calculate_kb_confidence,
-        get_fallback_response
+        get_fallback_response,
+        sanitize_response,
+        StreamingRedactor
     )
 except ImportError:
     # Inline minimal version if import fails
@@ -34,6 +117,16 @@ except ImportError:
             'confidence': combined,
             'confidence_level': 'high' if combined > 0.8 else 'medium'
         }
+    
+    def get_fallback_response(query, domain):
+        return f"I'm not able to answer that right now. Please contact the {domain.upper()} team directly."
+    
+    def sanitize_response(response):
+        return response
+    
+    class StreamingRedactor:
+        def feed(self, chunk):
+            return chunk
 
 # Agent configurations
 AGENTS = {
@@ -43,71 +136,475 @@ AGENTS = {
     'general': {'id': 'RY3QRSI7VE', 'alias': '9CP8PGSKFQ'}
 }
 
+def get_classifier():
+    """Statistical router when enabled and loadable, keyword scorer otherwise"""
+    if ROUTER_MODE == 'statistical':
+        router = statistical_router.get_router()
+        if router is not None:
+            return router
+    return query_classifier
+
 def classify_query(query):
     """Classify user query to appropriate domain"""
-    query_lower = query.lower()
-    
-    # HR keywords
-    hr_keywords = ['leave', 'vacation', 'maternity', 'paternity', 'benefit', 'insurance', 'medical', 'salary', 'bonus', 'hr', 'employee', 'onboarding']
-    if any(kw in query_lower for kw in hr_keywords):
-        return 'hr', 0.9
-    
-    # IT keywords
-    it_keywords = ['password', 'laptop', 'vpn', 'software', 'install', 'computer', 'network', 'login', 'access', 'it support', 'troubleshoot']
-    if any(kw in query_lower for kw in it_keywords):
-        return 'it', 0.9
-    
-    # Finance keywords
-    finance_keywords = ['expense', 'reimbursement', 'procurement', 'purchase', 'invoice', 'payment', 'budget', 'finance', 'cost']
-    if any(kw in query_lower for kw in finance_keywords):
-        return 'finance', 0.9
-    
-    # Default to general
-    return 'general', 0.7
+    classifier = get_classifier()
+    if classifier is not query_classifier:
+        domain, confidence = classifier.classify(query)
+        if confidence >= ROUTER_MIN_CONFIDENCE:
+            return domain, confidence
+    return query_classifier.classify(query)
+
+def rank_domains(query):
+    """Ranked (domain, probability) distribution for a query"""
+    classifier = get_classifier()
+    if classifier is not query_classifier:
+        ranked = classifier.rank(query)
+        if ranked[0][1] >= ROUTER_MIN_CONFIDENCE:
+            return ranked
+    return query_classifier.rank_domains(query)
+
+def invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None,
+                 callbacks=None):
+    """Invoke specialist agent (on_chunk receives completion text as it streams)
 
-def invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID'):
-    """Invoke specialist agent"""
+    cancel_event: threading.Event; once set, stop reading the event stream.
+    callbacks: extra AgentStreamParser callbacks (first chunk, citations ready, done).
+    """
     try:
-        response = bedrock_agent_runtime.invoke_agent(
-            agentId=agent_id,
-            agentAliasId=alias_id,
-            sessionId=session_id,
-            inputText=query
-        )
+        request = {
+            'agentId': agent_id,
+            'agentAliasId': alias_id,
+            'sessionId': session_id,
+            'inputText': query,
+            'enableTrace': AGENT_TRACE_ENABLED
+        }
+        
+        # Agents only emit the final answer incrementally when asked to
+        if on_chunk:
+            request['streamingConfigurations'] = {'streamFinalResponse': True}
+        
+        response = bedrock_agent_runtime.invoke_agent(**request)
+        
+        callbacks = dict(callbacks or {})
+        if on_chunk:
+            callbacks[agent_stream.CHUNK] = on_chunk
+        first_chunk_callback = callbacks.get(agent_stream.FIRST_CHUNK)
+        
+        def on_first_chunk(text):
+            tracing.mark('agent.first_byte')
+            if first_chunk_callback:
+                first_chunk_callback(text)
         
-        # Extract response
-        completion = ""
-        citations = []
+        callbacks[agent_stream.FIRST_CHUNK] = on_first_chunk
+        parser = agent_stream.AgentStreamParser(callbacks, collect_traces=AGENT_TRACE_ENABLED)
         
         for event in response['completion']:
-            if 'chunk' in event:
-                chunk = event['chunk']
-                if 'bytes' in chunk:
-                    completion += chunk['bytes'].decode('utf-8')
-            
-            if 'trace' in event:
-                trace = event['trace'].get('trace', {})
-                if 'orchestrationTrace' in trace:
-                    orch = trace['orchestrationTrace']
-                    if 'observation' in orch:
-                        obs = orch['observation']
-                        if 'knowledgeBaseLookupOutput' in obs:
-                            kb_output = obs['knowledgeBaseLookupOutput']
-                            if 'retrievedReferences' in kb_output:
-                                citations.extend(kb_output['retrievedReferences'])
+            if cancel_event is not None and cancel_event.is_set():
+                # Release the connection rather than draining an answer nobody reads
+                close = getattr(response['completion'], 'close', None)
+                if close:
+                    close()
+                break
+            parser.feed(event)
         
+        tracing.mark('agent.last_byte')
+        result = parser.finish()
+        result['confidence'] = 0.9
+        return result
+        
+    except Exception as e:
+        # Reported as an error, not as answer text for validation to score
         return {
-            'response': completion,
-            'citations': citations,
-            'confidence': 0.9
+            'response': '',
+            'citations': [],
+            'confidence': 0.0,
+            'error': str(e)
         }
+
+agent_breakers = {
+    domain: CircuitBreaker(domain, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+    for domain in AGENTS
+}
+agent_latency = {domain: LatencyTracker() for domain in AGENTS}
+
+def call_agent(domain, query, session_id, on_chunk=None, cancel_event=None, hedge=False):
+    """invoke_agent behind the agent's circuit breaker, optionally hedged after its p95"""
+    breaker = agent_breakers[domain]
+    if not breaker.allow():
+        tracing.mark(f'circuit_open.{domain}')
+        return {'response': '', 'citations': [], 'confidence': 0.0, 'error': 'circuit_open'}
+    
+    agent_config = AGENTS[domain]
+    start = time.monotonic()
+    hedge_after = agent_latency[domain].percentile(HEDGE_PERCENTILE) if hedge else None
+    
+    if hedge_after is None:
+        result = invoke_agent(
+            agent_config['id'], query, session_id, agent_config['alias'],
+            on_chunk=on_chunk, cancel_event=cancel_event
+        )
+    else:
+        hedge_session_id = f'{session_id}-hedge'
         
-    except Exception as e:
+        def attempt(number, attempt_cancel_event):
+            if number:
+                hedge_stats['hedged'] += 1
+                tracing.annotate(hedge='fired')
+            return invoke_agent(
+                agent_config['id'], query, hedge_session_id if number else session_id,
+                agent_config['alias'], cancel_event=attempt_cancel_event
+            )
+        
+        result, number = hedged_call(
+            attempt, max(hedge_after, HEDGE_MIN_DELAY_SECONDS), fanout_executor,
+            is_error=lambda r: 'error' in r
+        )
+        if number:
+            hedge_stats['hedge_won'] += 1
+            tracing.annotate(hedge='won')
+            result['session_id'] = hedge_session_id
+    
+    if 'error' in result:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+        result['citations'] = from_references(result['citations'], domain)
+        # Cancelled fan-out stragglers say nothing about the agent's latency
+        if cancel_event is None or not cancel_event.is_set():
+            agent_latency[domain].record(time.monotonic() - start)
+    return result
+
+def agent_failure(domain, reason):
+    """Validation-shaped result for an agent call that produced no answer"""
+    return {
+        'safe_to_respond': False,
+        'response': get_fallback_response('', domain),
+        'confidence': 0.0,
+        'confidence_level': 'insufficient',
+        'reason': reason
+    }
+
+def is_fast_path(query, confidence, routed_by):
+    """Whether a question can skip agent orchestration"""
+    return (
+        ANSWER_PATH == 'auto'
+        and routed_by == 'classifier'
+        and confidence >= FAST_PATH_MIN_CONFIDENCE
+        and not needs_action_group(query)
+    )
+
+def use_coalescing(routed_by, use_cache):
+    # Follow-ups depend on the conversation's Bedrock session and are never shared;
+    # use_cache=False callers (the cache warmer) want a fresh answer
+    return COALESCE_ENABLED and use_cache and routed_by == 'classifier'
+
+def fanout_candidates(query):
+    """Top-k (domain, probability) candidates when routing is ambiguous, else None"""
+    ranked = rank_domains(query)[:FANOUT_TOP_K]
+    if len(ranked) < 2:
+        return None
+    
+    top, runner_up = ranked[0][1], ranked[1][1]
+    if top >= FANOUT_MIN_CONFIDENCE and top - runner_up >= FANOUT_MARGIN:
+        return None
+    return ranked
+
+def ask_agent(domain, query, session_id, confidence, cancel_event=None):
+    """Invoke one specialist and validate its answer"""
+    with tracing.span(f'agent.{domain}'):
+        result = call_agent(domain, query, session_id, cancel_event=cancel_event)
+    if 'error' in result:
+        return domain, result, agent_failure(domain, result['error'])
+    with tracing.span(f'validate.{domain}'):
+        validation = validate_response(result['response'], result['citations'], confidence, domain)
+    return domain, result, validation
+
+def fan_out_query(query, session_id, candidates, confidence):
+    """Ask candidate agents concurrently; keep the best validated answer by the deadline
+
+    Every candidate is validated with the same routing confidence, so the winner is
+    decided by KB evidence. Ties go to the higher-ranked domain.
+    """
+    start = time.monotonic()
+    deadline = start + FANOUT_DEADLINE_SECONDS
+    cancel_event = threading.Event()
+    
+    futures = {
+        # Each worker gets a copy of the request context so its spans join this trace
+        fanout_executor.submit(
+            contextvars.copy_context().run, ask_agent, domain, query, session_id, confidence, cancel_event
+        ): rank
+        for rank, (domain, _) in enumerate(candidates)
+    }
+    pending = set(futures)
+    best, best_key = None, None
+    expired = False
+    
+    while pending:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            fanout_stats['deadline_expired'] += 1
+            expired = True
+            break
+        
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                outcome = future.result()
+            except Exception:
+                continue
+            validation = outcome[2]
+            key = (validation['safe_to_respond'], validation['confidence'], -futures[future])
+            if best_key is None or key > best_key:
+                best, best_key = outcome, key
+        
+        # A high-confidence answer cannot be beaten by enough to justify waiting
+        if best and best[2]['safe_to_respond'] and best[2]['confidence_level'] == 'high':
+            break
+    
+    # Stop stragglers: queued calls never start, running ones stop reading their stream
+    cancel_event.set()
+    for future in pending:
+        future.cancel()
+    fanout_stats['cancelled'] += len(pending)
+    
+    top_domain = candidates[0][0]
+    if best is None:
+        best = (top_domain, {'response': '', 'citations': []}, agent_failure(top_domain, 'deadline'))
+    
+    winner = best[0]
+    fanout_stats['fanouts'] += 1
+    fanout_stats['wins'][winner] = fanout_stats['wins'].get(winner, 0) + 1
+    if winner != top_domain:
+        fanout_stats['winner_changed'] += 1
+    
+    fanout_info = {
+        'candidates': [domain for domain, _ in candidates],
+        'winner': winner,
+        'winner_changed': winner != top_domain,
+        'deadline_expired': expired,
+        'cancelled': len(pending),
+        'elapsed_ms': round((time.monotonic() - start) * 1000)
+    }
+    # fanout_stats only lives as long as the container; the trace record is what
+    # trace_report.py aggregates
+    tracing.annotate(fanout=fanout_info)
+    return best + (fanout_info,)
+
+def log_answer(query, domain, confidence, result, validation, log_context):
+    """Emit the agent's answer as it was before validation, for threshold replay"""
+    record = {
+        'type': 'answer',
+        'session_id': log_context.get('session_id'),
+        'message_ts': log_context.get('message_ts'),
+        'query': query,
+        'domain': domain,
+        'response': result['response'],
+        'citations': result['citations'],
+        'query_confidence': confidence,
+        'confidence_level': validation['confidence_level'],
+        'safe_to_respond': validation['safe_to_respond']
+    }
+    if 'grounding' in validation:
+        record['grounding'] = validation['grounding']
+    print(json.dumps(record, separators=(',', ':'), default=str))
+
+def handle_query(query, session_id, stream_to=None, route=None, use_cache=True, user_email=None, message_ts=None):
+    """Supervisor pipeline: classify, invoke specialist, validate (callable in-process)
+
+    route: routing decision already made for this conversation; skips the classifier.
+    use_cache: consult the pre-warmed answer and semantic caches before invoking the agent
+        (first questions only).
+    user_email: passed to deep link generation for redirectional questions.
+    message_ts: Slack message the answer is posted as; logged with the answer so
+        feedback on that message can be joined to it.
+    """
+    log_context = {'session_id': session_id, 'message_ts': message_ts}
+    
+    if route and route.get('domain') in AGENTS:
+        # Follow-up in a known thread: reuse the domain and Bedrock session
+        domain = route['domain']
+        confidence = route.get('confidence') or 0.9
+        session_id = route.get('bedrock_session_id') or session_id
+        routed_by = 'conversation'
+    else:
+        # Classify query
+        with tracing.span('classify'):
+            domain, confidence = classify_query(query)
+        routed_by = 'classifier'
+    
+    agent_config = AGENTS[domain]
+    agent_id = agent_config['id']
+    
+    # Requests the agents can act on (e.g. "create a ticket") are not turned into links,
+    # nor are follow-ups such as the "View leave policy" button, which continue a thread
+    redirect_info = None
+    if REDIRECTS_ENABLED and routed_by == 'classifier' and not needs_action_group(query):
+        with tracing.span('redirect'):
+            redirect_info = resolve_redirect(query, domain, user_email)
+    if redirect_info:
         return {
-            'response': f"Error invoking agent: {str(e)}",
+            'query': query,
+            'domain': domain,
+            'agent_id': agent_id,
+            'routed_by': routed_by,
+            'route_confidence': confidence,
+            'bedrock_session_id': session_id,
+            'path': 'redirect',
+            'confidence': 1.0,
+            'confidence_level': 'high',
+            'safe_to_respond': True,
+            'response': format_redirect_response(redirect_info),
             'citations': [],
-            'confidence': 0.0
+            'redirect': redirect_info
         }
+    
+    # Cached answers are for first questions only: follow-ups depend on the
+    # conversation's Bedrock session
+    if use_cache and ANSWER_CACHE_ENABLED and routed_by == 'classifier':
+        with tracing.span('cache.answer'):
+            cached = lookup_answer(domain, query)
+        if cached:
+            cached.update({
+                'query': query,
+                'routed_by': routed_by,
+                'bedrock_session_id': session_id,
+                'cache': 'hit'
+            })
+            return cached
+    
+    use_semantic_cache = use_cache and SEMANTIC_CACHE_ENABLED and routed_by == 'classifier'
+    if use_semantic_cache:
+        with tracing.span('cache.semantic'):
+            semantic_cache.sync_generation(domain, get_domain_generation(domain))
+            match = semantic_cache.lookup(domain, query)
+        if match:
+            cached, similarity = match
+            cached = dict(cached)
+            cached.update({
+                'query': query,
+                'route_confidence': confidence,
+                'bedrock_session_id': session_id,
+                'cache': 'semantic',
+                'cache_similarity': round(similarity, 3)
+            })
+            return cached
+    
+    if use_coalescing(routed_by, use_cache):
+        # Identical first questions in flight elsewhere share one Bedrock call
+        key = f'{domain}#{normalize_query(query)}'
+        response_data, shared = single_flight.run(
+            key,
+            lambda: answer_query(query, session_id, domain, confidence, routed_by, stream_to, use_semantic_cache, log_context),
+            shareable=lambda data: 'agent_error' not in data
+        )
+        if shared:
+            # Timing, usage and stream stats belong to the leader's Bedrock call
+            for field in ('timing', 'usage', 'stream'):
+                response_data.pop(field, None)
+            response_data.update({
+                'query': query,
+                'route_confidence': confidence,
+                'bedrock_session_id': session_id,
+                'cache': 'coalesced',
+                'coalesced': shared
+            })
+        return response_data
+    
+    return answer_query(query, session_id, domain, confidence, routed_by, stream_to, use_semantic_cache, log_context)
+
+def answer_query(query, session_id, domain, confidence, routed_by, stream_to=None, use_semantic_cache=False,
+                 log_context=None):
+    """Answer a routed question with the specialist agent (or KB fast path) and validate it"""
+    agent_id = AGENTS[domain]['id']
+    
+    candidates = None
+    if FANOUT_ENABLED and routed_by == 'classifier':
+        candidates = fanout_candidates(query)
+    
+    fanout_info = None
+    stream_stats = None
+    path = 'agent'
+    if candidates:
+        # Several answers race, so none of them is streamed
+        domain, result, validation, fanout_info = fan_out_query(query, session_id, candidates, confidence)
+        agent_id = AGENTS[domain]['id']
+    else:
+        # Stream partial output into the caller's Slack status message
+        renderer = None
+        if stream_to and confidence >= STREAM_MIN_CONFIDENCE:
+            renderer = SlackStreamRenderer(
+                stream_to['channel'],
+                stream_to['ts'],
+                redactor=StreamingRedactor()
+            )
+        
+        if is_fast_path(query, confidence, routed_by):
+            result = answer_from_kb(domain, query, on_chunk=renderer.on_chunk if renderer else None)
+            path = 'kb_direct'
+        else:
+            # Invoke specialist agent (streamed answers cannot be hedged)
+            with tracing.span('agent'):
+                result = call_agent(
+                    domain, query, session_id,
+                    on_chunk=renderer.on_chunk if renderer else None,
+                    hedge=HEDGE_ENABLED and routed_by == 'classifier' and not renderer
+                )
+            path = 'agent'
+        stream_stats = renderer.finish() if renderer else None
+        
+        if 'error' in result:
+            # Open circuit, timeout or service error: domain fallback, nothing to validate
+            validation = agent_failure(domain, result['error'])
+        else:
+            # Validate response with safe failure handling
+            with tracing.span('validate'):
+                validation = validate_response(
+                    result['response'],
+                    result['citations'],
+                    confidence,
+                    domain
+                )
+    
+    if ANSWER_LOG_ENABLED and log_context is not None and 'error' not in result:
+        log_answer(query, domain, confidence, result, validation, log_context)
+    
+    # Format response with validation results
+    response_data = {
+        'query': query,
+        'domain': domain,
+        'agent_id': agent_id,
+        'routed_by': routed_by,
+        'route_confidence': confidence,
+        'bedrock_session_id': result.get('session_id', session_id),
+        'path': path,
+        'confidence': validation['confidence'],
+        'confidence_level': validation['confidence_level'],
+        'safe_to_respond': validation['safe_to_respond'],
+        'response': validation['response'],
+        'citations': result['citations'] if validation['safe_to_respond'] else []
+    }
+    
+    if use_semantic_cache and validation['safe_to_respond'] and validation['confidence_level'] != 'low':
+        semantic_cache.store(domain, query, dict(response_data))
+    
+    if result.get('done_ms') is not None:
+        response_data['timing'] = {
+            'first_chunk_ms': result.get('first_chunk_ms'),
+            'retrieve_ms': result.get('retrieve_ms'),
+            'done_ms': result['done_ms']
+        }
+    if result.get('usage'):
+        response_data['usage'] = result['usage']
+    if validation.get('grounding'):
+        response_data['grounding'] = validation['grounding']
+    if 'error' in result:
+        response_data['agent_error'] = result['error']
+    if stream_stats:
+        response_data['stream'] = stream_stats
+    if fanout_info:
+        response_data['fanout'] = fanout_info
+    
+    return response_data
 
 def lambda_handler(event, context):
     """Supervisor agent - routes queries to specialists"""
@@ -118,46 +615,25 @@ def lambda_handler(event, context):
         query = body.get('query', '')
         session_id = body.get('session_id', 'default-session')
         
+        # Joins the webhook's trace through the shared trace id
+        tracing.start_trace(body.get('trace_id'), service='supervisor')
+        
         if not query:
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': 'Query is required'})
             }
         
-        # Classify query
-        domain, confidence = classify_query(query)
-        agent_config = AGENTS[domain]
-        agent_id = agent_config['id']
-        alias_id = agent_config['alias']
-        
-        # Invoke specialist agent
-        result = invoke_agent(agent_id, query, session_id, alias_id)
-        
-        # Validate response with safe failure handling
-        validation = validate_response(
-            result['response'],
-            result['citations'],
-            confidence,
-            domain
+        response_data = handle_query(
+            query,
+            session_id,
+            stream_to=body.get('stream_to'),
+            route=body.get('route'),
+            use_cache=body.get('use_cache', True),
+            user_email=body.get('user_email'),
+            message_ts=body.get('message_ts')
         )
-        
-        # Format response with validation results
-        response_data = {
-            'query': query,
-            'domain': domain,
-            'agent_id': agent_id,
-            'confidence': validation['confidence'],
-            'confidence_level': validation['confidence_level'],
-            'safe_to_respond': validation['safe_to_respond'],
-            'response': validation['response'],
-            'citations': [
-                {
-                    'content': c.get('content', {}).get('text', ''),
-                    'location': c.get('location', {}).get('s3Location', {}).get('uri', '')
-                }
-                for c in result['citations']
-            ] if validation['safe_to_respond'] else []
-        }
+        tracing.annotate(domain=response_data.get('domain'), path=response_data.get('cache') or response_data.get('path'))
         
         return {
             'statusCode': 200,
@@ -170,3 +646,6 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
         }
+    
+    finally:
+        tracing.finish_trace()
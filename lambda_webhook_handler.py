@@ -1,8 +1,8 @@
 import json
-import boto3
 
-dynamodb = boto3.resource('dynamodb')
-sessions_table = dynamodb.Table('hcg-demo-sessions')
+from aws_clients import lazy_table
+
+sessions_table = lazy_table('hcg-demo-sessions', region_name=None)
 
 def lambda_handler(event, context):
     body = json.loads(event['body'])
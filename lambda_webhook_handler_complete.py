@@ -1,78 +1,54 @@
 import json
-import boto3
 import time
 import os
 
-dynamodb = boto3.resource('dynamodb', region_name='ap-southeast-1')
-lambda_client = boto3.client('lambda', region_name='ap-southeast-1')
-secrets_client = boto3.client('secretsmanager', region_name='ap-southeast-1')
+from answer_cache import record_question
+from aws_clients import lazy_client, lazy_table
+from conversation_store import ConversationStore
+from event_dedup import EventDeduplicator, get_event_key, DEDUP_TABLE
+from kb_citations import top_sources
+from slack_client import get_bot_token, get_slack_client
+import tracing
+from write_behind import WriteBehindBuffer, register_shutdown_flush
+from work_queue import get_work_queue, is_queue_event, jobs_from_queue_event
 
-sessions_table = dynamodb.Table('hcg-demo-sessions')
-feedback_table = dynamodb.Table('hcg-demo-feedback')
+lambda_client = lazy_client('lambda')
+secrets_client = lazy_client('secretsmanager')
+
+sessions_table = lazy_table('hcg-demo-sessions')
+feedback_table = lazy_table('hcg-demo-feedback')
+event_dedup = EventDeduplicator(lazy_table(DEDUP_TABLE))
+
+# Feedback records are written behind the user-visible work. Conversation records are
+# written after the answer is posted, with a version check (see conversation_store.py)
+feedback_writer = WriteBehindBuffer(feedback_table, key_names=['feedbackId', 'timestamp'])
+register_shutdown_flush(feedback_writer)
+conversation_store = ConversationStore(sessions_table)
+
+# 'inline' processes in the request; 'async' acks immediately and hands
+# the work to the worker stage through the work queue
+PROCESSING_MODE = os.environ.get('PROCESSING_MODE', 'inline')
+# 'remote' invokes the supervisor Lambda; 'local' imports and runs it in-process
+SUPERVISOR_MODE = os.environ.get('SUPERVISOR_MODE', 'remote')
+STREAM_RESPONSES = os.environ.get('STREAM_RESPONSES', 'false').lower() == 'true'
+# Slack's limit on a button's value
+BUTTON_VALUE_MAX_CHARS = 2000
+work_queue = None
 
 def get_slack_token():
-    """Get Slack token from Secrets Manager"""
-    response = secrets_client.get_secret_value(SecretId='hcg-demo/slack/credentials')
-    secret = json.loads(response['SecretString'])
-    return secret['bot_token']
+    """Get Slack token from Secrets Manager (cached per container)"""
+    return get_bot_token(secrets_client)
 
 def post_slack_message(channel, text, thread_ts=None, blocks=None):
     """Post message to Slack"""
-    import urllib.request
-    import urllib.parse
-    
-    token = get_slack_token()
-    
-    payload = {
-        'channel': channel,
-        'text': text,
-        'thread_ts': thread_ts
-    }
-    
-    if blocks:
-        payload['blocks'] = blocks
-    
-    req = urllib.request.Request(
-        'https://slack.com/api/chat.postMessage',
-        data=json.dumps(payload).encode(),
-        headers={
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-    )
-    
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read().decode())
+    return get_slack_client().post_message(channel, text, thread_ts, blocks)
 
-def update_slack_message(channel, ts, text, blocks=None):
-    """Update existing Slack message"""
-    import urllib.request
-    
-    token = get_slack_token()
-    
-    payload = {
-        'channel': channel,
-        'ts': ts,
-        'text': text
-    }
-    
-    if blocks:
-        payload['blocks'] = blocks
-    
-    req = urllib.request.Request(
-        'https://slack.com/api/chat.update',
-        data=json.dumps(payload).encode(),
-        headers={
-            'Authorization': f'Bearer {token}',
-            'Content-Type': 'application/json'
-        }
-    )
-    
-    with urllib.request.urlopen(req) as response:
-        return json.loads(response.read().decode())
+def update_slack_message(channel, ts, text, blocks=None, final=True):
+    """Update existing Slack message (non-final updates may be coalesced)"""
+    return get_slack_client().update_message(channel, ts, text, blocks, final=final)
 
-def format_response_with_citations(response_text, citations, domain):
-    """Format response with Slack Block Kit"""
+def format_response_with_citations(response_text, citations, domain, route=None):
+    """Format response with Slack Block Kit (route is carried into follow-up buttons)"""
     blocks = [
         {
             "type": "section",
@@ -83,13 +59,14 @@ def format_response_with_citations(response_text, citations, domain):
         }
     ]
     
-    # Add citations
+    # Add citations: the most relevant passage of each document, best first
     if citations:
         citation_text = "*Sources:*\n"
-        for i, cite in enumerate(citations[:3], 1):
+        for i, cite in enumerate(top_sources(citations), 1):
             content = cite.get('content', '')[:100]
-            location = cite.get('location', 'Unknown')
-            citation_text += f"{i}. {content}... _({location})_\n"
+            location = cite.get('location') or 'Unknown'
+            relevance = f", relevance {cite['score']:.2f}" if cite.get('score') is not None else ''
+            citation_text += f"{i}. {content}... _({location}{relevance})_\n"
         
         blocks.append({
             "type": "section",
@@ -108,7 +85,7 @@ def format_response_with_citations(response_text, citations, domain):
                 {
                     "type": "button",
                     "text": {"type": "plain_text", "text": suggestion},
-                    "value": suggestion,
+                    "value": encode_followup_value(suggestion, route),
                     "action_id": f"followup_{i}"
                 }
                 for i, suggestion in enumerate(follow_ups[:3])
@@ -136,6 +113,41 @@ def format_response_with_citations(response_text, citations, domain):
     
     return blocks
 
+def route_from_result(result):
+    """Routing decision of an answer, for reuse by follow-ups"""
+    return {
+        'domain': result.get('domain'),
+        'agent_id': result.get('agent_id'),
+        'confidence': result.get('route_confidence'),
+        'bedrock_session_id': result.get('bedrock_session_id')
+    }
+
+def encode_followup_value(suggestion, route=None):
+    """Button value carrying the parent answer's routing context
+
+    Slack rejects the whole message if a button value exceeds BUTTON_VALUE_MAX_CHARS,
+    so an oversized value is sent as the plain suggestion; the follow-up then takes
+    the thread's stored route instead.
+    """
+    if route and route.get('domain'):
+        value = json.dumps({'query': suggestion, 'route': route}, separators=(',', ':'))
+        if len(value) <= BUTTON_VALUE_MAX_CHARS:
+            return value
+    return suggestion[:BUTTON_VALUE_MAX_CHARS]
+
+def decode_followup_value(value):
+    """Inverse of encode_followup_value; plain values come from older messages, and
+    anything that is not a well-formed encoded value is treated as one"""
+    if value.startswith('{'):
+        try:
+            data = json.loads(value)
+        except ValueError:
+            return value, None
+        if isinstance(data, dict) and isinstance(data.get('query'), str):
+            route = data.get('route')
+            return data['query'], route if isinstance(route, dict) and route.get('domain') else None
+    return value, None
+
 def get_follow_up_suggestions(domain):
     """Get domain-specific follow-up suggestions"""
     suggestions = {
@@ -146,16 +158,47 @@ def get_follow_up_suggestions(domain):
     }
     return suggestions.get(domain, ["Ask another question"])
 
-def invoke_supervisor(query, session_id):
-    """Invoke supervisor orchestrator"""
+def invoke_supervisor(query, session_id, stream_to=None, route=None, message_ts=None):
+    """Invoke supervisor pipeline in the configured mode"""
+    if SUPERVISOR_MODE == 'local':
+        return invoke_supervisor_local(query, session_id, stream_to, route, message_ts)
+    return invoke_supervisor_remote(query, session_id, stream_to, route, message_ts)
+
+def invoke_supervisor_local(query, session_id, stream_to=None, route=None, message_ts=None):
+    """Run the supervisor pipeline co-located in this container"""
+    import lambda_supervisor_agent
+    
+    try:
+        return lambda_supervisor_agent.handle_query(query, session_id, stream_to, route, message_ts=message_ts)
+    except Exception:
+        return {'error': 'Failed to get response'}
+
+def invoke_supervisor_remote(query, session_id, stream_to=None, route=None, message_ts=None):
+    """Invoke supervisor orchestrator Lambda (stream_to: Slack message to render partial output into)"""
+    request = {
+        'query': query,
+        'session_id': session_id
+    }
+    
+    if message_ts:
+        # The answer replaces this message; feedback on it is joined to the answer log
+        request['message_ts'] = message_ts
+    
+    trace = tracing.current_trace()
+    if trace:
+        request['trace_id'] = trace.trace_id
+    
+    if stream_to:
+        request['stream_to'] = stream_to
+    
+    if route:
+        request['route'] = route
+    
     response = lambda_client.invoke(
         FunctionName='hcg-demo-supervisor-orchestrator',
         InvocationType='RequestResponse',
         Payload=json.dumps({
-            'body': json.dumps({
-                'query': query,
-                'session_id': session_id
-            })
+            'body': json.dumps(request)
         })
     )
     
@@ -166,9 +209,188 @@ def invoke_supervisor(query, session_id):
     else:
         return {'error': 'Failed to get response'}
 
+def build_message_job(slack_event):
+    """Build a work item from a Slack message event"""
+    channel_id = slack_event.get('channel')
+    thread_ts = slack_event.get('thread_ts', slack_event.get('ts'))
+    
+    return {
+        'type': 'message',
+        'user_id': slack_event.get('user'),
+        'channel_id': channel_id,
+        'thread_ts': thread_ts,
+        # A top-level message starts a thread, so there is no route to look up
+        'in_thread': 'thread_ts' in slack_event,
+        'query': slack_event.get('text', ''),
+        'session_id': f"{channel_id}_{thread_ts}",
+        'trace_id': tracing.new_trace_id(),
+        'received_at': time.time()
+    }
+
+def build_followup_job(payload, action):
+    """Build a work item from a follow-up button click"""
+    channel_id = payload['channel']['id']
+    message = payload['message']
+    # Answers are posted in the question's thread; key the session on that thread
+    thread_ts = message.get('thread_ts', message['ts'])
+    query, route = decode_followup_value(action['value'])
+    
+    job = {
+        'type': 'followup',
+        'user_id': payload['user']['id'],
+        'channel_id': channel_id,
+        'thread_ts': thread_ts,
+        'in_thread': True,
+        'query': query,
+        'session_id': f"{channel_id}_{thread_ts}",
+        'trace_id': tracing.new_trace_id(),
+        'received_at': time.time()
+    }
+    
+    if route:
+        job['route'] = route
+    
+    return job
+
+def process_job(job):
+    """Worker stage, traced as one request (see tracing.py)"""
+    tracing.start_trace(job.get('trace_id'), service='webhook')
+    if job.get('received_at'):
+        # Time between Slack delivery and the worker picking the job up
+        tracing.annotate(queue_ms=round((time.time() - job['received_at']) * 1000, 1))
+    
+    try:
+        handle_job(job)
+    finally:
+        tracing.finish_trace()
+
+def handle_job(job):
+    """Post status, invoke supervisor, render answer, store conversation"""
+    channel_id = job['channel_id']
+    thread_ts = job['thread_ts']
+    session_id = job['session_id']
+    
+    # A redelivered job may have failed after its answer was posted
+    if job.get('delivery_attempt', 1) > 1 and conversation_store.has_answered(session_id, job.get('event_key')):
+        print(f"Skipping redelivered job {job['event_key']}: already answered")
+        return
+    
+    # Follow-up clicks carry the parent answer's route; known threads reuse theirs
+    route = job.get('route')
+    if route is None and job.get('in_thread', True):
+        route = conversation_store.get_route(session_id)
+    
+    # Post progressive status
+    status_msg = post_slack_message(
+        channel_id,
+        "🤔 Thinking...",
+        thread_ts
+    )
+    
+    # From here on the job must not fail: the queue would redeliver it and post again
+    try:
+        result = answer_in_message(job, route, status_msg['ts'])
+    except Exception as e:
+        print(f"Job {job.get('event_key')} failed after posting its status message: {e}")
+        result = {'error': 'Failed to answer'}
+        try:
+            update_slack_message(channel_id, status_msg['ts'], "Sorry, I encountered an error. Please try again.")
+        except Exception:
+            pass
+    
+    # Answer is on screen; now store the conversation turn and routing decision
+    with tracing.span('persist'):
+        try:
+            conversation_store.record_turn(session_id, job['user_id'], job['query'], result, job.get('event_key'))
+        except Exception as e:
+            print(f"Failed to store conversation turn for {session_id}: {e}")
+        if result.get('routed_by') == 'classifier':
+            # First questions only: they are what the nightly warmer pre-answers
+            record_question(result['domain'], job['query'])
+        feedback_writer.flush()
+
+def answer_in_message(job, route, status_ts):
+    """Invoke supervisor and render its answer into the status message"""
+    channel_id = job['channel_id']
+    
+    stream_to = None
+    if STREAM_RESPONSES:
+        # Supervisor renders chunks into the status message as they arrive
+        stream_to = {'channel': channel_id, 'ts': status_ts}
+    elif job['type'] == 'message':
+        time.sleep(1)
+        update_slack_message(
+            channel_id,
+            status_ts,
+            "🔍 Searching knowledge base...",
+            final=False
+        )
+    
+    # Invoke supervisor
+    with tracing.span('supervisor'):
+        result = invoke_supervisor(job['query'], job['session_id'], stream_to, route, status_ts)
+    tracing.annotate(
+        job=job['type'],
+        domain=result.get('domain'),
+        path=result.get('cache') or result.get('path')
+    )
+    
+    if 'error' not in result:
+        # Format with Block Kit
+        blocks = format_response_with_citations(
+            result['response'],
+            result.get('citations', []),
+            result.get('domain', 'general'),
+            route_from_result(result)
+        )
+        
+        update_slack_message(
+            channel_id,
+            status_ts,
+            result['response'],
+            blocks
+        )
+    else:
+        update_slack_message(
+            channel_id,
+            status_ts,
+            "Sorry, I encountered an error. Please try again."
+        )
+    
+    get_slack_client().flush()
+    return result
+
+def dispatch_job(job):
+    """Run a job inline or hand it to the background worker stage"""
+    global work_queue
+    
+    if PROCESSING_MODE == 'async':
+        if work_queue is None:
+            work_queue = get_work_queue(worker=process_job)
+        work_queue.send(job)
+    else:
+        process_job(job)
+
+def dispatch_claimed(job, event_key):
+    """dispatch_job for a claimed Slack event; a failed enqueue or run gives the claim
+    back so Slack's retry is processed instead of suppressed as a duplicate"""
+    # Identifies the job across queue redeliveries (see handle_job)
+    job['event_key'] = event_key
+    try:
+        dispatch_job(job)
+    except Exception:
+        event_dedup.release(event_key)
+        raise
+
 def lambda_handler(event, context):
     """Slack webhook handler with UX features"""
     
+    # Worker stage: jobs delivered from the work queue
+    if is_queue_event(event):
+        for job in jobs_from_queue_event(event):
+            process_job(job)
+        return {'statusCode': 200, 'body': json.dumps({'ok': True})}
+    
     body = json.loads(event['body'])
     
     # Handle URL verification
@@ -178,6 +400,14 @@ def lambda_handler(event, context):
             'body': json.dumps({'challenge': body['challenge']})
         }
     
+    # Short-circuit Slack redeliveries (X-Slack-Retry-Num) before any downstream call
+    event_key = get_event_key(body)
+    if not event_dedup.claim(event_key):
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'ok': True, 'duplicate': True, 'suppressed': event_dedup.stats['suppressed']})
+        }
+    
     # Handle interactive actions (button clicks)
     if body.get('type') == 'block_actions':
         payload = body
@@ -188,51 +418,31 @@ def lambda_handler(event, context):
         # Handle feedback
         if action_id.startswith('feedback_'):
             feedback_type = action['value']
+            message = payload['message']
             
-            feedback_table.put_item(Item={
+            # Same keys as the supervisor's answer log line, so ratings can be joined
+            # to the answer they rate (threshold_replay.py)
+            thread_ts = message.get('thread_ts', message['ts'])
+            feedback_writer.put({
                 'feedbackId': f"{user_id}_{int(time.time())}",
                 'userId': user_id,
                 'feedback': feedback_type,
+                'sessionId': f"{payload['channel']['id']}_{thread_ts}",
+                'messageTs': message['ts'],
                 'timestamp': int(time.time())
             })
+            # Nothing else will run in this container before it may be frozen or
+            # recycled, so the rating is written now rather than left buffered
+            feedback_writer.flush()
             
             return {
                 'statusCode': 200,
                 'body': json.dumps({'text': 'Thanks for your feedback!'})
             }
         
-        # Handle follow-up
+        # Handle follow-up (treat as new query)
         if action_id.startswith('followup_'):
-            # Treat as new query
-            channel_id = payload['channel']['id']
-            thread_ts = payload['message']['ts']
-            query = action['value']
-            
-            # Post thinking message
-            thinking_msg = post_slack_message(
-                channel_id,
-                "🤔 Thinking...",
-                thread_ts
-            )
-            
-            # Invoke agent
-            session_id = f"{channel_id}_{thread_ts}"
-            result = invoke_supervisor(query, session_id)
-            
-            if 'error' not in result:
-                blocks = format_response_with_citations(
-                    result['response'],
-                    result.get('citations', []),
-                    result.get('domain', 'general')
-                )
-                
-                update_slack_message(
-                    channel_id,
-                    thinking_msg['ts'],
-                    result['response'],
-                    blocks
-                )
-            
+            dispatch_claimed(build_followup_job(payload, action), event_key)
             return {'statusCode': 200, 'body': json.dumps({'ok': True})}
     
     # Handle message events
@@ -243,59 +453,7 @@ def lambda_handler(event, context):
         if slack_event.get('bot_id'):
             return {'statusCode': 200, 'body': json.dumps({'ok': True})}
         
-        user_id = slack_event.get('user')
-        channel_id = slack_event.get('channel')
-        text = slack_event.get('text', '')
-        thread_ts = slack_event.get('thread_ts', slack_event.get('ts'))
-        
-        # Store session
-        session_id = f"{channel_id}_{thread_ts}"
-        sessions_table.put_item(Item={
-            'sessionId': session_id,
-            'userId': user_id,
-            'query': text,
-            'timestamp': int(time.time()),
-            'ttl': int(time.time()) + 28800
-        })
-        
-        # Post progressive status
-        status_msg = post_slack_message(
-            channel_id,
-            "🤔 Thinking...",
-            thread_ts
-        )
-        
-        time.sleep(1)
-        update_slack_message(
-            channel_id,
-            status_msg['ts'],
-            "🔍 Searching knowledge base..."
-        )
-        
-        # Invoke supervisor
-        result = invoke_supervisor(text, session_id)
-        
-        if 'error' not in result:
-            # Format with Block Kit
-            blocks = format_response_with_citations(
-                result['response'],
-                result.get('citations', []),
-                result.get('domain', 'general')
-            )
-            
-            update_slack_message(
-                channel_id,
-                status_msg['ts'],
-                result['response'],
-                blocks
-            )
-        else:
-            update_slack_message(
-                channel_id,
-                status_msg['ts'],
-                "Sorry, I encountered an error. Please try again."
-            )
-        
+        dispatch_claimed(build_message_job(slack_event), event_key)
         return {'statusCode': 200, 'body': json.dumps({'ok': True})}
     
     return {'statusCode': 200, 'body': json.dumps({'ok': True})}
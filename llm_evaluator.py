@@ -1,8 +1,25 @@
 import boto3
 import json
 
+from grounding import score_grounding
+
 bedrock_runtime = boto3.client('bedrock-runtime', region_name='ap-southeast-1')
 
+# Lexical grounding this clear-cut settles faithfulness without the LLM judge
+GROUNDED_SCORE = 0.8
+UNGROUNDED_SCORE = 0.35
+
+def lexical_faithfulness(response, citations):
+    """Faithfulness from the lexical grounding score, or None when it is inconclusive"""
+    grounding = score_grounding(response, citations)
+    if grounding is None:
+        return None
+    if grounding['score'] >= GROUNDED_SCORE and not grounding['unsupported_facts']:
+        return grounding['score']
+    if grounding['score'] < UNGROUNDED_SCORE:
+        return grounding['score']
+    return None
+
 def evaluate_faithfulness(query, response, citations):
     """Evaluate if response is faithful to source documents"""
     
@@ -111,8 +128,12 @@ def evaluate_response(query, response, citations, domain, expected_domain=None):
     # Routing accuracy
     routing_accuracy = 1.0 if expected_domain and domain == expected_domain else 0.0
     
-    # LLM-as-judge metrics
-    faithfulness = evaluate_faithfulness(query, response, citations)
+    # LLM-as-judge metrics; faithfulness only when lexical grounding is inconclusive
+    faithfulness = lexical_faithfulness(response, citations)
+    faithfulness_source = 'lexical'
+    if faithfulness is None:
+        faithfulness = evaluate_faithfulness(query, response, citations)
+        faithfulness_source = 'llm'
     relevancy = evaluate_relevancy(query, response)
     completeness = evaluate_completeness(query, response)
     
@@ -125,6 +146,7 @@ def evaluate_response(query, response, citations, domain, expected_domain=None):
     return {
         'routing_accuracy': routing_accuracy,
         'faithfulness': faithfulness,
+        'faithfulness_source': faithfulness_source,
         'relevancy': relevancy,
         'completeness': completeness,
         'citation_score': citation_score,
@@ -2,6 +2,7 @@ from locust import HttpUser, task, between, events
 import json
 import random
 import time
+import uuid
 
 # Test queries across domains
 TEST_QUERIES = {
@@ -116,6 +117,47 @@ class HCGDemoUser(HttpUser):
             else:
                 response.failure(f"Got status {response.status_code}")
 
+# Many employees hitting the same outage at once: identical first questions that the
+# supervisor coalesces into one agent call (see single_flight.py)
+INCIDENT_QUERIES = [
+    "VPN not working",
+    "vpn not working?",
+    "VPN is not working",
+    "Is the VPN down?"
+]
+
+class IncidentStormUser(HttpUser):
+    wait_time = between(0.5, 1.5)
+    
+    def on_start(self):
+        self.user_id = f"user_{random.randint(1000, 9999)}"
+    
+    @task
+    def report_outage(self):
+        """Same question from every user, each a distinct Slack event"""
+        payload = {
+            "type": "event_callback",
+            "event_id": f"Ev{uuid.uuid4().hex[:12]}",
+            "event": {
+                "type": "message",
+                "text": random.choice(INCIDENT_QUERIES),
+                "user": self.user_id,
+                "channel": "C12345",
+                "ts": str(time.time())
+            }
+        }
+        
+        with self.client.post(
+            "/slack/events",
+            json=payload,
+            catch_response=True,
+            name="Incident Storm - it"
+        ) as response:
+            if response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"Got status {response.status_code}")
+
 # Custom stats tracking
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
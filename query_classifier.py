@@ -0,0 +1,132 @@
+import re
+
+DOMAINS = ['hr', 'it', 'finance', 'general']
+
+# keyword -> weight per domain. Generic words weigh less than specific ones.
+# A trailing '*' matches the keyword as a stem (reimburs* -> reimbursement, reimbursable).
+# Money actions outweigh the item they are about: "expense for a new laptop" is finance.
+DOMAIN_KEYWORDS = {
+    'hr': {
+        'leave': 1.0, 'vacation': 1.0, 'maternity': 1.5, 'paternity': 1.5, 'parental': 1.5,
+        'benefit': 1.0, 'insurance': 1.0, 'medical': 0.8, 'salary': 1.0, 'bonus': 1.0,
+        'payslip': 1.5, 'hr': 1.5, 'employee': 0.4, 'onboarding': 1.5, 'entitlement': 0.6
+    },
+    'it': {
+        'password': 1.5, 'laptop': 1.5, 'vpn': 1.5, 'software': 1.0, 'install*': 1.0,
+        'computer': 1.0, 'network': 1.0, 'login': 1.0, 'access': 0.4, 'it support': 1.5,
+        'it ticket': 1.5, 'troubleshoot*': 1.0, 'mfa': 1.5, 'helpdesk': 1.5, 'account': 0.5,
+        'locked': 0.8, 'wifi': 1.0
+    },
+    'finance': {
+        'expense': 2.0, 'reimburs*': 2.0, 'procurement': 1.5, 'purchase': 1.0, 'invoice': 1.5,
+        'payment': 1.0, 'budget': 1.0, 'finance': 1.5, 'cost': 0.5, 'claim': 1.0,
+        'travel request': 1.0, 'meal': 0.5, 'taxi': 0.5
+    },
+    'general': {
+        'office': 0.8, 'office hours': 1.5, 'address': 1.0, 'park': 1.0, 'parking': 1.0,
+        'dress code': 1.5, 'work from home': 1.5, 'company policies': 1.5, 'customer service': 1.0,
+        'enquiry': 1.0, 'located': 0.8, 'location': 0.8
+    }
+}
+
+# Probability mass spread over all domains so single weak matches are not certain
+PRIOR_MASS = 0.1
+# Same as the old default-to-general confidence when nothing matches
+NO_MATCH_CONFIDENCE = 0.7
+MAX_CONFIDENCE = 0.95
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def _compile_keywords(domain_keywords):
+    """Compile keyword lists into word-level lookup tables used by a single tokenised pass"""
+    words = {}
+    phrases = {}
+    stems = []
+    for domain, keywords in domain_keywords.items():
+        for keyword, weight in keywords.items():
+            term = keyword.rstrip('*').lower()
+            if ' ' in term:
+                phrases.setdefault(tuple(term.split()), []).append((domain, weight))
+            else:
+                words.setdefault(term, []).append((domain, weight))
+            if keyword.endswith('*'):
+                stems.append(term)
+
+    phrase_starts = {phrase[0] for phrase in phrases}
+    phrase_lengths = sorted({len(phrase) for phrase in phrases}, reverse=True)
+    return words, phrases, phrase_starts, phrase_lengths, tuple(stems)
+
+_WORDS, _PHRASES, _PHRASE_STARTS, _PHRASE_LENGTHS, _STEMS = _compile_keywords(DOMAIN_KEYWORDS)
+
+# Token -> keyword weights (or None); the token vocabulary is small, so memoise
+_token_weights = {}
+
+def _weights_for(token):
+    """Keyword weights for a token, allowing plurals and stem keywords"""
+    if token in _token_weights:
+        return _token_weights[token]
+
+    weights = _WORDS.get(token)
+    if weights is None and token.endswith('es'):
+        weights = _WORDS.get(token[:-2])
+    if weights is None and token.endswith('s'):
+        weights = _WORDS.get(token[:-1])
+    if weights is None:
+        for stem in _STEMS:
+            if token.startswith(stem):
+                weights = _WORDS[stem]
+                break
+
+    _token_weights[token] = weights
+    return weights
+
+def score_domains(query):
+    """Keyword weight per domain from a single pass over the query's tokens"""
+    scores = dict.fromkeys(DOMAINS, 0.0)
+    tokens = _TOKEN.findall(query.lower())
+    i = 0
+
+    while i < len(tokens):
+        token = tokens[i]
+
+        # Phrases ("it support", "work from home") take precedence over their words
+        if token in _PHRASE_STARTS:
+            matched = 0
+            for length in _PHRASE_LENGTHS:
+                phrase_weights = _PHRASES.get(tuple(tokens[i:i + length]))
+                if phrase_weights:
+                    for domain, weight in phrase_weights:
+                        scores[domain] += weight
+                    matched = length
+                    break
+            if matched:
+                i += matched
+                continue
+
+        weights = _weights_for(token)
+        if weights:
+            for domain, weight in weights:
+                scores[domain] += weight
+        i += 1
+
+    return scores
+
+def rank_domains(query):
+    """Ranked (domain, probability) distribution for a query"""
+    scores = score_domains(query)
+    total = sum(scores.values())
+
+    if total == 0:
+        rest = (1.0 - NO_MATCH_CONFIDENCE) / (len(DOMAINS) - 1)
+        return [('general', NO_MATCH_CONFIDENCE)] + [(d, rest) for d in DOMAINS if d != 'general']
+
+    prior = PRIOR_MASS / len(DOMAINS)
+    denominator = total + PRIOR_MASS
+    ranked = [(domain, (score + prior) / denominator) for domain, score in scores.items()]
+    ranked.sort(key=lambda item: item[1], reverse=True)
+    return ranked
+
+def classify(query):
+    """Top domain and its confidence"""
+    domain, probability = rank_domains(query)[0]
+    return domain, round(min(probability, MAX_CONFIDENCE), 3)
@@ -0,0 +1,14 @@
+import re
+
+_NON_WORD = re.compile(r"[^a-z0-9@.+\s-]")
+_TRAILING_PUNCT = re.compile(r"[.\-]+(\s|$)")
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query):
+    """Canonical form of a question for cache keys and frequency counts"""
+    text = query.lower()
+    # Slack mentions and links carry no meaning for matching
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = _NON_WORD.sub(" ", text)
+    text = _TRAILING_PUNCT.sub(r"\1", text)
+    return _WHITESPACE.sub(" ", text).strip()
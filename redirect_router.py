@@ -0,0 +1,118 @@
+import re
+
+from aws_clients import lazy_table
+from lambda_deep_linking import build_deep_link
+from ttl_cache import TTLCache
+
+# Redirectional questions (65% of volume per PRD) are answered with a deep link from the
+# resource catalog, resolved in-process against an index cached per container.
+catalog_table = lazy_table('hcg-demo-resource-catalog')
+
+CATALOG_TTL_SECONDS = 300
+
+# Only an explicit request to be sent somewhere counts: "how do i ..." and "request ..."
+# are how-to questions the agents answer, not a wish to leave Slack for a portal
+REDIRECTIONAL_PATTERNS = [
+    'link to', 'link for', 'url for', 'where do i go', 'take me to', 'open'
+]
+
+_REDIRECTIONAL = re.compile(
+    r'\b(?:' + '|'.join(re.escape(p).replace(r'\ ', r'\s+') for p in REDIRECTIONAL_PATTERNS) + r')\b'
+)
+
+def _words(text):
+    return ' ' + ' '.join(re.findall(r'[a-z0-9]+', text.lower())) + ' '
+
+_catalog_cache = TTLCache(max_size=1, ttl=CATALOG_TTL_SECONDS)
+
+def is_redirectional_query(query):
+    return bool(_REDIRECTIONAL.search(query.lower()))
+
+class ResourceIndex:
+    """Catalog resources with keywords pre-lowered and grouped by domain
+
+    Scoring follows lambda_deep_linking.find_resource_by_query (one point per keyword,
+    highest score wins, catalog order breaks ties) but keywords must match whole words,
+    so 'vpn' does not match inside another word and 'leave' not inside 'leaves'.
+    """
+
+    def __init__(self, resources):
+        self.resources = list(resources)
+        self.by_domain = {}
+        self.entries = []
+        for resource in self.resources:
+            entry = (resource, tuple(_words(k) for k in resource.get('keywords', [])))
+            self.entries.append(entry)
+            self.by_domain.setdefault(resource.get('domain'), []).append(entry)
+
+    def find(self, query, domain=None):
+        query = _words(query)
+        entries = self.by_domain.get(domain, []) if domain else self.entries
+
+        best, best_score = None, 0
+        for resource, keywords in entries:
+            score = sum(1 for keyword in keywords if keyword in query)
+            if score > best_score:
+                best, best_score = resource, score
+        return best
+
+def load_catalog():
+    items = []
+    kwargs = {}
+    while True:
+        response = catalog_table.scan(**kwargs)
+        items.extend(response['Items'])
+        if 'LastEvaluatedKey' not in response:
+            return items
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def get_resource_index():
+    """Cached catalog index, or None if the catalog cannot be read"""
+    index = _catalog_cache.get('index')
+    if index is None:
+        try:
+            index = ResourceIndex(load_catalog())
+        except Exception:
+            return None
+        _catalog_cache.set('index', index)
+    return index
+
+def resolve_redirect(query, domain=None, user_email=None):
+    """Deep link details for a redirectional question, or None to answer it normally"""
+    if not is_redirectional_query(query):
+        return None
+
+    index = get_resource_index()
+    if index is None:
+        return None
+
+    # The classified domain first, then the whole catalog
+    resource = index.find(query, domain) or (index.find(query) if domain else None)
+    if not resource:
+        return None
+
+    deep_link = build_deep_link(resource, query.lower(), user_email)
+    return {
+        'type': 'redirect',
+        'resource': resource['name'],
+        'resource_id': resource['resource_id'],
+        'link': deep_link['url'],
+        'sso_enabled': resource['sso_enabled'],
+        'description': deep_link['description'],
+        'contact': resource.get('contact')
+    }
+
+def format_redirect_response(redirect_info):
+    response = f"🔗 **{redirect_info['description']}**\n\n"
+
+    if redirect_info['sso_enabled']:
+        response += f"Click here to access via SSO: {redirect_info['link']}\n"
+        response += "✅ Single Sign-On enabled - you'll be logged in automatically\n"
+    else:
+        response += f"Access link: {redirect_info['link']}\n"
+        response += "⚠️ You may need to log in manually\n"
+
+    if redirect_info.get('contact'):
+        response += f"\n📧 Need help? Contact: {redirect_info['contact']}"
+
+    return response
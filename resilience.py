@@ -0,0 +1,118 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, TimeoutError, wait
+
+# Circuit breakers, latency tracking and hedged calls for slow downstream services (Bedrock agents)
+
+# botocore defaults (60 s reads, up to 5 legacy retries) let a degraded agent hold a
+# request for minutes; fail within seconds instead and let the breaker take over
+BEDROCK_CLIENT_CONFIG = {
+    'connect_timeout': float(os.environ.get('BEDROCK_CONNECT_TIMEOUT', '3')),
+    'read_timeout': float(os.environ.get('BEDROCK_READ_TIMEOUT', '45')),
+    'retries': {'max_attempts': 2, 'mode': 'standard'}
+}
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one trial call through after reset_timeout"""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0}
+
+    def allow(self):
+        """Whether a call may go ahead now"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == CLOSED:
+                self.stats['calls'] += 1
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self.stats['calls'] += 1
+                return True
+
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats['failures'] += 1
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.stats['opened'] += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self._trial_in_flight = False
+
+class LatencyTracker:
+    """Recent successful call latencies (seconds) for percentile estimates"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        """Nearest-rank percentile, or None until min_samples calls were seen"""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+def hedged_call(call, hedge_after, executor, is_error=lambda result: False):
+    """Run call(attempt, cancel_event); start a second attempt if the first is still
+    running after hedge_after seconds. The first good result wins and the loser is
+    told to stop through the shared cancel_event.
+
+    Returns (result, attempt that produced it).
+    """
+    cancel_event = threading.Event()
+    first = executor.submit(contextvars.copy_context().run, call, 0, cancel_event)
+
+    try:
+        # Fast answers and fast failures are returned as they are
+        return first.result(timeout=hedge_after), 0
+    except TimeoutError:
+        pass
+
+    second = executor.submit(contextvars.copy_context().run, call, 1, cancel_event)
+    attempts = {first: 0, second: 1}
+    pending = set(attempts)
+    result, attempt = None, 0
+
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            result, attempt = future.result(), attempts[future]
+            if not is_error(result):
+                cancel_event.set()
+                return result, attempt
+
+    return result, attempt
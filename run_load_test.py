@@ -38,7 +38,13 @@ except:
     host = "http://localhost:8000"
     print(f"\n⚠️ Could not get API Gateway, using: {host}")
 
+# 'mixed' (default) or 'incident': every user asks the same outage question, which
+# exercises single-flight coalescing in the supervisor
+scenario = sys.argv[1] if len(sys.argv) > 1 else 'mixed'
+user_class = {'mixed': 'HCGDemoUser', 'incident': 'IncidentStormUser'}[scenario]
+
 print("\nTest Configuration:")
+print(f"  Scenario: {scenario} ({user_class})")
 print(f"  Target Users: 500")
 print(f"  Spawn Rate: 10 users/second")
 print(f"  Duration: 5 minutes")
@@ -58,7 +64,8 @@ cmd = [
     "--spawn-rate", "10",
     "--run-time", "5m",
     "--headless",
-    "--html", "load_test_report.html"
+    "--html", "load_test_report.html",
+    user_class
 ]
 
 print(f"\nCommand: {' '.join(cmd)}\n")
@@ -1,29 +1,59 @@
 import json
+import re
+
+from grounding import score_grounding
 
 # Confidence thresholds
 CONFIDENCE_THRESHOLD_HIGH = 0.8
 CONFIDENCE_THRESHOLD_MEDIUM = 0.6
 CONFIDENCE_THRESHOLD_LOW = 0.4
 
+# Answers scoring above this are replaced by the fallback
+HALLUCINATION_THRESHOLD = 0.7
+
+# Hallucination penalties for cited answers the passages do not back up
+GROUNDING_WEIGHT = 0.5
+UNSUPPORTED_FACT_PENALTY = 0.1
+MAX_PENALIZED_FACTS = 3
+
+# Confidence comes from the best few retrieval scores; it is boosted when at least
+# AGREEING_SOURCES of them are within AGREEMENT_MARGIN of the best one
+TOP_SCORES = 3
+AGREEING_SOURCES = 3
+AGREEMENT_MARGIN = 0.1
+AGREEMENT_BOOST = 0.1
+
+# Agent attributions carry no relevance score; an answer citing only those is scored
+# as if every citation had this one
+UNSCORED_CITATION_SCORE = 0.5
+
+def citation_score(ref):
+    """Retrieval score of one citation (kb_citations), or None when it has none"""
+    score = ref.get('score')
+    if score is None:
+        # Records and fixtures from before citations carried the score directly
+        score = ref.get('metadata', {}).get('score')
+    return score
+
+def top_scores(retrieved_references):
+    """Best TOP_SCORES retrieval scores, highest first"""
+    scores = [score for score in map(citation_score, retrieved_references) if score is not None]
+    if not scores:
+        scores = [UNSCORED_CITATION_SCORE] * len(retrieved_references)
+    return sorted(scores, reverse=True)[:TOP_SCORES]
+
 def calculate_kb_confidence(retrieved_references):
     """Calculate confidence score from KB retrieval"""
     if not retrieved_references:
         return 0.0
     
-    # Average confidence from retrieval scores
-    scores = []
-    for ref in retrieved_references:
-        score = ref.get('metadata', {}).get('score', 0.5)
-        scores.append(score)
-    
-    if not scores:
-        return 0.5
-    
+    # Average of the best retrieval scores
+    scores = top_scores(retrieved_references)
     avg_score = sum(scores) / len(scores)
     
-    # Boost if multiple sources agree
-    if len(scores) >= 3:
-        avg_score = min(avg_score + 0.1, 1.0)
+    # Boost if several sources are about as relevant as the best one
+    if len(scores) >= AGREEING_SOURCES and scores[AGREEING_SOURCES - 1] >= scores[0] - AGREEMENT_MARGIN:
+        avg_score = min(avg_score + AGREEMENT_BOOST, 1.0)
     
     return avg_score
 
@@ -61,54 +91,175 @@ def add_confidence_disclaimer(response, confidence_level):
     else:
         return response
 
+PII_TYPES = ('email', 'phone', 'nric', 'credit_card')
+
+# Detection patterns are case-insensitive; redaction keeps StarHub addresses
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
+EMAIL_REDACT_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@(?!starhub\.com)[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE)
+PHONE_REDACT_PATTERN = re.compile(r'\b(?!\+65\s?6825)\d{4}[-.\s]?\d{4}\b')
+NRIC_REDACT_PATTERN = re.compile(r'\b[STFG]\d{7}[A-Z]\b')
+
+# Phone, NRIC and card numbers tried together at one position. The lookaheads are
+# independent, so overlapping numbers (a card's first eight digits are also a phone
+# number) are all reported, as separate searches would.
+NUMERIC_PII_PATTERN = re.compile(
+    r'\b(?=[\d+STFG])'
+    r'(?:(?=(?P<phone>\d{4}[-.\s]?\d{4}\b|\+65[-.\s]?\d{4}[-.\s]?\d{4}\b)))?'
+    r'(?:(?=(?P<nric>[STFG]\d{7}[A-Z]\b)))?'
+    r'(?:(?=(?P<credit_card>\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b)))?',
+    re.IGNORECASE
+)
+
+# Every numeric pattern starts at a digit run of four or more (or 1 / 4 characters
+# before one: the NRIC letter, '+65'), and every such run start is a match of this.
+# \d is Unicode-aware; on ASCII text the plain class is equivalent and faster.
+DIGIT_RUN = re.compile(r'\d\d\d\d')
+ASCII_DIGIT_RUN = re.compile(r'[0-9][0-9][0-9][0-9]')
+
+# An email's local part is a run of these before the '@' and its domain a run of the
+# second set after it. Each '@' is searched from LOCAL_PART_WINDOW characters before
+# it, moved back to the start of the local part when that lands inside one.
+LOCAL_PART_CHAR = re.compile(r'[A-Za-z0-9._%+-]', re.IGNORECASE)
+DOMAIN_RUN = re.compile(r'[A-Za-z0-9.-]*', re.IGNORECASE)
+LOCAL_PART_WINDOW = 64
+
+def _email_matches(pattern, text):
+    """Same matches as pattern.finditer(text), only searching around each '@'"""
+    pos = 0
+    while True:
+        at = text.find('@', pos)
+        if at < 0:
+            return
+        start = max(pos, at - LOCAL_PART_WINDOW)
+        while start > pos and LOCAL_PART_CHAR.match(text, start - 1):
+            start -= 1
+        # One character past the domain keeps the closing \b exact
+        end = DOMAIN_RUN.match(text, at + 1).end() + 1
+        match = pattern.search(text, start, end)
+        if match:
+            yield match
+            pos = match.end()
+        else:
+            pos = at + 1
+
+def _numeric_starts(text, offsets):
+    runs = (ASCII_DIGIT_RUN if text.isascii() else DIGIT_RUN).finditer(text)
+    starts = set()
+    for run in runs:
+        starts.update(run.start() - offset for offset in offsets)
+    return sorted(start for start in starts if start >= 0)
+
+def _redact_at(text, starts, rules):
+    """Sequential pattern.sub for each (pattern, replacement) rule, given every match
+    starts at one of starts and matches of different rules never overlap"""
+    parts = []
+    pos = 0
+    for start in starts:
+        if start < pos:
+            continue
+        for pattern, replacement in rules:
+            match = pattern.match(text, start)
+            if match:
+                parts.append(text[pos:start])
+                parts.append(replacement)
+                pos = match.end()
+                break
+    if not parts:
+        return text
+    parts.append(text[pos:])
+    return ''.join(parts)
+
+def _detect(text):
+    found = set()
+    if '@' in text and next(_email_matches(EMAIL_PATTERN, text), None):
+        found.add('email')
+
+    for start in _numeric_starts(text, (4, 1, 0)):
+        match = NUMERIC_PII_PATTERN.match(text, start)
+        if match:
+            found.update(name for name, value in match.groupdict().items() if value)
+            if len(found) == len(PII_TYPES):
+                break
+
+    return [pii_type for pii_type in PII_TYPES if pii_type in found]
+
+def scan_pii(text):
+    """Detected PII types and the redacted text
+
+    One pass over the text finds the candidate positions (each '@' and four-digit
+    run); patterns are only tried there. Redaction runs only for the types found,
+    since text without detected PII is left unchanged by every redaction pattern.
+    """
+    detected = _detect(text)
+    if 'email' in detected:
+        parts = []
+        pos = 0
+        for match in _email_matches(EMAIL_REDACT_PATTERN, text):
+            parts.append(text[pos:match.start()])
+            parts.append('[EMAIL REDACTED]')
+            pos = match.end()
+        if parts:
+            parts.append(text[pos:])
+            text = ''.join(parts)
+    # An NRIC's digits follow a letter, so they can never be part of a phone number:
+    # both are redacted in one sweep. Card numbers go as pairs of phone-shaped groups.
+    rules = []
+    if 'phone' in detected:
+        rules.append((PHONE_REDACT_PATTERN, '[PHONE REDACTED]'))
+    if 'nric' in detected:
+        rules.append((NRIC_REDACT_PATTERN, '[NRIC REDACTED]'))
+    if rules:
+        text = _redact_at(text, _numeric_starts(text, (1, 0)), rules)
+    return detected, text
+
 def detect_pii(text):
     """Basic PII detection (enhanced by Bedrock Guardrails)"""
-    import re
-    
-    pii_patterns = {
-        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        'phone': r'\b\d{4}[-.\s]?\d{4}\b|\b\+65[-.\s]?\d{4}[-.\s]?\d{4}\b',
-        'nric': r'\b[STFG]\d{7}[A-Z]\b',
-        'credit_card': r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'
-    }
-    
-    detected = []
-    for pii_type, pattern in pii_patterns.items():
-        if re.search(pattern, text, re.IGNORECASE):
-            detected.append(pii_type)
-    
-    return detected
+    return _detect(text)
 
 def sanitize_response(response):
     """Remove potential PII from response"""
-    import re
-    
-    # Redact email addresses
-    response = re.sub(
-        r'\b[A-Za-z0-9._%+-]+@(?!starhub\.com)[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-        '[EMAIL REDACTED]',
-        response,
-        flags=re.IGNORECASE
-    )
-    
-    # Redact phone numbers (except official StarHub numbers)
-    response = re.sub(
-        r'\b(?!\+65\s?6825)\d{4}[-.\s]?\d{4}\b',
-        '[PHONE REDACTED]',
-        response
-    )
-    
-    # Redact NRIC
-    response = re.sub(
-        r'\b[STFG]\d{7}[A-Z]\b',
-        '[NRIC REDACTED]',
-        response
-    )
-    
-    return response
-
-def check_hallucination_indicators(response, citations):
-    """Check for potential hallucination"""
+    return scan_pii(response)[1]
+
+# No PII match crosses whitespace that does not follow a digit (only phone and card
+# numbers contain whitespace, always right after a digit), and such whitespace reads as
+# a word boundary from either side. Redacting the text before and after it separately
+# therefore gives exactly sanitize_response of the whole.
+SAFE_CUT = re.compile(r'(?<!\d)\s')
+
+class StreamingRedactor:
+    """Redacts streamed text chunk by chunk, holding back only the tail that could
+    still turn into PII (a partial email, phone number or NRIC)
+
+    The released pieces joined with finish() equal sanitize_response of the full text.
+    """
+
+    def __init__(self):
+        self.pending = ''
+        self.detected = set()
+
+    def _release(self, text):
+        detected, text = scan_pii(text)
+        self.detected.update(detected)
+        return text
+
+    def feed(self, chunk):
+        """Redacted text that is safe to show now (possibly empty)"""
+        self.pending += chunk
+        cut = None
+        for cut in SAFE_CUT.finditer(self.pending):
+            pass
+        if cut is None:
+            return ''
+        ready, self.pending = self.pending[:cut.end()], self.pending[cut.end():]
+        return self._release(ready)
+
+    def finish(self):
+        """Redacted remainder once the stream has ended"""
+        ready, self.pending = self.pending, ''
+        return self._release(ready) if ready else ''
+
+def heuristic_hallucination_score(response, citations):
+    """Hallucination score from the response text alone, before grounding"""
     hallucination_score = 0.0
     
     # No citations = potential hallucination
@@ -131,11 +282,26 @@ def check_hallucination_indicators(response, citations):
             hallucination_score += 0.1
     
     # Contains specific numbers/dates without citations
-    import re
     has_numbers = bool(re.search(r'\d+', response))
     if has_numbers and not citations:
         hallucination_score += 0.2
     
+    return hallucination_score
+
+def check_hallucination_indicators(response, citations, grounding=None):
+    """Check for potential hallucination
+
+    grounding: score_grounding(response, citations), if the caller already has it
+    """
+    hallucination_score = heuristic_hallucination_score(response, citations)
+    
+    # Cited passages that do not contain the answer's wording, numbers or contacts
+    if grounding is None:
+        grounding = score_grounding(response, citations)
+    if grounding:
+        hallucination_score += GROUNDING_WEIGHT * (1 - grounding['score'])
+        hallucination_score += UNSUPPORTED_FACT_PENALTY * min(len(grounding['unsupported_facts']), MAX_PENALIZED_FACTS)
+    
     return min(hallucination_score, 1.0)
 
 def validate_response(response, citations, query_confidence, domain):
@@ -157,22 +323,21 @@ def validate_response(response, citations, query_confidence, domain):
         }
     
     # Check for hallucination
-    hallucination_score = check_hallucination_indicators(response, citations)
+    grounding = score_grounding(response, citations)
+    hallucination_score = check_hallucination_indicators(response, citations, grounding)
     
-    if hallucination_score > 0.7:
+    if hallucination_score > HALLUCINATION_THRESHOLD:
         return {
             'safe_to_respond': False,
             'response': get_fallback_response("", domain),
             'confidence': kb_confidence,
             'confidence_level': 'insufficient',
-            'reason': 'High hallucination risk'
+            'reason': 'High hallucination risk',
+            'grounding': grounding
         }
     
-    # Detect PII in query
-    pii_detected = detect_pii(response)
-    
-    if pii_detected:
-        response = sanitize_response(response)
+    # Detect and redact PII in one scan
+    pii_detected, response = scan_pii(response)
     
     # Add disclaimer if needed
     response = add_confidence_disclaimer(response, confidence_level)
@@ -183,5 +348,6 @@ def validate_response(response, citations, query_confidence, domain):
         'confidence': kb_confidence,
         'confidence_level': confidence_level,
         'pii_detected': pii_detected,
-        'hallucination_score': hallucination_score
+        'hallucination_score': hallucination_score,
+        'grounding': grounding
     }
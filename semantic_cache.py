@@ -0,0 +1,185 @@
+import math
+import os
+import time
+import zlib
+from collections import OrderedDict
+
+from query_normalization import normalize_query
+
+# Near-duplicate questions ("reset my password" / "I forgot my password") share one answer.
+# Similarity alone lets near misses through ("maternity" / "paternity leave" scores 0.85), so
+# a hit also needs the same key terms: content words after plurals and a few synonyms are
+# folded, minus fillers such as "steps" or "need". Only those key terms are compared exactly;
+# the threshold bounds how much other wording may differ, and candidates are looked up by
+# key terms instead of scanning the domain.
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.8'))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.environ.get('SEMANTIC_CACHE_TTL_SECONDS', '3600'))
+MAX_ENTRIES_PER_DOMAIN = 256
+EMBEDDING_BUCKETS = 1 << 16
+
+# Words that carry no meaning for matching questions
+STOPWORDS = {
+    'a', 'an', 'the', 'i', 'me', 'my', 'we', 'our', 'you', 'your', 'is', 'are', 'am', 'do', 'does',
+    'did', 'can', 'could', 'how', 'what', 'where', 'when', 'which', 'who', 'to', 'of', 'for', 'in',
+    'on', 'at', 'and', 'or', 'it', 'be', 'please', 'should', 'would', 'get', 'there', 'any'
+}
+
+# Words that do not change what is being asked for
+FILLER_WORDS = {
+    'need', 'want', 'help', 'know', 'tell', 'show', 'step', 'way', 'process', 'procedure',
+    'guide', 'instruction', 'able', 'like', 'hi', 'hello', 'thank', 'thanks', 'this', 'that',
+    'with', 'about', 'again', 'now', 'just', 'someone'
+}
+
+# Different words for the same request, folded to one form
+SYNONYMS = {
+    'forgot': 'reset', 'forgotten': 'reset', 'recover': 'reset', 'unlock': 'reset',
+    'pw': 'password', 'passcode': 'password', 'pwd': 'password',
+    'reimbursement': 'claim', 'reimburse': 'claim',
+    'holiday': 'vacation', 'pto': 'vacation',
+    'laptop': 'computer', 'pc': 'computer'
+}
+
+def canonical_word(word):
+    """Word with its plural and a few synonyms folded ("passwords", "pw" -> "password")"""
+    word = SYNONYMS.get(word, word)
+    if len(word) > 4 and word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+    return SYNONYMS.get(word, word)
+
+def content_words(query):
+    return [canonical_word(w) for w in normalize_query(query).split() if w not in STOPWORDS]
+
+def key_terms(words):
+    """Content words a cached answer must share with the question exactly"""
+    return frozenset(w for w in words if w not in FILLER_WORDS)
+
+def embed(query):
+    """Sparse L2-normalised vector of hashed word and character-trigram features"""
+    words = content_words(query)
+    vector = {}
+
+    for word in words:
+        bucket = zlib.crc32(b'w:' + word.encode('utf-8')) % EMBEDDING_BUCKETS
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0
+
+        padded = f' {word} '
+        for i in range(len(padded) - 2):
+            bucket = zlib.crc32(b'c:' + padded[i:i + 3].encode('utf-8')) % EMBEDDING_BUCKETS
+            vector[bucket] = vector.get(bucket, 0.0) + 0.5
+
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    if norm:
+        vector = {k: v / norm for k, v in vector.items()}
+    return vector
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+class SemanticCache:
+    """Per-domain in-container cache of validated responses, matched by key terms and
+    embedding similarity"""
+
+    def __init__(self, threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL_SECONDS,
+                 max_entries=MAX_ENTRIES_PER_DOMAIN, clock=time.monotonic):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        # domain -> OrderedDict(normalized query -> entry)
+        self.domains = {}
+        # domain -> {key terms -> normalized queries}
+        self.by_terms = {}
+        self.generations = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0}
+        self.domain_stats = {}
+
+    def _count(self, domain, outcome):
+        self.stats[outcome] += 1
+        counts = self.domain_stats.setdefault(domain, {'hits': 0, 'misses': 0})
+        if outcome in counts:
+            counts[outcome] += 1
+
+    def _remove(self, domain, key):
+        entry = self.domains[domain].pop(key)
+        keys = self.by_terms[domain][entry['terms']]
+        keys.discard(key)
+        if not keys:
+            del self.by_terms[domain][entry['terms']]
+
+    def sync_generation(self, domain, generation):
+        """Drop a domain's entries when its content generation moved on"""
+        if generation is None:
+            return
+        if self.generations.get(domain, generation) != generation:
+            self.invalidate_domain(domain)
+        self.generations[domain] = generation
+
+    def lookup(self, domain, query):
+        """(response_data, similarity) for the closest cached question with the same key
+        terms above threshold, else None"""
+        words = content_words(query)
+        candidates = self.by_terms.get(domain, {}).get(key_terms(words))
+        if not candidates:
+            self._count(domain, 'misses')
+            return None
+
+        entries = self.domains[domain]
+        now = self.clock()
+        vector = None
+        best_key, best_score = None, 0.0
+
+        for key in list(candidates):
+            entry = entries[key]
+            if entry['expires_at'] <= now:
+                self._remove(domain, key)
+                self.stats['expirations'] += 1
+                continue
+            if vector is None:
+                vector = embed(query)
+            score = cosine(vector, entry['vector'])
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_key is None or best_score < self.threshold:
+            self._count(domain, 'misses')
+            return None
+
+        entries.move_to_end(best_key)
+        self._count(domain, 'hits')
+        return entries[best_key]['response_data'], best_score
+
+    def store(self, domain, query, response_data):
+        entries = self.domains.setdefault(domain, OrderedDict())
+        by_terms = self.by_terms.setdefault(domain, {})
+        key = normalize_query(query)
+        if key in entries:
+            self._remove(domain, key)
+
+        terms = key_terms(content_words(query))
+        entries[key] = {
+            'vector': embed(query),
+            'terms': terms,
+            'response_data': response_data,
+            'expires_at': self.clock() + self.ttl
+        }
+        by_terms.setdefault(terms, set()).add(key)
+        self.stats['stores'] += 1
+
+        while len(entries) > self.max_entries:
+            self._remove(domain, next(iter(entries)))
+            self.stats['evictions'] += 1
+
+    def invalidate_domain(self, domain):
+        self.by_terms.pop(domain, None)
+        removed = len(self.domains.pop(domain, {}))
+        self.stats['invalidations'] += 1
+        return removed
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
@@ -0,0 +1,131 @@
+import json
+import time
+import uuid
+
+INFLIGHT_TABLE = 'hcg-demo-inflight-queries'
+
+# Covers a slow agent answer; a leader still running past it is merely duplicated by
+# whoever takes over. Twice the lease stays inside the supervisor's 60 s timeout.
+LEASE_SECONDS = 25
+# Identical questions arriving just after an answer reuse it
+RESULT_WINDOW_SECONDS = 30
+POLL_INTERVAL_SECONDS = 0.25
+
+def _error_code(e):
+    # botocore ClientError, matched by code to keep botocore off the import path
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+class SingleFlight:
+    """Coalesces identical in-flight questions across supervisor containers
+
+    The first request for a key claims it with a conditional write and computes the
+    answer; concurrent requests poll the item and share the stored result, which
+    stays readable for RESULT_WINDOW_SECONDS. Lambda runs one request per container,
+    so the coordination has to live in DynamoDB rather than in process memory.
+    """
+
+    def __init__(self, table, lease=LEASE_SECONDS, window=RESULT_WINDOW_SECONDS,
+                 poll_interval=POLL_INTERVAL_SECONDS, clock=time.time, sleep=time.sleep):
+        self.table = table
+        self.lease = lease
+        self.window = window
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = {'leaders': 0, 'coalesced': 0, 'window_hits': 0, 'takeovers': 0, 'errors': 0}
+
+    def _claim(self, key, owner):
+        """True if this request now owns the flight"""
+        now = self.clock()
+        try:
+            self.table.put_item(
+                Item={'flight_key': key, 'status': 'pending', 'owner': owner, 'ttl': int(now + self.lease)},
+                # Free, or the previous lease / result window has run out
+                ConditionExpression='attribute_not_exists(flight_key) OR #ttl < :now',
+                ExpressionAttributeNames={'#ttl': 'ttl'},
+                ExpressionAttributeValues={':now': int(now)}
+            )
+            return True
+        except Exception as e:
+            if _error_code(e) == 'ConditionalCheckFailedException':
+                return False
+            raise
+
+    def _read(self, key):
+        return self.table.get_item(Key={'flight_key': key}, ConsistentRead=True).get('Item')
+
+    def _lead(self, key, owner, compute, shareable):
+        self.stats['leaders'] += 1
+        try:
+            result = compute()
+        except Exception:
+            self._release(key, owner)
+            raise
+
+        if shareable(result):
+            try:
+                self.table.put_item(
+                    Item={
+                        'flight_key': key,
+                        'status': 'done',
+                        'owner': owner,
+                        'result': json.dumps(result),
+                        'ttl': int(self.clock() + self.window)
+                    },
+                    ConditionExpression='#owner = :owner',
+                    ExpressionAttributeNames={'#owner': 'owner'},
+                    ExpressionAttributeValues={':owner': owner}
+                )
+            except Exception:
+                # Lost the lease to a takeover, or the item was rejected: the answer is
+                # still ours to return, and waiting requests must not sit out the lease
+                self.stats['errors'] += 1
+                self._release(key, owner)
+        else:
+            # Fallbacks are not shared: waiting requests try for themselves
+            self._release(key, owner)
+        return result
+
+    def _release(self, key, owner):
+        try:
+            self.table.delete_item(
+                Key={'flight_key': key},
+                ConditionExpression='#owner = :owner',
+                ExpressionAttributeNames={'#owner': 'owner'},
+                ExpressionAttributeValues={':owner': owner}
+            )
+        except Exception:
+            self.stats['errors'] += 1
+
+    def run(self, key, compute, shareable=lambda result: True):
+        """(result, shared) where shared is None, 'in_flight' or 'window'"""
+        owner = uuid.uuid4().hex
+        # Safety net only: a dead leader's lease expires well before this and is taken over
+        deadline = self.clock() + 2 * self.lease
+        waited = False
+
+        while True:
+            try:
+                claimed = self._claim(key, owner)
+                item = None if claimed else self._read(key)
+            except Exception:
+                # Coalescing is an optimisation; never fail the question because of it
+                self.stats['errors'] += 1
+                return compute(), None
+
+            if claimed:
+                if waited:
+                    self.stats['takeovers'] += 1
+                return self._lead(key, owner, compute, shareable), None
+
+            if item and item.get('status') == 'done' and int(item.get('ttl', 0)) >= self.clock():
+                shared = 'in_flight' if waited else 'window'
+                self.stats['coalesced' if waited else 'window_hits'] += 1
+                return json.loads(item['result']), shared
+
+            if self.clock() >= deadline:
+                self.stats['errors'] += 1
+                return compute(), None
+
+            waited = True
+            self.sleep(self.poll_interval)
@@ -0,0 +1,221 @@
+import json
+import time
+import http.client
+
+from aws_clients import get_client
+import tracing
+
+SLACK_HOST = 'slack.com'
+SLACK_SECRET_ID = 'hcg-demo/slack/credentials'
+
+# Bot token is cached in the container instead of hitting Secrets Manager per call
+TOKEN_TTL_SECONDS = 900
+
+# Slack allows roughly one message per second per channel
+CHANNEL_MIN_INTERVAL = 1.0
+MAX_RETRIES = 3
+# Methods that can be resent after a 5xx without a duplicate showing up in Slack. A 5xx
+# on anything else may come after the call took effect, so it is only resent when Slack
+# says to come back (503 with Retry-After).
+IDEMPOTENT_METHODS = {'chat.update'}
+# Reconnect rather than reuse a connection idle this long; Slack may have closed it
+KEEPALIVE_IDLE_SECONDS = 30
+
+_token_cache = {'token': None, 'expires_at': 0}
+_client = None
+
+def get_bot_token(secrets_client=None, force_refresh=False):
+    """Get Slack bot token from Secrets Manager, cached in memory"""
+    now = time.time()
+    if not force_refresh and _token_cache['token'] and now < _token_cache['expires_at']:
+        return _token_cache['token']
+
+    if secrets_client is None:
+        secrets_client = get_client('secretsmanager')
+
+    response = secrets_client.get_secret_value(SecretId=SLACK_SECRET_ID)
+    secret = json.loads(response['SecretString'])
+
+    _token_cache['token'] = secret['bot_token']
+    _token_cache['expires_at'] = now + TOKEN_TTL_SECONDS
+    return _token_cache['token']
+
+class SlackClient:
+    """Slack Web API client with keep-alive, 429/5xx handling and per-channel pacing"""
+
+    def __init__(self, token_provider=get_bot_token, min_interval=CHANNEL_MIN_INTERVAL,
+                 max_retries=MAX_RETRIES, clock=time.monotonic, sleep=time.sleep):
+        self.token_provider = token_provider
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.clock = clock
+        self.sleep = sleep
+        self.connection = None
+        self.last_used = None
+        self.next_allowed = {}
+        self.pending_updates = {}
+        self.stats = {'calls': 0, 'rate_limited': 0, 'server_errors': 0, 'coalesced': 0, 'reconnects': 0}
+
+    def _connect(self):
+        if self.connection is not None and self.clock() - self.last_used > KEEPALIVE_IDLE_SECONDS:
+            self._disconnect()
+        if self.connection is None:
+            self.connection = http.client.HTTPSConnection(SLACK_HOST, timeout=10)
+        return self.connection
+
+    def _disconnect(self):
+        self.connection.close()
+        self.connection = None
+        self.stats['reconnects'] += 1
+
+    def _send(self, method, payload, token):
+        """Send one request over the pooled connection
+
+        Only a failure to open the connection is retried. Once the request may have
+        reached Slack, resending it could post a message twice, so errors (including
+        read timeouts) are raised.
+        """
+        body = json.dumps(payload).encode()
+        headers = {
+            'Authorization': f'Bearer {token}',
+            'Content-Type': 'application/json; charset=utf-8',
+            'Connection': 'keep-alive'
+        }
+
+        for attempt in range(2):
+            connection = self._connect()
+            if connection.sock is None:
+                try:
+                    connection.connect()
+                except OSError:
+                    self._disconnect()
+                    if attempt == 1:
+                        raise
+                    continue
+
+            try:
+                connection.request('POST', f'/api/{method}', body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                self._disconnect()
+                raise
+
+            self.last_used = self.clock()
+            return response.status, response.getheader('Retry-After'), data
+
+    def _wait_for_channel(self, channel):
+        wait = self.next_allowed.get(channel, 0) - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+
+    def api_call(self, method, payload):
+        """Call a Slack Web API method, honouring 429 Retry-After and retrying 5xx where
+        resending cannot post twice"""
+        with tracing.span(f'slack.{method}'):
+            return self._api_call(method, payload)
+
+    def _api_call(self, method, payload):
+        channel = payload.get('channel')
+        token = self.token_provider()
+
+        for attempt in range(self.max_retries + 1):
+            if channel:
+                self._wait_for_channel(channel)
+
+            status, retry_after, data = self._send(method, payload, token)
+            self.stats['calls'] += 1
+
+            if status >= 500:
+                self.stats['server_errors'] += 1
+                if method not in IDEMPOTENT_METHODS and not (status == 503 and retry_after):
+                    return {'ok': False, 'error': 'server_error'}
+            elif status == 429:
+                self.stats['rate_limited'] += 1
+            
+            # Rate limits and retryable server errors are retried after Retry-After (or 1 s)
+            if status == 429 or status >= 500:
+                delay = float(retry_after or 1)
+                if channel:
+                    self.next_allowed[channel] = self.clock() + delay
+                else:
+                    self.sleep(delay)
+                continue
+
+            if channel:
+                self.next_allowed[channel] = self.clock() + self.min_interval
+
+            result = json.loads(data.decode())
+
+            # Token rotated since it was cached
+            if result.get('error') in ('invalid_auth', 'token_expired') and attempt == 0:
+                token = self.token_provider(force_refresh=True)
+                continue
+
+            return result
+
+        return {'ok': False, 'error': 'ratelimited' if status == 429 else 'server_error'}
+
+    def post_message(self, channel, text, thread_ts=None, blocks=None):
+        """Post message to Slack"""
+        payload = {
+            'channel': channel,
+            'text': text,
+            'thread_ts': thread_ts
+        }
+
+        if blocks:
+            payload['blocks'] = blocks
+
+        return self.api_call('chat.postMessage', payload)
+
+    def update_message(self, channel, ts, text, blocks=None, final=True):
+        """Update existing Slack message
+
+        Non-final updates that arrive before the channel's next slot replace any
+        pending update for the same message instead of being sent; the latest one
+        goes out on the next slot or on flush().
+        """
+        payload = {
+            'channel': channel,
+            'ts': ts,
+            'text': text
+        }
+
+        if blocks:
+            payload['blocks'] = blocks
+
+        key = (channel, ts)
+
+        if not final and self.clock() < self.next_allowed.get(channel, 0):
+            if key in self.pending_updates:
+                self.stats['coalesced'] += 1
+            self.pending_updates[key] = payload
+            return {'ok': True, 'channel': channel, 'ts': ts, 'coalesced': True}
+
+        # This update supersedes anything still pending for the message
+        if key in self.pending_updates:
+            del self.pending_updates[key]
+            self.stats['coalesced'] += 1
+
+        return self.api_call('chat.update', payload)
+
+    def discard_pending(self, channel, ts):
+        """Drop a pending update that a caller is about to replace"""
+        return self.pending_updates.pop((channel, ts), None) is not None
+
+    def flush(self):
+        """Send the latest pending update for every message"""
+        results = []
+        while self.pending_updates:
+            key = next(iter(self.pending_updates))
+            payload = self.pending_updates.pop(key)
+            results.append(self.api_call('chat.update', payload))
+        return results
+
+def get_slack_client():
+    """Get the container-wide Slack client"""
+    global _client
+    if _client is None:
+        _client = SlackClient()
+    return _client
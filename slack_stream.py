@@ -0,0 +1,67 @@
+import os
+import time
+
+from slack_client import get_slack_client
+
+# At most one chat.update per interval while an answer is streaming
+STREAM_UPDATE_INTERVAL_MS = int(os.environ.get('STREAM_UPDATE_INTERVAL_MS', '1000'))
+STREAM_CURSOR = ' ▌'
+# Partials are shown before validation; the caller always replaces them with the checked answer
+STREAM_DRAFT_NOTE = '\n\n_Draft: still being checked against sources_'
+
+class SlackStreamRenderer:
+    """Renders streamed agent output into a Slack message with throttled, coalesced updates
+
+    redactor: safe_failure_handler.StreamingRedactor (or anything with feed(chunk));
+    only text it has released is shown, so PII split across chunks never appears.
+    Every update is marked as an unverified draft.
+    """
+
+    def __init__(self, channel, ts, client=None, interval_ms=STREAM_UPDATE_INTERVAL_MS,
+                 redactor=None, clock=time.monotonic):
+        self.channel = channel
+        self.ts = ts
+        self.client = client or get_slack_client()
+        self.interval = interval_ms / 1000.0
+        self.redactor = redactor
+        self.clock = clock
+        self.parts = []
+        self.last_update = None
+        self.started_at = clock()
+        self.first_update_at = None
+        self.updates = 0
+
+    def text(self):
+        return ''.join(self.parts)
+
+    def on_chunk(self, chunk):
+        """Accept a chunk; push an update if the throttle window has passed"""
+        if self.redactor:
+            chunk = self.redactor.feed(chunk)
+        if not chunk:
+            return
+
+        self.parts.append(chunk)
+
+        now = self.clock()
+        if self.last_update is not None and now - self.last_update < self.interval:
+            return
+
+        self._render(now)
+
+    def _render(self, now):
+        self.client.update_message(self.channel, self.ts, self.text() + STREAM_CURSOR + STREAM_DRAFT_NOTE, final=False)
+        self.last_update = now
+        self.updates += 1
+
+        if self.first_update_at is None:
+            self.first_update_at = now
+
+    def finish(self):
+        """Stop streaming; the caller renders the validated final answer"""
+        self.client.discard_pending(self.channel, self.ts)
+        return {
+            'stream_updates': self.updates,
+            'time_to_first_update_ms': int((self.first_update_at - self.started_at) * 1000)
+                if self.first_update_at is not None else None
+        }
@@ -0,0 +1,156 @@
+import os
+import re
+import zlib
+
+# Multinomial naive Bayes over hashed word/bigram/char-trigram features.
+# Trained offline by train_router.py and shipped as a compact .npz loaded at cold start.
+ROUTER_MODEL_PATH = os.environ.get(
+    'ROUTER_MODEL_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'router_model.npz')
+)
+N_FEATURES = 1 << 12
+BATCH_SIZE = 1024
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def _bucket(feature):
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(feature.encode('utf-8')) % N_FEATURES
+
+def extract_features(query):
+    """Hashed feature buckets for a query (with repeats, i.e. counts)"""
+    tokens = _TOKEN.findall(query.lower())
+    features = [f'w:{t}' for t in tokens]
+    features += [f'b:{a}_{b}' for a, b in zip(tokens, tokens[1:])]
+    for token in tokens:
+        padded = f'^{token}$'
+        features += [f'c:{padded[i:i + 3]}' for i in range(len(padded) - 2)]
+    return [_bucket(f) for f in features]
+
+class StatisticalRouter:
+    """Naive Bayes domain router with temperature-calibrated probabilities"""
+
+    def __init__(self, classes, log_prior, feature_log_prob, temperature=1.0):
+        import numpy as np
+
+        self.np = np
+        self.classes = list(classes)
+        self.log_prior = np.asarray(log_prior, dtype=np.float32)
+        self.feature_log_prob = np.asarray(feature_log_prob, dtype=np.float32)
+        self.temperature = float(temperature)
+
+    @classmethod
+    def train(cls, queries, labels, alpha=0.5, classes=None):
+        """Fit multinomial naive Bayes with Laplace smoothing"""
+        import numpy as np
+
+        classes = list(classes or sorted(set(labels)))
+        index = {c: i for i, c in enumerate(classes)}
+        counts = np.zeros((len(classes), N_FEATURES), dtype=np.float64)
+        class_counts = np.zeros(len(classes), dtype=np.float64)
+
+        for query, label in zip(queries, labels):
+            k = index[label]
+            class_counts[k] += 1
+            np.add.at(counts[k], extract_features(query), 1.0)
+
+        smoothed = counts + alpha
+        feature_log_prob = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        log_prior = np.log((class_counts + 1.0) / (class_counts.sum() + len(classes)))
+        return cls(classes, log_prior, feature_log_prob)
+
+    def _softmax(self, scores):
+        np = self.np
+        scores = scores / self.temperature
+        scores = scores - scores.max(axis=-1, keepdims=True)
+        exp = np.exp(scores)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def log_scores(self, query):
+        return self.log_prior + self.feature_log_prob[:, extract_features(query)].sum(axis=1)
+
+    def predict_proba(self, query):
+        """Calibrated probability per class for one query"""
+        return self._softmax(self.log_scores(query))
+
+    def predict_proba_batch(self, queries):
+        """Calibrated probabilities for many queries (n x classes), in fixed-size chunks"""
+        np = self.np
+        results = []
+        for start in range(0, len(queries), BATCH_SIZE):
+            chunk = queries[start:start + BATCH_SIZE]
+            counts = np.zeros((len(chunk), N_FEATURES), dtype=np.float32)
+            for row, query in enumerate(chunk):
+                np.add.at(counts[row], extract_features(query), 1.0)
+            scores = counts @ self.feature_log_prob.T + self.log_prior
+            results.append(self._softmax(scores))
+        return np.vstack(results) if results else np.zeros((0, len(self.classes)))
+
+    def rank(self, query):
+        """Ranked (domain, probability) distribution"""
+        probs = self.predict_proba(query)
+        order = probs.argsort()[::-1]
+        return [(self.classes[i], float(probs[i])) for i in order]
+
+    def classify(self, query):
+        domain, probability = self.rank(query)[0]
+        return domain, round(probability, 3)
+
+    def calibrate(self, queries, labels, temperatures=None):
+        """Pick the temperature minimising negative log-likelihood on held-out data"""
+        np = self.np
+        if temperatures is None:
+            temperatures = np.exp(np.linspace(np.log(0.25), np.log(20.0), 60))
+        index = {c: i for i, c in enumerate(self.classes)}
+        targets = np.array([index[label] for label in labels])
+        scores = np.stack([self.log_scores(q) for q in queries]).astype(np.float64)
+
+        best_t, best_nll = 1.0, float('inf')
+        for t in temperatures:
+            scaled = scores / t
+            scaled = scaled - scaled.max(axis=1, keepdims=True)
+            log_probs = scaled - np.log(np.exp(scaled).sum(axis=1, keepdims=True))
+            nll = -log_probs[np.arange(len(targets)), targets].mean()
+            if nll < best_nll:
+                best_t, best_nll = float(t), nll
+
+        self.temperature = best_t
+        return best_t, best_nll
+
+    def save(self, path=ROUTER_MODEL_PATH):
+        np = self.np
+        np.savez_compressed(
+            path,
+            classes=np.array(self.classes),
+            log_prior=self.log_prior,
+            feature_log_prob=self.feature_log_prob.astype(np.float16),
+            temperature=np.array(self.temperature),
+            n_features=np.array(N_FEATURES)
+        )
+
+    @classmethod
+    def load(cls, path=ROUTER_MODEL_PATH):
+        import numpy as np
+
+        with np.load(path) as data:
+            if int(data['n_features']) != N_FEATURES:
+                raise ValueError('Router model was trained with a different feature size')
+            return cls(
+                [str(c) for c in data['classes']],
+                data['log_prior'],
+                data['feature_log_prob'].astype(np.float32),
+                float(data['temperature'])
+            )
+
+_router = None
+_load_failed = False
+
+def get_router():
+    """Container-wide router, or None when numpy or the model file is unavailable"""
+    global _router, _load_failed
+    if _router is None and not _load_failed:
+        try:
+            _router = StatisticalRouter.load()
+        except (ImportError, OSError, ValueError, KeyError):
+            _load_failed = True
+    return _router
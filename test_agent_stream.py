@@ -0,0 +1,65 @@
+import sys
+sys.path.append('.')
+
+from agent_stream import AgentStreamParser, CHUNK, CITATIONS, DONE, FIRST_CHUNK
+
+print("="*70)
+print("🧪 Testing Incremental Agent Stream Parser")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def reference(uri, text):
+    return {'content': {'text': text}, 'location': {'type': 'S3', 's3Location': {'uri': uri}}}
+
+leave_ref = reference('s3://kb/hr/leave.pdf', 'Employees get 14 days of annual leave.')
+carry_ref = reference('s3://kb/hr/leave.pdf', 'Up to 5 days can be carried forward.')
+
+events = [
+    {'trace': {'trace': {'preProcessingTrace': {'modelInvocationInput': {'text': 'x' * 1000}}}}},
+    {'trace': {'trace': {'orchestrationTrace': {'observation': {
+        'knowledgeBaseLookupOutput': {'retrievedReferences': [leave_ref]}}}}}},
+    {'chunk': {'bytes': b'You get 14 days ', 'attribution': {'citations': [
+        {'generatedResponsePart': {}, 'retrievedReferences': [leave_ref]}]}}},
+    {'chunk': {'bytes': b'of annual leave.', 'attribution': {'citations': [
+        {'generatedResponsePart': {}, 'retrievedReferences': [carry_ref]}]}}}
+]
+
+# Test 1: Traces off (production)
+print("Test 1: Citations from attributions with traces off")
+print("-"*70)
+result = AgentStreamParser().consume(events)
+print(f"Response: {result['response']!r}, citations: {len(result['citations'])}")
+print("✅ Text and citations kept\n" if result['response'] == 'You get 14 days of annual leave.' and len(result['citations']) == 2 and 'trace_counts' not in result else "❌ Parse wrong\n")
+
+# Test 2: Traces on, duplicates removed
+print("Test 2: Trace references merged without duplicates")
+print("-"*70)
+parser = AgentStreamParser(collect_traces=True)
+result = parser.consume(events)
+print(f"Citations: {len(result['citations'])}, trace counts: {result['trace_counts']}")
+print("✅ Deduplicated\n" if len(result['citations']) == 2 and result['trace_counts'] == {'preProcessingTrace': 1, 'orchestrationTrace': 1} else "❌ Duplicates or counts wrong\n")
+
+# Test 3: Event order and callbacks
+print("Test 3: Incremental events")
+print("-"*70)
+clock = FakeClock()
+seen = []
+parser = AgentStreamParser(
+    callbacks={FIRST_CHUNK: lambda text: seen.append(('first', clock.now))},
+    collect_traces=True,
+    clock=clock
+)
+kinds = []
+for i, (kind, payload) in enumerate(parser.stream(iter(events))):
+    kinds.append(kind)
+    clock.now += 0.1
+print(f"Kinds: {kinds}")
+print(f"First chunk callback: {seen}, first_chunk_ms: {parser.first_chunk_ms}")
+expected = [CITATIONS, FIRST_CHUNK, CHUNK, CHUNK, CITATIONS, DONE]
+print("✅ Citations ready before text, first chunk flagged\n" if kinds == expected and len(seen) == 1 else "❌ Event order wrong\n")
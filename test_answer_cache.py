@@ -0,0 +1,177 @@
+import sys
+sys.path.append('.')
+
+import json
+import time
+from contextlib import contextmanager
+
+import answer_cache
+import lambda_answer_cache_warmer as warmer
+
+print("="*70)
+print("🧪 Testing Answer Cache and Nightly Warmer")
+print("="*70 + "\n")
+
+class FakeAnswerTable:
+    """In-memory hcg-demo-answer-cache keyed by (domain, normalized_query)"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key):
+        item = self.items.get((Key['domain'], Key['normalized_query']))
+        return {'Item': dict(item)} if item else {}
+
+    def put_item(self, Item):
+        self.items[(Item['domain'], Item['normalized_query'])] = dict(Item)
+
+    def delete_item(self, Key):
+        self.items.pop((Key['domain'], Key['normalized_query']), None)
+
+    def query(self, **kwargs):
+        domain = kwargs['ExpressionAttributeValues'][':domain']
+        return {'Items': [dict(item) for key, item in self.items.items() if key[0] == domain]}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeValues):
+        item = self.items.setdefault((Key['domain'], Key['normalized_query']), dict(Key))
+        item['generation'] = item.get('generation', 0) + ExpressionAttributeValues[':one']
+
+    @contextmanager
+    def batch_writer(self):
+        yield self
+
+class FakeCountsTable:
+    """In-memory hcg-demo-question-counts keyed by (day, question)"""
+
+    def __init__(self):
+        self.items = {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        values = ExpressionAttributeValues
+        item = self.items.setdefault((Key['day'], Key['question']), dict(Key, asked=0))
+        item['asked'] += values[':one']
+        item['domain'] = values[':domain']
+        item.setdefault('query', values[':query'])
+        item['ttl'] = values[':ttl']
+
+    def query(self, **kwargs):
+        day = kwargs['ExpressionAttributeValues'][':day']
+        return {'Items': [dict(item) for key, item in self.items.items() if key[0] == day]}
+
+class BrokenTable:
+    def update_item(self, **kwargs):
+        raise RuntimeError('throttled')
+
+answer_cache.answer_table = FakeAnswerTable()
+answer_cache.counts_table = FakeCountsTable()
+
+ANSWER = {'domain': 'it', 'response': 'Use the self-service reset page.', 'confidence_level': 'high'}
+
+# Test 1: Store and look up by normalized wording
+print("Test 1: Lookup matches the normalized question")
+print("-"*70)
+answer_cache.store_answer('it', 'How do I reset my password?', ANSWER, frequency=12)
+hit = answer_cache.lookup_answer('it', 'how do i reset my password')
+other_domain = answer_cache.lookup_answer('hr', 'How do I reset my password?')
+print(f"Hit: {hit is not None} | Other domain: {other_domain}")
+print("✅ Hit on reworded punctuation, domain-scoped\n" if hit == ANSWER and other_domain is None else "❌ Lookup wrong\n")
+
+# Test 2: Expired entries are ignored before DynamoDB deletes them
+print("Test 2: Expired entry is a miss")
+print("-"*70)
+key = ('it', 'how do i reset my password')
+answer_cache.answer_table.items[key]['ttl'] = int(time.time()) - 1
+expired = answer_cache.lookup_answer('it', 'How do I reset my password?')
+print(f"Lookup after expiry: {expired}")
+print("✅ Expired entry ignored\n" if expired is None else "❌ Served an expired answer\n")
+
+# Test 3: Invalidation drops answers and bumps the generation
+print("Test 3: Invalidate a domain")
+print("-"*70)
+answer_cache.store_answer('it', 'How do I reset my password?', ANSWER)
+answer_cache.store_answer('it', 'VPN not working', ANSWER)
+answer_cache.store_answer('hr', 'How many leave days do I get?', ANSWER)
+before = answer_cache.get_domain_generation('it')
+removed = answer_cache.invalidate_domain('it')
+after = answer_cache.get_domain_generation('it')
+remaining = sorted(k for k in answer_cache.answer_table.items if k[1] != answer_cache.GENERATION_KEY)
+print(f"Removed: {removed} | Generation: {before} -> {after} | Remaining: {remaining}")
+print("✅ Only the domain's answers dropped, generation bumped\n" if removed == 2 and after == before + 1 and remaining == [('hr', 'how many leave days do i get')] else "❌ Invalidation wrong\n")
+
+# Test 4: Questions are counted per day and outlive the session records
+print("Test 4: Daily question counts")
+print("-"*70)
+now = time.time()
+two_days_ago = now - 2 * 86400
+answer_cache.record_question('it', 'How do I reset my password?', timestamp=two_days_ago)
+answer_cache.record_question('it', 'how do i reset my password', timestamp=two_days_ago)
+answer_cache.record_question('it', 'How do I reset my password?', timestamp=now)
+answer_cache.record_question('it', 'Old question', timestamp=now - 10 * 86400)
+rows = sorted(answer_cache.iter_question_counts(7, now))
+print(f"Last 7 days: {rows}")
+print("✅ Counted per day, older days outside the window\n" if rows == [('it', 'How do I reset my password?', 1), ('it', 'How do I reset my password?', 2)] else "❌ Counts wrong\n")
+
+# Test 5: Counting never fails the request
+print("Test 5: Counter errors are swallowed")
+print("-"*70)
+counts_table, answer_cache.counts_table = answer_cache.counts_table, BrokenTable()
+errors = answer_cache.stats['errors']
+try:
+    answer_cache.record_question('it', 'VPN not working')
+    raised = False
+except Exception:
+    raised = True
+answer_cache.counts_table = counts_table
+print(f"Raised: {raised} | Errors counted: {answer_cache.stats['errors'] - errors}")
+print("✅ Error recorded, not raised\n" if not raised and answer_cache.stats['errors'] == errors + 1 else "❌ Counter failure leaked\n")
+
+# Test 6: Warmer mines a week of counts
+print("Test 6: Warmer mines the daily counts")
+print("-"*70)
+for _ in range(2):
+    answer_cache.record_question('hr', 'How many leave days do I get?', timestamp=now - 86400)
+answer_cache.record_question('hr', 'How many leave days do I get', timestamp=now)
+answer_cache.record_question('hr', 'Where is the payslip?', timestamp=now)
+frequent = warmer.mine_frequent_queries(top_n=25, min_frequency=3)
+print(f"Frequent: {frequent}")
+expected = {'it': [('How do I reset my password?', 3)], 'hr': [('How many leave days do I get', 3)]}
+print("✅ Yesterday's and today's askings summed, rare questions skipped\n" if frequent == expected else "❌ Mining wrong\n")
+
+# Test 7: Warming goes through the classifier, like a live first question
+print("Test 7: Warm through the normal classifier path")
+print("-"*70)
+calls = []
+
+def fake_handle_query(query, session_id, stream_to=None, route=None, use_cache=True, user_email=None):
+    calls.append({'route': route, 'use_cache': use_cache})
+    domain = 'finance' if 'expense' in query else 'hr'
+    return {'query': query, 'domain': domain, 'routed_by': 'classifier', 'route_confidence': 0.72,
+            'bedrock_session_id': session_id, 'safe_to_respond': True, 'confidence_level': 'high',
+            'response': 'Submit it in Concur.', 'citations': []}
+
+handle_query = warmer.lambda_supervisor_agent.handle_query
+warmer.lambda_supervisor_agent.handle_query = fake_handle_query
+try:
+    result = warmer.warm_query('hr', 'How do I claim travel expenses?', 5)
+finally:
+    warmer.lambda_supervisor_agent.handle_query = handle_query
+stored = answer_cache.answer_table.items.get(('finance', 'how do i claim travel expenses'))
+cached = json.loads(stored['response_data']) if stored else {}
+print(f"Calls: {calls} | Result: {result}")
+print(f"Stored route confidence: {cached.get('route_confidence')} | Session fields kept: {[f for f in ('bedrock_session_id', 'routed_by') if f in cached]}")
+print("✅ Classified, cached under the classified domain\n" if calls == [{'route': None, 'use_cache': False}] and result['cached'] and cached.get('route_confidence') == 0.72 and 'routed_by' not in cached else "❌ Warm path wrong\n")
+
+# Test 8: Unvalidated answers are not cached
+print("Test 8: Low-confidence answers are skipped")
+print("-"*70)
+
+def unsure_handle_query(query, session_id, **kwargs):
+    return {'query': query, 'domain': 'it', 'safe_to_respond': True, 'confidence_level': 'medium', 'response': '...'}
+
+warmer.lambda_supervisor_agent.handle_query = unsure_handle_query
+try:
+    result = warmer.warm_query('it', 'Is the VPN down?', 4)
+finally:
+    warmer.lambda_supervisor_agent.handle_query = handle_query
+print(f"Result: {result}")
+print("✅ Not cached\n" if not result['cached'] and ('it', 'is the vpn down') not in answer_cache.answer_table.items else "❌ Cached an unvalidated answer\n")
@@ -0,0 +1,138 @@
+import sys
+sys.path.append('.')
+
+import copy
+
+import conversation_store
+from conversation_store import ConversationStore
+from ttl_cache import TTLCache
+
+print("="*70)
+print("🧪 Testing Conversation Store")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class ConditionalCheckFailed(Exception):
+    response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+
+class FakeSessionsTable:
+    """In-memory hcg-demo-sessions supporting the store's version-conditioned put"""
+
+    def __init__(self):
+        self.items = {}
+        self.puts = 0
+        self.gets = 0
+
+    def get_item(self, Key, ConsistentRead=False):
+        self.gets += 1
+        item = self.items.get(Key['sessionId'])
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues=None):
+        current = self.items.get(Item['sessionId'])
+        version = current.get('version') if current else None
+        if ConditionExpression == 'attribute_not_exists(#version)':
+            allowed = version is None
+        else:
+            allowed = version is not None and version == ExpressionAttributeValues[':version']
+        if not allowed:
+            raise ConditionalCheckFailed()
+        self.puts += 1
+        self.items[Item['sessionId']] = copy.deepcopy(Item)
+
+ANSWER = {'domain': 'hr', 'agent_id': 'IEVMSZT1GY', 'route_confidence': 0.9, 'safe_to_respond': True,
+          'response': 'You get 14 days of annual leave.'}
+
+# Test 1: A cold container keeps the thread's history
+print("Test 1: Follow-up recorded by a fresh store instance")
+print("-"*70)
+table = FakeSessionsTable()
+first = ConversationStore(table)
+first.record_turn('C1_1.0', 'U1', "How many days of annual leave do I get?", ANSWER)
+first.record_turn('C1_1.0', 'U1', "Can I carry them forward?", ANSWER)
+cold = ConversationStore(table)
+cold.record_turn('C1_1.0', 'U1', "View leave policy", ANSWER)
+stored = table.items['C1_1.0']
+print(f"Turns: {len(stored['turns'])}, userId: {stored.get('userId')}, version: {stored['version']}")
+print("✅ Nothing lost\n" if len(stored['turns']) == 6 and stored['userId'] == 'U1'
+      and stored['turns'][0]['text'].startswith('How many days') else "❌ History overwritten\n")
+
+# Test 2: Containers with stale caches do not overwrite each other
+print("Test 2: Concurrent writers with stale caches")
+print("-"*70)
+table = FakeSessionsTable()
+a, b = ConversationStore(table), ConversationStore(table)
+a.record_turn('C1_2.0', 'U1', "How do I reset my password?", ANSWER)
+b.get('C1_2.0')
+a.record_turn('C1_2.0', 'U1', "Which portal?", ANSWER)
+b.record_turn('C1_2.0', 'U1', "And for MFA?", ANSWER)
+questions = [turn['text'] for turn in table.items['C1_2.0']['turns'] if turn['role'] == 'user']
+print(f"Questions: {questions}, conflicts retried: {b.stats['write_conflicts']}")
+print("✅ Both containers' turns kept\n" if questions == ["How do I reset my password?", "Which portal?", "And for MFA?"]
+      and b.stats['write_conflicts'] == 1 else "❌ Lost update\n")
+
+# Test 3: Records written before versioning are extended, not replaced
+print("Test 3: Unversioned record")
+print("-"*70)
+table = FakeSessionsTable()
+table.items['C1_3.0'] = {'sessionId': 'C1_3.0', 'userId': 'U2', 'turns': [{'role': 'user', 'text': 'hi', 'ts': 1}]}
+ConversationStore(table).record_turn('C1_3.0', 'U2', "Office hours?", ANSWER)
+stored = table.items['C1_3.0']
+print(f"Turns: {[turn['text'] for turn in stored['turns']]}, version: {stored['version']}")
+print("✅ Extended\n" if len(stored['turns']) == 3 and stored['version'] == 1 else "❌ Replaced\n")
+
+# Test 4: Cold cache reads through, then serves from the cache until it expires
+print("Test 4: get() on a cold cache")
+print("-"*70)
+clock = FakeClock()
+table = FakeSessionsTable()
+ConversationStore(table).record_turn('C1_4.0', 'U1', "How many days of annual leave do I get?", ANSWER)
+store = ConversationStore(table, cache=TTLCache(ttl=conversation_store.CACHE_TTL_SECONDS, clock=clock))
+gets = table.gets
+cold = store.get('C1_4.0')
+warm = store.get('C1_4.0')
+reads_while_cached = table.gets - gets
+ConversationStore(table).record_turn('C1_4.0', 'U1', "Can I carry them forward?", ANSWER)
+stale = store.get('C1_4.0')
+clock.now = conversation_store.CACHE_TTL_SECONDS
+refreshed = store.get('C1_4.0')
+missing = store.get('C1_unknown')
+print(f"Cold read turns: {len(cold['turns'])} | table reads while cached: {reads_while_cached} | "
+      f"before expiry: {len(stale['turns'])} turns, after: {len(refreshed['turns'])} | unknown thread: {missing}")
+print("✅ Read through once, re-read after the cache TTL\n" if len(cold['turns']) == 2 and warm is cold and reads_while_cached == 1
+      and len(stale['turns']) == 2 and len(refreshed['turns']) == 4 and missing is None else "❌ Cache read-through wrong\n")
+
+# Test 5: Route reuse
+print("Test 5: get_route() returns only validated routes")
+print("-"*70)
+table = FakeSessionsTable()
+store = ConversationStore(table)
+no_thread = store.get_route('C1_5.0')
+store.record_turn('C1_5.0', 'U1', "Can you help?", dict(ANSWER, domain='general', safe_to_respond=False))
+unvalidated = store.get_route('C1_5.0')
+store.record_turn('C1_5.0', 'U1', "How many days of annual leave do I get?", ANSWER)
+route = ConversationStore(table).get_route('C1_5.0')
+print(f"New thread: {no_thread} | after escalation: {unvalidated} | cold store after answer: {route}")
+print("✅ Route stored for validated answers and read by a cold store\n" if no_thread is None and unvalidated is None
+      and route == {'domain': 'hr', 'agent_id': 'IEVMSZT1GY', 'confidence': 0.9, 'bedrock_session_id': 'C1_5.0'} else "❌ Route wrong\n")
+
+# Test 6: Records stay bounded
+print("Test 6: History bounded and turns truncated")
+print("-"*70)
+table = FakeSessionsTable()
+store = ConversationStore(table)
+for i in range(12):
+    store.record_turn('C1_6.0', 'U1', f"Question {i} " + "x" * 1000, ANSWER, job_key=f'event:Ev{i}')
+stored = table.items['C1_6.0']
+longest = max(len(turn['text']) for turn in stored['turns'])
+print(f"Turns: {len(stored['turns'])} | longest: {longest} chars | first kept: {stored['turns'][0]['text'][:10]} | "
+      f"answered jobs: {len(stored['answered_jobs'])} | version: {stored['version']}")
+print("✅ Bounded\n" if len(stored['turns']) == conversation_store.MAX_TURNS and longest <= conversation_store.MAX_TURN_CHARS
+      and stored['turns'][0]['text'].startswith('Question 7') and len(stored['answered_jobs']) == conversation_store.MAX_TURNS
+      and store.has_answered('C1_6.0', 'event:Ev11') and not store.has_answered('C1_6.0', 'event:Ev0') else "❌ Record grows\n")
@@ -0,0 +1,101 @@
+import sys
+sys.path.append('.')
+
+from botocore.exceptions import ClientError
+import json
+
+import lambda_webhook_handler_complete as webhook
+from event_dedup import EventDeduplicator, get_event_key
+
+print("="*70)
+print("🧪 Testing Slack Event Deduplication")
+print("="*70 + "\n")
+
+class FakeTable:
+    """DynamoDB stand-in honouring attribute_not_exists conditions"""
+    def __init__(self):
+        self.items = {}
+
+    def put_item(self, Item, ConditionExpression=None):
+        if ConditionExpression and Item['eventKey'] in self.items:
+            raise ClientError(
+                {'Error': {'Code': 'ConditionalCheckFailedException', 'Message': 'exists'}},
+                'PutItem'
+            )
+        self.items[Item['eventKey']] = Item
+
+    def delete_item(self, Key):
+        self.items.pop(Key['eventKey'], None)
+
+message = {'type': 'event_callback', 'event_id': 'Ev123', 'event': {'text': 'hi'}}
+click = {'type': 'block_actions', 'actions': [{'action_id': 'followup_0', 'action_ts': '1700000000.1'}]}
+
+# Test 1: Keys
+print("Test 1: Idempotency keys")
+print("-"*70)
+print(f"Message: {get_event_key(message)} | Click: {get_event_key(click)}")
+print("✅ Keys derived\n" if get_event_key(message) == 'event:Ev123' and get_event_key(click) == 'action:1700000000.1' else "❌ Wrong keys\n")
+
+# Test 2: Retry in the same container is suppressed locally
+print("Test 2: Same-container retry")
+print("-"*70)
+table = FakeTable()
+dedup = EventDeduplicator(table)
+first = dedup.claim(get_event_key(message))
+retry = dedup.claim(get_event_key(message))
+print(f"First: {first}, retry: {retry}, stats: {dedup.stats}")
+print("✅ Retry suppressed\n" if first and not retry else "❌ Retry processed again\n")
+
+# Test 3: Retry landing in another container is suppressed by DynamoDB
+print("Test 3: Cross-container retry")
+print("-"*70)
+other = EventDeduplicator(table)
+retry = other.claim(get_event_key(message))
+print(f"Retry: {retry}, stats: {other.stats}")
+print("✅ Conditional write suppressed retry\n" if not retry and other.stats['suppressed_remote'] == 1 else "❌ Retry processed again\n")
+
+# Test 4: LRU stays bounded
+print("Test 4: Bounded LRU")
+print("-"*70)
+small = EventDeduplicator(max_size=10)
+for i in range(100):
+    small.claim(f"event:{i}")
+print(f"Entries kept: {len(small.seen)}")
+print("✅ LRU bounded\n" if len(small.seen) == 10 else "❌ LRU unbounded\n")
+
+# Test 5: A released claim lets the retry through
+print("Test 5: Release after failed processing")
+print("-"*70)
+table = FakeTable()
+dedup = EventDeduplicator(table)
+dedup.claim('event:Ev9')
+dedup.release('event:Ev9')
+released = 'event:Ev9' not in table.items
+retry_here = dedup.claim('event:Ev9')
+dedup.release('event:Ev9')
+retry_elsewhere = EventDeduplicator(table).claim('event:Ev9')
+print(f"Item deleted: {released}, retry claimed here: {retry_here}, in another container: {retry_elsewhere}")
+print("✅ Claim released\n" if released and retry_here and retry_elsewhere else "❌ Claim kept\n")
+
+# Test 6: Dispatch failure in the webhook does not swallow Slack's retry
+print("Test 6: Webhook dispatch raises, retry is processed")
+print("-"*70)
+webhook.event_dedup = EventDeduplicator(FakeTable())
+dispatched = []
+
+def flaky_dispatch(job):
+    if not dispatched:
+        dispatched.append(None)
+        raise ConnectionError('SQS unavailable')
+    dispatched.append(job)
+
+webhook.dispatch_job = flaky_dispatch
+event = {'body': json.dumps({'type': 'event_callback', 'event_id': 'Ev77', 'event': {'type': 'message', 'channel': 'C1', 'user': 'U1', 'text': 'VPN not working', 'ts': '1.0'}})}
+try:
+    webhook.lambda_handler(event, None)
+    first_failed = False
+except ConnectionError:
+    first_failed = True
+retry = json.loads(webhook.lambda_handler(event, None)['body'])
+print(f"First delivery failed: {first_failed}, retry: {retry}, jobs dispatched: {len(dispatched) - 1}")
+print("✅ Retry processed\n" if first_failed and not retry.get('duplicate') and dispatched[-1]['query'] == 'VPN not working' else "❌ Question lost\n")
@@ -0,0 +1,94 @@
+import sys
+sys.path.append('.')
+
+import threading
+import time
+
+import lambda_supervisor_agent as supervisor
+import trace_report
+import tracing
+
+print("="*70)
+print("🧪 Testing Concurrent Multi-Agent Fan-out")
+print("="*70 + "\n")
+
+# Fake agents: domain -> (delay seconds, retrieval score)
+AGENT_BEHAVIOUR = {}
+agent_domains = {config['id']: domain for domain, config in supervisor.AGENTS.items()}
+started = []
+
+def fake_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    domain = agent_domains[agent_id]
+    started.append(domain)
+    delay, score = AGENT_BEHAVIOUR[domain]
+    deadline = time.monotonic() + delay
+    while time.monotonic() < deadline:
+        if cancel_event is not None and cancel_event.is_set():
+            return {'response': '', 'citations': [], 'confidence': 0.0}
+        time.sleep(0.005)
+    citations = [{'content': {'text': f'{domain} policy'}, 'score': score}] * 3
+    return {'response': f'{domain} answer', 'citations': citations, 'confidence': 0.9}
+
+supervisor.invoke_agent = fake_invoke_agent
+
+# Test 1: Ambiguity detection
+print("Test 1: Only ambiguous queries fan out")
+print("-"*70)
+clear = supervisor.fanout_candidates("How do I reset my VPN password?")
+ambiguous = supervisor.fanout_candidates("expense for a new laptop")
+print(f"Clear: {clear} | Ambiguous: {[d for d, _ in ambiguous or []]}")
+print("✅ Ambiguity detected\n" if clear is None and ambiguous and len(ambiguous) == 2 else "❌ Ambiguity wrong\n")
+
+# Test 2: Latency close to one call, best evidence wins
+print("Test 2: Concurrent calls, best validated answer wins")
+print("-"*70)
+AGENT_BEHAVIOUR.update({'it': (0.3, 0.6), 'finance': (0.3, 0.8)})
+candidates = [('it', 0.5), ('finance', 0.45)]
+start = time.perf_counter()
+domain, result, validation, info = supervisor.fan_out_query("expense for a new laptop", 's1', candidates, 0.5)
+elapsed = time.perf_counter() - start
+print(f"Winner: {domain} ({validation['confidence']:.2f}) in {elapsed*1000:.0f} ms, info: {info}")
+print("✅ Parallel and evidence-based\n" if domain == 'finance' and elapsed < 0.5 and info['winner_changed'] else "❌ Fan-out wrong\n")
+
+# Test 3: High-confidence answer cancels stragglers
+print("Test 3: Stragglers cancelled")
+print("-"*70)
+AGENT_BEHAVIOUR.update({'it': (0.05, 0.95), 'finance': (5.0, 0.9)})
+start = time.perf_counter()
+domain, _, _, info = supervisor.fan_out_query("expense for a new laptop", 's2', candidates, 0.95)
+elapsed = time.perf_counter() - start
+print(f"Winner: {domain} in {elapsed*1000:.0f} ms, cancelled: {info['cancelled']}")
+print("✅ Returned without waiting for the slow agent\n" if domain == 'it' and elapsed < 1.0 and info['cancelled'] == 1 else "❌ Waited for straggler\n")
+
+# Test 4: Shared deadline
+print("Test 4: Deadline falls back safely")
+print("-"*70)
+supervisor.FANOUT_DEADLINE_SECONDS = 0.1
+AGENT_BEHAVIOUR.update({'it': (2.0, 0.9), 'finance': (2.0, 0.9)})
+start = time.perf_counter()
+domain, _, validation, info = supervisor.fan_out_query("expense for a new laptop", 's3', candidates, 0.5)
+elapsed = time.perf_counter() - start
+print(f"Domain: {domain}, safe: {validation['safe_to_respond']}, {elapsed*1000:.0f} ms")
+print("✅ Deadline honoured\n" if not validation['safe_to_respond'] and elapsed < 0.5 else "❌ Deadline ignored\n")
+
+# Test 5: Metrics
+print("Test 5: Winner-change metrics")
+print("-"*70)
+print(f"Stats: {supervisor.fanout_stats}")
+print("✅ Metrics tracked\n" if supervisor.fanout_stats['fanouts'] == 3 and supervisor.fanout_stats['winner_changed'] == 1 else "❌ Metrics wrong\n")
+
+# Test 6: Fan-out outcome reaches the trace record and the report
+print("Test 6: Fan-out block in traces")
+print("-"*70)
+supervisor.FANOUT_DEADLINE_SECONDS = 20
+AGENT_BEHAVIOUR.update({'it': (0.05, 0.6), 'finance': (0.05, 0.8)})
+records = []
+for _ in range(2):
+    tracing.start_trace(service='supervisor')
+    supervisor.fan_out_query("expense for a new laptop", 's4', candidates, 0.5)
+    records.append(tracing.finish_trace())
+events = trace_report.collect(records)[3]['supervisor']
+print(f"Trace fanout: {records[0].get('fanout')}")
+print(f"Report: {dict(events)}")
+print("✅ Emitted and aggregated\n" if records[0].get('fanout', {}).get('winner') == 'finance'
+      and events['fanout'] == 2 and events['fanout.winner_changed'] == 2 and events['fanout.won.finance'] == 2 else "❌ Not emitted\n")
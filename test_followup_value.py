@@ -0,0 +1,70 @@
+import sys
+sys.path.append('.')
+
+import json
+
+from lambda_webhook_handler_complete import (
+    BUTTON_VALUE_MAX_CHARS, decode_followup_value, encode_followup_value, format_response_with_citations
+)
+
+print("="*70)
+print("🧪 Testing Follow-up Button Values")
+print("="*70 + "\n")
+
+ROUTE = {'domain': 'hr', 'agent_id': 'IEVMSZT1GY', 'confidence': 0.93, 'bedrock_session_id': 'C1_1700000000.1'}
+
+# Test 1: Round trip
+print("Test 1: Encoded route round-trips")
+print("-"*70)
+value = encode_followup_value("View leave policy", ROUTE)
+decoded = decode_followup_value(value)
+partial = decode_followup_value(encode_followup_value("Check benefits", {'domain': 'hr', 'agent_id': None, 'confidence': None}))
+print(f"Value: {value} ({len(value)} chars)")
+print(f"Decoded: {decoded} | partial route: {partial}")
+print("✅ Query and route restored\n" if decoded == ("View leave policy", ROUTE)
+      and partial == ("Check benefits", {'domain': 'hr', 'agent_id': None, 'confidence': None}) else "❌ Round trip lost data\n")
+
+# Test 2: Without a usable route the value is the plain suggestion
+print("Test 2: No route, plain value")
+print("-"*70)
+plain = [encode_followup_value("Contact HR"), encode_followup_value("Contact HR", {}), encode_followup_value("Contact HR", {'domain': None})]
+print(f"Values: {plain} | decoded: {decode_followup_value(plain[0])}")
+print("✅ Plain suggestion\n" if plain == ["Contact HR"] * 3 and decode_followup_value(plain[0]) == ("Contact HR", None) else "❌ Plain value wrong\n")
+
+# Test 3: Slack's 2000-char limit
+print("Test 3: Values never exceed Slack's button value limit")
+print("-"*70)
+oversized_route = dict(ROUTE, bedrock_session_id='s' * BUTTON_VALUE_MAX_CHARS)
+oversized = encode_followup_value("View leave policy", oversized_route)
+long_suggestion = encode_followup_value("x" * 3000, ROUTE)
+fits = dict(ROUTE, bedrock_session_id='s' * (BUTTON_VALUE_MAX_CHARS - len(value) + len(ROUTE['bedrock_session_id'])))
+at_limit = encode_followup_value("View leave policy", fits)
+blocks = format_response_with_citations("You get 14 days.", [], 'hr', oversized_route)
+button_values = [e['value'] for block in blocks if block['type'] == 'actions' for e in block['elements']]
+print(f"Oversized route: {len(oversized)} chars -> {decode_followup_value(oversized)}")
+print(f"Long suggestion: {len(long_suggestion)} chars | exactly at limit: {len(at_limit)} chars, route kept: {decode_followup_value(at_limit)[1] == fits}")
+print(f"Longest button value in a rendered answer: {max(len(v) for v in button_values)}")
+print("✅ Oversized values fall back to the plain suggestion\n" if oversized == "View leave policy"
+      and decode_followup_value(oversized) == ("View leave policy", None) and len(long_suggestion) == BUTTON_VALUE_MAX_CHARS
+      and len(at_limit) == BUTTON_VALUE_MAX_CHARS and decode_followup_value(at_limit) == ("View leave policy", fits)
+      and max(len(v) for v in button_values) <= BUTTON_VALUE_MAX_CHARS else "❌ Limit exceeded\n")
+
+# Test 4: Legacy and malformed values decode as a plain query
+print("Test 4: Legacy and malformed values")
+print("-"*70)
+values = [
+    "View leave policy",                             # buttons posted before routes were encoded
+    "{Contact HR}",                                  # suggestion text that happens to start with a brace
+    '{"query": "View leave policy"',                 # truncated JSON
+    '{}',
+    '{"route": {"domain": "hr"}}',                   # no query
+    '{"query": 5, "route": {"domain": "hr"}}',       # query is not text
+    '["View leave policy"]'
+]
+decoded = [decode_followup_value(v) for v in values]
+bad_route = decode_followup_value(json.dumps({'query': "Check benefits", 'route': 'hr'}))
+no_domain = decode_followup_value(json.dumps({'query': "Check benefits", 'route': {'agent_id': 'X'}}))
+print(f"Decoded: {decoded}")
+print(f"Route not an object: {bad_route} | route without domain: {no_domain}")
+print("✅ Treated as plain queries, unusable routes dropped\n" if decoded == [(v, None) for v in values]
+      and bad_route == ("Check benefits", None) and no_domain == ("Check benefits", None) else "❌ Malformed value mis-decoded\n")
@@ -0,0 +1,87 @@
+import sys
+sys.path.append('.')
+
+import time
+
+from grounding import score_grounding
+from safe_failure_handler import check_hallucination_indicators, validate_response
+
+print("="*70)
+print("🧪 Testing Lexical Grounding")
+print("="*70 + "\n")
+
+PASSAGES = [
+    "Employees are entitled to 14 days of annual leave in their first year of service. "
+    "Leave entitlement increases by one day for every completed year, up to 21 days.",
+    "Submit your leave request in Workday at least two weeks in advance. "
+    "For questions, contact HR at hr@starhub.com or extension 2100.",
+    "The leave policy was last updated on 1 March 2024 and applies to all permanent staff."
+]
+CITATIONS = [{'content': {'text': text}, 'location': {}, 'metadata': {'score': 0.9}} for text in PASSAGES]
+
+# Test 1: An answer taken from the passages
+print("Test 1: Grounded answer scores high")
+print("-"*70)
+grounded = ("Employees are entitled to 14 days of annual leave in their first year, increasing by one day "
+            "for every completed year up to 21 days. Submit your leave request in Workday two weeks in advance.")
+result = score_grounding(grounded, CITATIONS)
+print(f"Grounding: {result}")
+print("✅ Grounded\n" if result['score'] >= 0.8 and not result['unsupported_facts'] else "❌ Grounded answer scored low\n")
+
+# Test 2: An answer about something else entirely
+print("Test 2: Unrelated answer scores low")
+print("-"*70)
+unrelated = "Restart the VPN client and reconnect to the corporate network using your smart card."
+result = score_grounding(unrelated, CITATIONS)
+print(f"Grounding: {result}")
+print("✅ Ungrounded\n" if result['score'] < 0.35 and result['unsupported_sentences'] == result['sentences'] else "❌ Unrelated answer scored high\n")
+
+# Test 3: Right wording, wrong facts
+print("Test 3: Numbers, dates and addresses missing from the passages")
+print("-"*70)
+altered = ("Employees are entitled to 18 days of annual leave in their first year of service. "
+           "The leave policy was last updated on 1 April 2024. Contact HR at hr.help@starhub.com or extension 2,100.")
+result = score_grounding(altered, CITATIONS)
+print(f"Unsupported facts: {result['unsupported_facts']}")
+print("✅ Altered facts caught\n" if result['unsupported_facts'] == ['18', 'apr', 'hr.help@starhub.com'] else "❌ Facts missed\n")
+
+# Test 4: Formatting does not count against an answer
+print("Test 4: List markers, punctuation and case")
+print("-"*70)
+listed = ("Your leave:\n1. 14 days of ANNUAL LEAVE in the first year;\n2) one more day for every completed year "
+          "(up to 21 days)\n• Submit requests in Workday — at least two weeks in advance.")
+result = score_grounding(listed, CITATIONS)
+print(f"Grounding: {result}")
+print("✅ Formatting ignored\n" if result['score'] >= 0.7 and not result['unsupported_facts'] else "❌ Formatting penalised\n")
+
+# Test 5: Nothing to check against
+print("Test 5: Citations without passage text")
+print("-"*70)
+empty = [score_grounding(grounded, []), score_grounding(grounded, None), score_grounding(grounded, [{'metadata': {'score': 0.9}}])]
+string_content = score_grounding(grounded, [{'content': PASSAGES[0] + ' ' + PASSAGES[1]}])
+print(f"No text: {empty}, string content: {string_content['score']:.2f}")
+print("✅ Skipped when there is no text\n" if empty == [None, None, None] and string_content['score'] >= 0.8 else "❌ Wrong handling\n")
+
+# Test 6: Cheap enough to run on every answer
+print("Test 6: Under a millisecond per answer")
+print("-"*70)
+long_citations = [{'content': {'text': ' '.join(PASSAGES * 6)}}] * 5
+runs = 500
+start = time.perf_counter()
+for _ in range(runs):
+    score_grounding(altered, long_citations)
+per_call_ms = (time.perf_counter() - start) / runs * 1000
+print(f"Passages: {sum(len(c['content']['text']) for c in long_citations)} chars, {per_call_ms:.3f} ms per answer")
+print("✅ Fast\n" if per_call_ms < 1.0 else "❌ Too slow\n")
+
+# Test 7: Grounding feeds the hallucination score
+print("Test 7: validate_response uses grounding")
+print("-"*70)
+grounded_score = check_hallucination_indicators(grounded, CITATIONS)
+altered_score = check_hallucination_indicators(altered, CITATIONS)
+fabricated = "Employees get 30 days of sabbatical after 5 years; email ceo.office@gmail.com to apply by 9 June."
+rejected = validate_response(fabricated, CITATIONS, 0.9, 'hr')
+accepted = validate_response(grounded, CITATIONS, 0.9, 'hr')
+print(f"Hallucination: grounded {grounded_score:.2f}, altered {altered_score:.2f}")
+print(f"Fabricated: {rejected['reason'] if not rejected['safe_to_respond'] else 'accepted'}, grounded: {'accepted' if accepted['safe_to_respond'] else accepted['reason']}")
+print("✅ Ungrounded answers rejected\n" if grounded_score < altered_score and not rejected['safe_to_respond'] and accepted['safe_to_respond'] and accepted['grounding']['score'] >= 0.8 else "❌ Grounding ignored\n")
@@ -0,0 +1,102 @@
+import sys
+sys.path.append('.')
+
+import kb_fast_path
+import lambda_supervisor_agent as supervisor
+from kb_citations import from_reference, top_sources
+from safe_failure_handler import calculate_kb_confidence, validate_response
+
+print("="*70)
+print("🧪 Testing Citation Scores End to End")
+print("="*70 + "\n")
+
+def retrieval_result(text, uri, chunk_id, score):
+    """One item of a Bedrock retrieve response"""
+    return {
+        'content': {'text': text},
+        'location': {'type': 'S3', 's3Location': {'uri': uri}},
+        'score': score,
+        'metadata': {
+            'x-amz-bedrock-kb-source-uri': uri,
+            'x-amz-bedrock-kb-chunk-id': chunk_id,
+            'x-amz-bedrock-kb-data-source-id': 'DS1'
+        }
+    }
+
+LEAVE_POLICY = 's3://hcg-demo-kb-hr/leave_policy.pdf'
+RESULTS = [
+    retrieval_result("Employees are entitled to 14 days of annual leave in their first year.", LEAVE_POLICY, 'c1', 0.82),
+    retrieval_result("Annual leave increases by one day per completed year, up to 21 days.", LEAVE_POLICY, 'c2', 0.78),
+    retrieval_result("Leave requests are submitted in Workday two weeks in advance.", 's3://hcg-demo-kb-hr/workday_guide.pdf', 'c3', 0.75),
+    retrieval_result("The canteen is open from 8am to 6pm on weekdays.", 's3://hcg-demo-kb-hr/facilities.pdf', 'c4', 0.31)
+]
+
+# Test 1: Retrieve results and agent attributions become the same citation shape
+print("Test 1: Citation model")
+print("-"*70)
+retrieved = from_reference(RESULTS[0], 'hr')
+attributed = from_reference({
+    'content': {'text': 'Restart the VPN client.'},
+    'location': {'type': 'WEB', 'webLocation': {'url': 'https://intranet/vpn'}},
+    'metadata': {'x-amz-bedrock-kb-chunk-id': 'w7'}
+}, 'it')
+print(f"Retrieved: {retrieved}")
+print(f"Attributed: {attributed}")
+print("✅ Score, URI, chunk id and domain kept\n" if retrieved == {
+    'content': RESULTS[0]['content']['text'], 'location': LEAVE_POLICY, 'chunk_id': 'c1', 'score': 0.82, 'domain': 'hr'
+} and attributed['location'] == 'https://intranet/vpn' and attributed['score'] is None else "❌ Fields lost\n")
+
+# Test 2: Confidence follows the scores, not the number of citations
+print("Test 2: Confidence from the score distribution")
+print("-"*70)
+strong = [from_reference(r, 'hr') for r in RESULTS[:3]]
+weak = [from_reference(retrieval_result('x', f's3://kb/{i}.pdf', str(i), 0.32), 'hr') for i in range(5)]
+scattered = [from_reference(r, 'hr') for r in RESULTS]
+unscored = [dict(c, score=None) for c in strong]
+confidences = {name: round(calculate_kb_confidence(c), 3) for name, c in
+               [('strong', strong), ('weak', weak), ('scattered', scattered), ('unscored', unscored)]}
+print(f"Confidence: {confidences}")
+print("✅ Scores decide\n" if confidences['strong'] > 0.85 and confidences['weak'] < 0.45
+      and confidences['scattered'] == confidences['strong'] and confidences['unscored'] == 0.6 else "❌ Still a citation count\n")
+
+# Test 3: A well-supported answer is no longer disclaimed (three citations used to mean 0.6)
+print("Test 3: validate_response with real scores")
+print("-"*70)
+answer = "Employees are entitled to 14 days of annual leave in their first year, up to 21 days."
+scored = validate_response(answer, strong, 0.85, 'hr')
+weak_answer = validate_response(answer, weak, 0.85, 'hr')
+print(f"Strong retrieval: {scored['confidence_level']}, weak retrieval: {weak_answer['confidence_level']}")
+print("✅ Levels follow retrieval quality\n" if scored['confidence_level'] == 'high' and weak_answer['confidence_level'] == 'medium' else "❌ Wrong levels\n")
+
+# Test 4: Supervisor passes the scores through to its response
+print("Test 4: Scores reach the supervisor response (fast path and agent)")
+print("-"*70)
+kb_fast_path.retrieve = lambda domain, query, number_of_results=5: RESULTS[:3]
+kb_fast_path.generate = lambda domain, query, references, on_chunk=None: (answer, {'input_tokens': 1, 'output_tokens': 1})
+supervisor.answer_from_kb = kb_fast_path.answer_from_kb
+supervisor.SEMANTIC_CACHE_ENABLED = False
+supervisor.REDIRECTS_ENABLED = False
+supervisor.ANSWER_CACHE_ENABLED = False
+supervisor.COALESCE_ENABLED = False
+supervisor.ANSWER_PATH = 'auto'
+fast = supervisor.handle_query("how many days of annual leave do I get", 's1')
+
+def fake_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    # Agent attributions: same references, without a relevance score
+    return {'response': answer, 'citations': [dict(r, score=None) for r in RESULTS[:3]], 'confidence': 0.9}
+
+supervisor.invoke_agent = fake_invoke_agent
+supervisor.ANSWER_PATH = 'agent'
+agent = supervisor.handle_query("how many days of annual leave do I get", 's2')
+print(f"Fast path ({fast['path']}): {[(c['chunk_id'], c['score'], c['domain']) for c in fast['citations']]}")
+print(f"Agent ({agent['path']}): {[(c['chunk_id'], c['score'], c['domain']) for c in agent['citations']]}")
+print("✅ Citations carried through\n" if [c['score'] for c in fast['citations']] == [0.82, 0.78, 0.75]
+      and fast['citations'][0]['location'] == LEAVE_POLICY and all(c['domain'] == fast['domain'] for c in fast['citations'])
+      and [c['chunk_id'] for c in agent['citations']] == ['c1', 'c2', 'c3'] else "❌ Citations lost\n")
+
+# Test 5: Slack shows the best passage of each document
+print("Test 5: Sources for the Slack message")
+print("-"*70)
+sources = top_sources(list(reversed(scattered)))
+print(f"Sources: {[(s['location'].rsplit('/', 1)[-1], s['score']) for s in sources]}")
+print("✅ Ranked, one per document\n" if [s['chunk_id'] for s in sources] == ['c1', 'c3', 'c4'] else "❌ Wrong sources\n")
@@ -0,0 +1,95 @@
+import sys
+sys.path.append('.')
+
+import random
+import re
+
+from safe_failure_handler import detect_pii, sanitize_response, scan_pii, validate_response
+
+print("="*70)
+print("🧪 Testing Single-Pass PII Scanner")
+print("="*70 + "\n")
+
+def legacy_detect_pii(text):
+    """Original four-search detection"""
+    pii_patterns = {
+        'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+        'phone': r'\b\d{4}[-.\s]?\d{4}\b|\b\+65[-.\s]?\d{4}[-.\s]?\d{4}\b',
+        'nric': r'\b[STFG]\d{7}[A-Z]\b',
+        'credit_card': r'\b\d{4}[-\s]?\d{4}[-\s]?\d{4}[-\s]?\d{4}\b'
+    }
+    return [pii_type for pii_type, pattern in pii_patterns.items() if re.search(pattern, text, re.IGNORECASE)]
+
+def legacy_sanitize_response(response):
+    """Original three-substitution redaction"""
+    response = re.sub(r'\b[A-Za-z0-9._%+-]+@(?!starhub\.com)[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '[EMAIL REDACTED]', response, flags=re.IGNORECASE)
+    response = re.sub(r'\b(?!\+65\s?6825)\d{4}[-.\s]?\d{4}\b', '[PHONE REDACTED]', response)
+    response = re.sub(r'\b[STFG]\d{7}[A-Z]\b', '[NRIC REDACTED]', response)
+    return response
+
+# Fragments chosen to sit on pattern edges: allow-listed and look-alike addresses,
+# digit runs of every length, separators, NRIC prefixes in both cases
+FRAGMENTS = [
+    'hr@starhub.com', 'itsupport@starhub.com.sg', 'john.doe@personal.com', 'a+b@x.io', '@', '.', '-', '+', '_',
+    '+65', '+65 6825 3000', '6825', '9123-4567', '9123 4567', '91234567', '1234 5678 9012 3456', '1234-5678-9012-3456',
+    'S1234567A', 's1234567a', 'T7654321Z', 'G123456X', 'F12345678B', 'ſ1234567A', '2024', '12', '123', '12345',
+    'leave', 'VPN', 'Call', 'at', 'or', 'NRIC:', 'x', 'A', 'com', '\n', ' ', '  ', '\t', ',', ':', '[', ']', '(', ')',
+    # Non-ASCII digits and a local part longer than the scanner's window
+    '١٢٣٤ ٥٦٧٨', '１２３４５６７８', 'S١٢٣٤٥٦٧A', 'first.last.' * 8, 'x' * 70 + '@mail.com'
+]
+
+def random_text(rng):
+    parts = []
+    for _ in range(rng.randint(1, 14)):
+        if rng.random() < 0.15:
+            parts.append(''.join(rng.choice('0123456789 -.+@aSsTzFG_') for _ in range(rng.randint(1, 12))))
+        else:
+            parts.append(rng.choice(FRAGMENTS))
+        # Fragments are glued without a separator a third of the time
+        if rng.random() < 0.66:
+            parts.append(rng.choice([' ', ' ', '-', '.', '', '\n']))
+    return ''.join(parts)
+
+# Test 1: Detection identical to the four separate searches
+print("Test 1: detect_pii matches the legacy detection")
+print("-"*70)
+rng = random.Random(20241017)
+samples = [random_text(rng) for _ in range(20000)]
+detect_mismatches = [t for t in samples if detect_pii(t) != legacy_detect_pii(t)]
+print(f"Samples: {len(samples)}, with PII: {sum(1 for t in samples if legacy_detect_pii(t))}, mismatches: {len(detect_mismatches)}")
+for text in detect_mismatches[:3]:
+    print(f"  {text!r}: {detect_pii(text)} vs {legacy_detect_pii(text)}")
+print("✅ Identical detection\n" if not detect_mismatches else "❌ Detection differs\n")
+
+# Test 2: Redaction identical to the three substitutions
+print("Test 2: sanitize_response matches the legacy redaction")
+print("-"*70)
+sanitize_mismatches = [t for t in samples if sanitize_response(t) != legacy_sanitize_response(t)]
+print(f"Changed by redaction: {sum(1 for t in samples if legacy_sanitize_response(t) != t)}, mismatches: {len(sanitize_mismatches)}")
+for text in sanitize_mismatches[:3]:
+    print(f"  {text!r}: {sanitize_response(text)!r} vs {legacy_sanitize_response(text)!r}")
+print("✅ Identical redaction\n" if not sanitize_mismatches else "❌ Redaction differs\n")
+
+# Test 3: One call returns both, consistently
+print("Test 3: scan_pii returns both results at once")
+print("-"*70)
+inconsistent = [t for t in samples[:5000] if scan_pii(t) != (legacy_detect_pii(t), legacy_sanitize_response(t))]
+text = "Email hr@starhub.com or john.doe@personal.com, call 9123-4567. NRIC: S1234567A"
+detected, redacted = scan_pii(text)
+print(f"Detected: {detected}")
+print(f"Redacted: {redacted}")
+print("✅ Consistent\n" if not inconsistent and 'hr@starhub.com' in redacted and 'personal.com' not in redacted else "❌ Inconsistent\n")
+
+# Test 4: validate_response output unchanged
+print("Test 4: validate_response redacts as before")
+print("-"*70)
+citations = [{'metadata': {'score': 0.9}}] * 3
+changed = []
+for text in samples[:3000]:
+    result = validate_response(text, citations, 0.9, 'it')
+    expected_pii = legacy_detect_pii(text)
+    expected = legacy_sanitize_response(text) if expected_pii else text
+    if result['pii_detected'] != expected_pii or result['response'] != expected:
+        changed.append(text)
+print(f"Responses checked: 3000, differences: {len(changed)}")
+print("✅ Unchanged\n" if not changed else "❌ validate_response changed\n")
@@ -0,0 +1,85 @@
+import sys
+sys.path.append('.')
+
+import time
+
+import redirect_router
+from redirect_router import ResourceIndex, is_redirectional_query, resolve_redirect
+
+print("="*70)
+print("🧪 Testing In-Process Redirect Routing")
+print("="*70 + "\n")
+
+CATALOG = [
+    {'resource_id': 'workday', 'name': 'Workday', 'domain': 'hr', 'base_url': 'https://company.workday.com',
+     'sso_enabled': True, 'sso_provider': 'okta', 'deep_links': {'leave_request': '/leave/request', 'payslip': '/payroll/payslip'},
+     'keywords': ['leave', 'timesheet', 'benefits', 'payslip', 'workday'], 'contact': 'hr-support@company.com'},
+    {'resource_id': 'vpn', 'name': 'VPN', 'domain': 'it', 'base_url': 'https://vpn.company.com',
+     'sso_enabled': False, 'deep_links': {}, 'keywords': ['vpn', 'remote access', 'network']},
+    {'resource_id': 'concur', 'name': 'Concur', 'domain': 'finance', 'base_url': 'https://company.concursolutions.com',
+     'sso_enabled': True, 'sso_provider': 'azure_ad', 'deep_links': {'expense_report': '/expense/report'},
+     'keywords': ['expense', 'reimbursement', 'travel', 'concur', 'receipt']}
+]
+
+class FakeCatalogTable:
+    def __init__(self, items):
+        self.items = items
+        self.scans = 0
+
+    def scan(self, **kwargs):
+        self.scans += 1
+        return {'Items': self.items}
+
+table = FakeCatalogTable(CATALOG)
+redirect_router.catalog_table = table
+
+# Test 1: Detection
+print("Test 1: Redirect detection")
+print("-"*70)
+redirectional = ["link to workday leave", "Where do I go to file an expense report?", "open the vpn portal"]
+informational = ["What is the parental leave policy?", "How do I reset my password?", "How do I connect to VPN?",
+                 "How do I submit an expense claim?", "View leave policy"]
+detected = [is_redirectional_query(q) for q in redirectional + informational]
+print(f"Detected: {detected}")
+print("✅ Detection correct\n" if detected == [True, True, True, False, False, False, False, False] else "❌ Detection wrong\n")
+
+# Test 2: Resolution
+print("Test 2: Link resolution")
+print("-"*70)
+leave = resolve_redirect("link to request leave", 'hr')
+expense = resolve_redirect("Where do I go to submit an expense report?", 'general')
+none = resolve_redirect("Is the office open on Saturday?", 'general')
+print(f"Leave: {leave['resource_id']} | Expense (misrouted): {expense['resource_id']} {expense['link']} | Cafeteria: {none}")
+print("✅ Resolved, with whole-catalog fallback\n" if leave['resource_id'] == 'workday' and expense['resource_id'] == 'concur' and none is None else "❌ Resolution wrong\n")
+
+# Test 3: Catalog cached
+print("Test 3: Catalog read once per TTL")
+print("-"*70)
+print(f"Catalog scans: {table.scans}")
+print("✅ Cached\n" if table.scans == 1 else "❌ Catalog re-read\n")
+
+# Test 4: Same ranking as lambda_deep_linking.find_resource_by_query
+print("Test 4: Ranking parity")
+print("-"*70)
+index = ResourceIndex(CATALOG)
+query = "submit travel expense receipt and leave"
+print(f"Best: {index.find(query)['resource_id']} | HR only: {index.find(query, 'hr')['resource_id']}")
+print("✅ Highest keyword score wins\n" if index.find(query)['resource_id'] == 'concur' and index.find(query, 'hr')['resource_id'] == 'workday' else "❌ Ranking wrong\n")
+
+# Test 5: Whole-word keywords
+print("Test 5: Keywords match whole words only")
+print("-"*70)
+partial = [index.find(q) for q in ["open the networking event page", "link to the leaves calendar", "open vpnc settings"]]
+whole = index.find("open the network settings")
+print(f"Partial words: {partial} | Whole word: {whole['resource_id']}")
+print("✅ Only whole words score\n" if partial == [None, None, None] and whole['resource_id'] == 'vpn' else "❌ Substring matched\n")
+
+# Test 6: Latency
+print("Test 6: Resolution latency")
+print("-"*70)
+start = time.perf_counter()
+for _ in range(10000):
+    resolve_redirect("link to request leave", 'hr')
+per_query_us = (time.perf_counter() - start) * 1e6 / 10000
+print(f"{per_query_us:.1f} µs/query")
+print("✅ Well under a millisecond\n" if per_query_us < 1000 else "❌ Too slow\n")
@@ -0,0 +1,118 @@
+import sys
+sys.path.append('.')
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import lambda_supervisor_agent as supervisor
+import trace_report
+import tracing
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, LatencyTracker, hedged_call
+
+print("="*70)
+print("🧪 Testing Circuit Breakers, Timeouts and Hedging")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Test 1: Breaker lifecycle
+print("Test 1: Circuit opens, half-opens and closes")
+print("-"*70)
+clock = FakeClock()
+breaker = CircuitBreaker('hr', failure_threshold=3, reset_timeout=30, clock=clock)
+for _ in range(3):
+    breaker.allow()
+    breaker.record_failure()
+opened = breaker.state
+rejected = not breaker.allow()
+clock.now = 31
+trial = breaker.allow()
+second_trial = breaker.allow()
+half_open = breaker.state
+breaker.record_success()
+print(f"After failures: {opened}, rejected: {rejected}, trial: {trial}/{second_trial} ({half_open}), now: {breaker.state}")
+print("✅ Lifecycle correct\n" if (opened, rejected, trial, second_trial, half_open, breaker.state) == (OPEN, True, True, False, HALF_OPEN, CLOSED) else "❌ Lifecycle wrong\n")
+
+# Test 2: Open circuit fails fast to the domain fallback
+print("Test 2: Open circuit answers with the fallback message")
+print("-"*70)
+calls = []
+
+def failing_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    calls.append(agent_id)
+    return {'response': '', 'citations': [], 'confidence': 0.0, 'error': 'ReadTimeoutError'}
+
+supervisor.invoke_agent = failing_invoke_agent
+supervisor.SEMANTIC_CACHE_ENABLED = False
+supervisor.REDIRECTS_ENABLED = False
+supervisor.ANSWER_CACHE_ENABLED = False
+for _ in range(supervisor.CIRCUIT_FAILURE_THRESHOLD + 2):
+    result = supervisor.handle_query("How many days of annual leave do I get?", 's1')
+print(f"Agent calls: {len(calls)}, state: {supervisor.agent_breakers['hr'].state}, error: {result['agent_error']}")
+print(f"Response: {result['response'][:60]}...")
+expected = supervisor.get_fallback_response('', 'hr')
+print("✅ Failed fast with fallback\n" if len(calls) == supervisor.CIRCUIT_FAILURE_THRESHOLD and result['agent_error'] == 'circuit_open' and result['response'] == expected and not result['safe_to_respond'] else "❌ Circuit not honoured\n")
+
+# Test 3: Errors are not validated as answers
+print("Test 3: Agent errors skip validation")
+print("-"*70)
+print(f"Safe: {result['safe_to_respond']}, citations: {result['citations']}")
+print("✅ Error never shown as an answer\n" if 'Error' not in result['response'] else "❌ Error text leaked\n")
+
+# Test 4: Latency percentile
+print("Test 4: Observed p95")
+print("-"*70)
+tracker = LatencyTracker(min_samples=20)
+early = tracker.percentile(95)
+for ms in range(1, 101):
+    tracker.record(ms / 1000)
+print(f"Before samples: {early}, p95: {tracker.percentile(95):.3f}s")
+print("✅ p95 estimated\n" if early is None and abs(tracker.percentile(95) - 0.096) < 0.002 else "❌ Percentile wrong\n")
+
+# Test 5: Hedging
+print("Test 5: Hedged request beats a slow primary")
+print("-"*70)
+executor = ThreadPoolExecutor(max_workers=2)
+
+def slow_then_fast(attempt, cancel_event):
+    delay = 2.0 if attempt == 0 else 0.05
+    deadline = time.monotonic() + delay
+    while time.monotonic() < deadline:
+        if cancel_event.is_set():
+            return {'response': 'cancelled'}
+        time.sleep(0.01)
+    return {'response': f'attempt {attempt}'}
+
+start = time.perf_counter()
+result, attempt = hedged_call(slow_then_fast, 0.1, executor)
+elapsed = time.perf_counter() - start
+fast, fast_attempt = hedged_call(lambda attempt, cancel_event: {'response': 'quick'}, 0.1, executor)
+print(f"Hedged: {result['response']} in {elapsed*1000:.0f} ms | Fast primary: attempt {fast_attempt}")
+print("✅ Hedge won, fast calls not hedged\n" if attempt == 1 and elapsed < 0.5 and fast_attempt == 0 else "❌ Hedging wrong\n")
+
+# Test 6: Hedges show up in the trace record and the report
+print("Test 6: Hedge fired/won in traces")
+print("-"*70)
+def slow_primary_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    deadline = time.monotonic() + (0.05 if session_id.endswith('-hedge') else 1.0)
+    while time.monotonic() < deadline:
+        if cancel_event is not None and cancel_event.is_set():
+            return {'response': '', 'citations': [], 'confidence': 0.0, 'error': 'cancelled'}
+        time.sleep(0.01)
+    return {'response': f'answer for {session_id}', 'citations': [], 'confidence': 0.9}
+
+supervisor.invoke_agent = slow_primary_invoke_agent
+supervisor.HEDGE_MIN_DELAY_SECONDS = 0.05
+for _ in range(20):
+    supervisor.agent_latency['it'].record(0.01)
+tracing.start_trace(service='supervisor')
+result = supervisor.call_agent('it', "VPN not working", 's2', hedge=True)
+record = tracing.finish_trace()
+events = trace_report.collect([record])[3]['supervisor']
+print(f"Session: {result['session_id']}, trace hedge: {record.get('hedge')}, report: {dict(events)}")
+print("✅ Hedge emitted\n" if record.get('hedge') == 'won' and events['hedge.fired'] == 1 and events['hedge.won'] == 1 else "❌ Hedge not traced\n")
@@ -0,0 +1,106 @@
+import sys
+sys.path.append('.')
+
+from semantic_cache import SemanticCache, cosine, embed
+
+print("="*70)
+print("🧪 Testing Semantic Response Cache")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+answer = {'domain': 'it', 'response': 'Use the self-service portal to reset it.', 'citations': [{'content': 'portal', 'location': 's3://kb/it.pdf'}]}
+
+# Test 1: Similarity
+print("Test 1: Embedding similarity")
+print("-"*70)
+same = cosine(embed("How do I reset my password?"), embed("reset password"))
+other = cosine(embed("How do I reset my password?"), embed("How do I connect to VPN?"))
+print(f"Paraphrase: {same:.2f} | Unrelated: {other:.2f}")
+print("✅ Paraphrases close, unrelated far\n" if same > 0.9 and other < 0.2 else "❌ Similarity off\n")
+
+# Test 2: Near-duplicate hit
+print("Test 2: Near-duplicate returns cached response")
+print("-"*70)
+clock = FakeClock()
+cache = SemanticCache(threshold=0.8, ttl=60, clock=clock)
+cache.store('it', "How do I reset my password?", answer)
+hit = cache.lookup('it', "reset my password please")
+miss = cache.lookup('it', "How do I connect to VPN?")
+wrong_domain = cache.lookup('hr', "How do I reset my password?")
+print(f"Hit similarity: {hit[1]:.2f} | VPN: {miss} | Other domain: {wrong_domain}")
+print("✅ Hit only for near-duplicates in the same domain\n" if hit and hit[0] is answer and miss is None and wrong_domain is None else "❌ Lookup wrong\n")
+
+# Test 3: TTL
+print("Test 3: Entries expire")
+print("-"*70)
+clock.now = 61
+expired = cache.lookup('it', "How do I reset my password?")
+print(f"After TTL: {expired}, stats: {cache.stats}")
+print("✅ Expired\n" if expired is None and cache.stats['expirations'] == 1 else "❌ Not expired\n")
+
+# Test 4: Size bound
+print("Test 4: LRU eviction per domain")
+print("-"*70)
+cache = SemanticCache(max_entries=2, clock=clock)
+cache.store('hr', "annual leave entitlement", answer)
+cache.store('hr', "maternity leave policy", answer)
+cache.lookup('hr', "annual leave entitlement")
+cache.store('hr', "medical insurance claims", answer)
+kept = list(cache.domains['hr'])
+print(f"Kept: {kept}")
+print("✅ Least recently used evicted\n" if kept == ['annual leave entitlement', 'medical insurance claims'] else "❌ Wrong eviction\n")
+
+# Test 5: Invalidation on content generation change
+print("Test 5: Document zone change invalidates domain")
+print("-"*70)
+cache = SemanticCache(clock=clock)
+cache.sync_generation('finance', 3)
+cache.store('finance', "expense claim deadline", answer)
+cache.sync_generation('finance', 3)
+still_cached = cache.lookup('finance', "expense claim deadline") is not None
+cache.sync_generation('finance', 4)
+after = cache.lookup('finance', "expense claim deadline")
+print(f"Same generation cached: {still_cached} | After bump: {after}")
+print("✅ Invalidated on generation change\n" if still_cached and after is None else "❌ Not invalidated\n")
+
+# Test 6: Metrics
+print("Test 6: Hit-rate metrics")
+print("-"*70)
+print(f"Hit rate: {cache.hit_rate():.2f}, per domain: {cache.domain_stats}")
+print("✅ Metrics tracked\n" if cache.domain_stats['finance'] == {'hits': 1, 'misses': 1} else "❌ Metrics wrong\n")
+
+# Test 7: Near misses stay misses
+print("Test 7: Similar wording with a different meaning is not a hit")
+print("-"*70)
+cache = SemanticCache(threshold=0.8, clock=clock)
+near_misses = [
+    ('hr', "maternity leave policy", "paternity leave policy"),
+    ('finance', "how do I claim taxi expenses", "how do I claim taxi expenses overseas"),
+    ('finance', "domestic travel allowance", "overseas travel allowance"),
+    ('it', "how do I install Zoom", "how do I uninstall Zoom")
+]
+for domain, stored, _ in near_misses:
+    cache.store(domain, stored, answer)
+collisions = [(stored, asked, round(cosine(embed(stored), embed(asked)), 2))
+              for domain, stored, asked in near_misses if cache.lookup(domain, asked) is not None]
+repeat = cache.lookup('it', "Install Zoom, please?")
+print(f"Collisions: {collisions} | Reworded repeat: {repeat is not None}")
+print("✅ Only the same question hits\n" if not collisions and repeat is not None else "❌ Near miss served a cached answer\n")
+
+# Test 8: True paraphrases hit
+print("Test 8: Paraphrases with the same key terms are hits")
+print("-"*70)
+cache = SemanticCache(threshold=0.8, clock=clock)
+cache.store('it', "How do I reset my password?", answer)
+paraphrases = ["I forgot my password", "Steps to reset my passwords", "reset pw"]
+hits = {q: round(cache.lookup('it', q)[1], 2) for q in paraphrases if cache.lookup('it', q)}
+wordy = cache.lookup('it', "I need help to reset my password now please")
+extra_term = cache.lookup('it', "How do I reset my computer password?")
+print(f"Hits: {hits} | Mostly filler: {wordy} | Extra key term: {extra_term}")
+print("✅ Paraphrases hit, other questions miss\n" if len(hits) == len(paraphrases) and wordy is None and extra_term is None else "❌ Paraphrase matching wrong\n")
@@ -0,0 +1,150 @@
+import sys
+sys.path.append('.')
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import lambda_supervisor_agent as supervisor
+from single_flight import SingleFlight
+
+print("="*70)
+print("🧪 Testing Single-Flight Coalescing")
+print("="*70 + "\n")
+
+class ConditionalCheckFailed(Exception):
+    response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+
+class FakeTable:
+    """In-memory stand-in for the in-flight table's three conditional writes"""
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def put_item(self, Item, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        with self.lock:
+            current = self.items.get(Item['flight_key'])
+            if ':now' in ExpressionAttributeValues:
+                allowed = current is None or current['ttl'] < ExpressionAttributeValues[':now']
+            else:
+                allowed = current is not None and current['owner'] == ExpressionAttributeValues[':owner']
+            if not allowed:
+                raise ConditionalCheckFailed()
+            self.items[Item['flight_key']] = dict(Item)
+
+    def get_item(self, Key, ConsistentRead=False):
+        with self.lock:
+            item = self.items.get(Key['flight_key'])
+            return {'Item': dict(item)} if item else {}
+
+    def delete_item(self, Key, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues):
+        with self.lock:
+            current = self.items.get(Key['flight_key'])
+            if current is None or current['owner'] != ExpressionAttributeValues[':owner']:
+                raise ConditionalCheckFailed()
+            del self.items[Key['flight_key']]
+
+# Test 1: Concurrent identical questions share one call
+print("Test 1: 8 concurrent requests, one computation")
+print("-"*70)
+flight = SingleFlight(FakeTable(), poll_interval=0.01)
+calls = []
+
+def slow_answer():
+    calls.append(1)
+    time.sleep(0.2)
+    return {'response': 'Restart the VPN client'}
+
+with ThreadPoolExecutor(max_workers=8) as pool:
+    results = list(pool.map(lambda _: flight.run('it#vpn not working', slow_answer), range(8)))
+shared = sorted(str(s) for _, s in results)
+print(f"Computations: {len(calls)}, shared: {shared.count('in_flight')}, stats: {flight.stats}")
+print("✅ Coalesced\n" if len(calls) == 1 and shared.count('in_flight') == 7 and all(r['response'] == 'Restart the VPN client' for r, _ in results) else "❌ Not coalesced\n")
+
+# Test 2: Result window, then expiry
+print("Test 2: Answer reused within the window only")
+print("-"*70)
+now = [1000.0]
+flight = SingleFlight(FakeTable(), window=30, clock=lambda: now[0])
+flight.run('hr#leave', lambda: {'response': 'first'})
+_, within = flight.run('hr#leave', lambda: {'response': 'second'})
+now[0] += 31
+after, expired = flight.run('hr#leave', lambda: {'response': 'third'})
+print(f"Within window: {within}, after expiry: {expired} ({after['response']})")
+print("✅ Window honoured\n" if within == 'window' and expired is None and after['response'] == 'third' else "❌ Window wrong\n")
+
+# Test 3: Failures are not shared
+print("Test 3: Unshareable results and exceptions release the flight")
+print("-"*70)
+flight = SingleFlight(FakeTable())
+flight.run('it#vpn', lambda: {'agent_error': 'timeout'}, shareable=lambda r: 'agent_error' not in r)
+retried, shared_after_error = flight.run('it#vpn', lambda: {'response': 'ok'})
+try:
+    flight.run('it#vpn2', lambda: 1 / 0)
+except ZeroDivisionError:
+    pass
+_, shared_after_raise = flight.run('it#vpn2', lambda: {'response': 'ok'})
+print(f"After error result: {shared_after_error} ({retried['response']}), after exception: {shared_after_raise}")
+print("✅ Failures released\n" if shared_after_error is None and shared_after_raise is None else "❌ Failure shared\n")
+
+# Test 4: A leader that dies is taken over once its lease runs out
+print("Test 4: Lease takeover")
+print("-"*70)
+now = [1000.0]
+table = FakeTable()
+table.items['it#vpn'] = {'flight_key': 'it#vpn', 'status': 'pending', 'owner': 'dead', 'ttl': 1025}
+
+def advance(seconds):
+    now[0] += seconds
+
+flight = SingleFlight(table, lease=25, poll_interval=5, clock=lambda: now[0], sleep=advance)
+result, shared = flight.run('it#vpn', lambda: {'response': 'recovered'})
+print(f"Result: {result['response']}, waited: {now[0] - 1000:.0f}s, stats: {flight.stats}")
+print("✅ Took over\n" if result['response'] == 'recovered' and flight.stats['takeovers'] == 1 else "❌ Stuck behind dead leader\n")
+
+# Test 5: Fails open when the table is unavailable
+print("Test 5: DynamoDB errors fall back to answering directly")
+print("-"*70)
+
+class BrokenTable:
+    def put_item(self, **kwargs):
+        raise RuntimeError('ProvisionedThroughputExceededException')
+
+flight = SingleFlight(BrokenTable())
+result, shared = flight.run('it#vpn', lambda: {'response': 'direct'})
+print(f"Result: {result['response']}, errors: {flight.stats['errors']}")
+print("✅ Failed open\n" if result['response'] == 'direct' and shared is None else "❌ Request failed\n")
+
+# Test 6: Supervisor coalesces concurrent first questions
+print("Test 6: Supervisor shares one agent call across concurrent requests")
+print("-"*70)
+agent_calls = []
+
+def slow_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    agent_calls.append(session_id)
+    time.sleep(0.2)
+    citations = [{'content': {'text': 'Restart the VPN client'}, 'location': {}}] * 5
+    return {'response': 'Restart the VPN client.', 'citations': citations, 'confidence': 0.9}
+
+supervisor.invoke_agent = slow_invoke_agent
+supervisor.SEMANTIC_CACHE_ENABLED = False
+supervisor.REDIRECTS_ENABLED = False
+supervisor.ANSWER_CACHE_ENABLED = False
+supervisor.single_flight = SingleFlight(FakeTable(), poll_interval=0.01)
+queries = ["VPN not working", "vpn not working?", "VPN  not working!", "VPN not working"]
+with ThreadPoolExecutor(max_workers=4) as pool:
+    answers = list(pool.map(lambda args: supervisor.handle_query(args[1], f's{args[0]}'), enumerate(queries)))
+coalesced = [a for a in answers if a.get('cache') == 'coalesced']
+print(f"Agent calls: {len(agent_calls)}, coalesced: {len(coalesced)}, sessions: {sorted(a['bedrock_session_id'] for a in answers)}")
+print("✅ One agent call, own session ids\n" if len(agent_calls) == 1 and len(coalesced) == 3 and sorted(a['bedrock_session_id'] for a in answers) == ['s0', 's1', 's2', 's3'] else "❌ Supervisor did not coalesce\n")
+
+# Test 7: Follow-ups are never coalesced
+print("Test 7: Conversation follow-ups bypass coalescing")
+print("-"*70)
+agent_calls.clear()
+route = {'domain': 'it', 'confidence': 0.9, 'bedrock_session_id': 'thread-1'}
+supervisor.handle_query("VPN not working", 'x', route=route)
+supervisor.handle_query("VPN not working", 'y', route=dict(route, bedrock_session_id='thread-2'))
+print(f"Agent calls: {agent_calls}")
+print("✅ Each thread asked its own agent session\n" if agent_calls == ['thread-1', 'thread-2'] else "❌ Follow-up was coalesced\n")
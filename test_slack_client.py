@@ -0,0 +1,156 @@
+import sys
+import json
+import socket
+sys.path.append('.')
+
+from http.client import HTTPSConnection
+
+import slack_client
+from slack_client import SlackClient
+
+print("="*70)
+print("🧪 Testing Slack Client")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def make_client(responses):
+    """Build a client whose transport replays canned (status, retry_after, body) tuples"""
+    clock = FakeClock()
+    sent = []
+    tokens = []
+
+    def token_provider(force_refresh=False):
+        tokens.append(force_refresh)
+        return 'xoxb-test'
+
+    client = SlackClient(token_provider=token_provider, clock=clock, sleep=clock.sleep)
+
+    def fake_send(method, payload, token):
+        sent.append((method, dict(payload), clock()))
+        status, retry_after, body = responses.pop(0) if responses else (200, None, {'ok': True, 'ts': '1.0'})
+        return status, retry_after, json.dumps(body).encode()
+
+    client._send = fake_send
+    return client, clock, sent, tokens
+
+# Test 1: 429 Retry-After is honoured
+print("Test 1: 429 Retry-After")
+print("-"*70)
+client, clock, sent, _ = make_client([(429, '3', {'ok': False, 'error': 'ratelimited'})])
+result = client.post_message('C1', 'hello')
+print(f"Calls: {len(sent)}, retried at t={sent[-1][2]:.1f}s, ok={result['ok']}")
+print("✅ Retried after Retry-After\n" if result['ok'] and sent[-1][2] >= 3.0 else "❌ Retry-After not honoured\n")
+
+# Test 2: Bursts of non-final updates are coalesced
+print("Test 2: Coalesced chat.update burst")
+print("-"*70)
+client, clock, sent, _ = make_client([])
+client.post_message('C1', 'Thinking...')
+for i in range(10):
+    client.update_message('C1', '1.0', f'partial {i}', final=False)
+client.flush()
+updates = [p for m, p, _ in sent if m == 'chat.update']
+print(f"Updates sent: {len(updates)}, last text: {updates[-1]['text']}")
+print("✅ Burst coalesced to latest update\n" if len(updates) == 1 and updates[-1]['text'] == 'partial 9' else "❌ Burst not coalesced\n")
+
+# Test 3: Final update supersedes pending partials
+print("Test 3: Final update supersedes pending")
+print("-"*70)
+client, clock, sent, _ = make_client([])
+client.post_message('C1', 'Thinking...')
+client.update_message('C1', '1.0', 'partial', final=False)
+client.update_message('C1', '1.0', 'final answer')
+client.flush()
+updates = [p['text'] for m, p, _ in sent if m == 'chat.update']
+print(f"Updates sent: {updates}")
+print("✅ Only the final update was sent\n" if updates == ['final answer'] else "❌ Stale partial sent\n")
+
+# Test 4: Expired token is refreshed once
+print("Test 4: Token refresh on invalid_auth")
+print("-"*70)
+client, clock, sent, tokens = make_client([(200, None, {'ok': False, 'error': 'invalid_auth'})])
+result = client.post_message('C1', 'hello')
+print(f"Token lookups: {tokens}, ok={result['ok']}")
+print("✅ Token refreshed and call retried\n" if result['ok'] and tokens == [False, True] else "❌ Token not refreshed\n")
+
+# Test 5: Server errors are only retried when resending cannot post twice
+print("Test 5: 5xx retried only for idempotent calls or 503 Retry-After")
+print("-"*70)
+client, clock, sent, _ = make_client([(500, None, {'ok': False})])
+posted = client.post_message('C1', 'hello')
+post_calls = len(sent)
+client, clock, sent, _ = make_client([(503, None, {'ok': False}), (500, '2', {'ok': False})])
+updated = client.update_message('C1', '1.0', 'answer')
+update_calls, update_at = len(sent), sent[-1][2]
+client, clock, sent, _ = make_client([(503, '2', {'ok': False})])
+unavailable = client.post_message('C1', 'hello')
+print(f"postMessage 500: {post_calls} call(s), error={posted.get('error')} | chat.update: {update_calls} calls, ok={updated['ok']} | postMessage 503 Retry-After: {len(sent)} calls, ok={unavailable['ok']}")
+print("✅ postMessage not resent, chat.update and 503 Retry-After retried\n" if post_calls == 1 and posted == {'ok': False, 'error': 'server_error'} and updated['ok'] and update_calls == 3 and update_at >= 3.0 and unavailable['ok'] and len(sent) == 2 else "❌ 5xx retry policy wrong\n")
+
+# Test 6: Only connection setup failures are resent
+print("Test 6: No resend once the request may have reached Slack")
+print("-"*70)
+
+class FakeConnection:
+    """HTTPSConnection stand-in; outcomes are 'refused', 'timeout' or 'ok'"""
+    outcomes = []
+    requests = []
+
+    def __init__(self, host, timeout=None):
+        self.sock = None
+
+    def connect(self):
+        if FakeConnection.outcomes[0] == 'refused':
+            FakeConnection.outcomes.pop(0)
+            raise ConnectionRefusedError('refused')
+        self.sock = object()
+
+    def request(self, method, url, body=None, headers=None):
+        FakeConnection.requests.append(url)
+
+    def getresponse(self):
+        if FakeConnection.outcomes.pop(0) == 'timeout':
+            raise socket.timeout('timed out')
+        return FakeResponse()
+
+    def close(self):
+        self.sock = None
+
+class FakeResponse:
+    status = 200
+
+    def read(self):
+        return b'{"ok": true, "ts": "1.0"}'
+
+    def getheader(self, name):
+        return None
+
+slack_client.http.client.HTTPSConnection = FakeConnection
+client = SlackClient(token_provider=lambda force_refresh=False: 'xoxb-test', sleep=lambda seconds: None)
+FakeConnection.outcomes = ['refused', 'ok']
+setup_retry = client.post_message('C1', 'hello')
+setup_requests = len(FakeConnection.requests)
+FakeConnection.outcomes = ['timeout', 'ok']
+try:
+    client.post_message('C1', 'hello again')
+    timed_out = False
+except socket.timeout:
+    timed_out = True
+slack_client.http.client.HTTPSConnection = HTTPSConnection
+print(f"After refused connect: ok={setup_retry['ok']}, requests {setup_requests} | "
+      f"after read timeout: raised={timed_out}, requests {len(FakeConnection.requests)}")
+print("✅ Setup failure retried, timed-out post not resent\n" if setup_retry['ok'] and setup_requests == 1
+      and timed_out and len(FakeConnection.requests) == 2 else "❌ Unsafe retry\n")
+
+print("="*70)
+print("📊 Stats from last client:", client.stats)
+print("="*70)
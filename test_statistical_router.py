@@ -0,0 +1,91 @@
+import sys
+sys.path.append('.')
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+import lambda_supervisor_agent as supervisor
+import query_classifier
+import statistical_router
+from statistical_router import StatisticalRouter, get_router
+
+print("="*70)
+print("🧪 Testing Statistical Router")
+print("="*70 + "\n")
+
+with open('validation_dataset.json', 'r') as f:
+    EXAMPLES = [(item['query'], item['expected_domain']) for items in json.load(f).values() for item in items]
+
+# Test 1: The shipped model loads once per container
+print("Test 1: Model loading")
+print("-"*70)
+router = get_router()
+print(f"Classes: {router.classes} | temperature: {router.temperature:.2f} | cached: {get_router() is router}")
+print("✅ router_model.npz loaded and cached\n" if router.classes == sorted(query_classifier.DOMAINS)
+      and router.temperature > 0 and get_router() is router else "❌ Model not loaded\n")
+
+# Test 2: Save/load round trip and feature-size check
+print("Test 2: Saved model reloads identically; mismatched models are rejected")
+print("-"*70)
+path = os.path.join(tempfile.mkdtemp(), 'router_model.npz')
+router.save(path)
+reloaded = StatisticalRouter.load(path)
+same = all(reloaded.classify(q) == router.classify(q) for q, _ in EXAMPLES)
+np.savez_compressed(path, classes=np.array(router.classes), log_prior=router.log_prior,
+                    feature_log_prob=router.feature_log_prob[:, :16], temperature=np.array(1.0), n_features=np.array(16))
+try:
+    StatisticalRouter.load(path)
+    rejected = False
+except ValueError:
+    rejected = True
+print(f"Same predictions after reload: {same} | other feature size rejected: {rejected}")
+print("✅ Round trip exact, mismatch refused\n" if same and rejected else "❌ Save/load wrong\n")
+
+# Test 3: Labelled examples
+print("Test 3: Labelled examples route to their domain")
+print("-"*70)
+supervisor.ROUTER_MODE = 'statistical'
+wrong = [(q, d, supervisor.classify_query(q)) for q, d in EXAMPLES if supervisor.classify_query(q)[0] != d]
+batch = router.predict_proba_batch([q for q, _ in EXAMPLES])
+single = np.stack([router.predict_proba(q) for q, _ in EXAMPLES])
+print(f"Correct: {len(EXAMPLES) - len(wrong)}/{len(EXAMPLES)} | misrouted: {wrong} | batch matches single: {np.allclose(batch, single, atol=1e-5)}")
+print("✅ Every example routed correctly\n" if not wrong and np.allclose(batch, single, atol=1e-5) else "❌ Misrouted examples\n")
+
+# Test 4: Low-confidence predictions fall back to the keyword classifier
+print("Test 4: Fallback below ROUTER_MIN_CONFIDENCE")
+print("-"*70)
+unsure = "What is the IT helpdesk number?"
+sure = "How do I claim expenses?"
+router_guess = router.classify(unsure)
+print(f"Router: {router_guess} -> supervisor: {supervisor.classify_query(unsure)} (keywords: {query_classifier.classify(unsure)})")
+print(f"Confident: {router.classify(sure)} -> supervisor: {supervisor.classify_query(sure)}")
+print(f"Ranked below the floor: {supervisor.rank_domains(unsure)[0]}")
+print("✅ Keyword scorer decides below the floor, router above it\n" if router_guess[1] < supervisor.ROUTER_MIN_CONFIDENCE
+      and supervisor.classify_query(unsure) == query_classifier.classify(unsure) and supervisor.classify_query(unsure)[0] == 'it'
+      and supervisor.classify_query(sure) == router.classify(sure)
+      and supervisor.rank_domains(unsure) == query_classifier.rank_domains(unsure) else "❌ Fallback wrong\n")
+
+# Test 5: No model (missing numpy or file) means keyword routing
+print("Test 5: Unloadable model falls back to keywords")
+print("-"*70)
+load = StatisticalRouter.load
+
+def missing_model(path=statistical_router.ROUTER_MODEL_PATH):
+    raise OSError('router_model.npz not found')
+
+statistical_router._router, statistical_router._load_failed = None, False
+StatisticalRouter.load = staticmethod(missing_model)
+try:
+    unavailable = get_router()
+    classifier = supervisor.get_classifier()
+    routed = supervisor.classify_query(sure)
+finally:
+    StatisticalRouter.load = load
+    statistical_router._router, statistical_router._load_failed = None, False
+print(f"Router: {unavailable} | classifier: {classifier.__name__} | routed: {routed}")
+print("✅ Keyword classifier used\n" if unavailable is None and classifier is query_classifier
+      and routed == query_classifier.classify(sure) else "❌ No fallback\n")
+supervisor.ROUTER_MODE = 'keywords'
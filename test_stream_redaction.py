@@ -0,0 +1,145 @@
+import sys
+sys.path.append('.')
+
+import random
+
+import lambda_supervisor_agent as supervisor
+from safe_failure_handler import StreamingRedactor, sanitize_response
+from slack_stream import STREAM_DRAFT_NOTE, SlackStreamRenderer
+
+print("="*70)
+print("🧪 Testing Streaming PII Redaction")
+print("="*70 + "\n")
+
+def redact_stream(chunks):
+    """(released pieces, final remainder) for a chunked stream"""
+    redactor = StreamingRedactor()
+    released = [redactor.feed(chunk) for chunk in chunks]
+    return released, redactor.finish()
+
+ANSWERS = [
+    "Contact John at john.doe@personal.com or call 9123-4567. NRIC: S1234567A.",
+    "Reach HR at hr@starhub.com, or my mobile +65 9123 4567 after 6pm.",
+    "The card 4111 1111 1111 1111 was charged twice; email billing.team@vendor.co.uk for a refund.",
+    "Your claim for T7654321Z (ref 2024 0001) was approved on 12 March.",
+    "Call 9123\n4567 or write to a+b@x.io today."
+]
+SECRETS = ['john.doe', 'personal.com', '9123', '4567', '1234567', '4111', 'billing.team', 'vendor.co', '7654321', 'a+b@x']
+
+def leaked(text):
+    return [secret for secret in SECRETS if secret in text]
+
+# Test 1: Every single split point
+print("Test 1: Two-chunk splits at every position")
+print("-"*70)
+failures = []
+for answer in ANSWERS:
+    expected = sanitize_response(answer)
+    for i in range(len(answer) + 1):
+        released, rest = redact_stream([answer[:i], answer[i:]])
+        streamed = ''.join(released)
+        if streamed + rest != expected or leaked(streamed) or not expected.startswith(streamed):
+            failures.append((answer, i))
+print(f"Split points: {sum(len(a) + 1 for a in ANSWERS)}, failures: {len(failures)}")
+print("✅ No PII leaked at any split\n" if not failures else f"❌ Failed at {failures[:3]}\n")
+
+# Test 2: Character-by-character and random multi-way splits
+print("Test 2: One character per chunk, and random chunkings")
+print("-"*70)
+rng = random.Random(22)
+failures = []
+for answer in ANSWERS:
+    expected = sanitize_response(answer)
+    chunkings = [list(answer)]
+    for _ in range(200):
+        cuts = sorted(rng.sample(range(1, len(answer)), rng.randint(1, 12)))
+        chunkings.append([answer[i:j] for i, j in zip([0] + cuts, cuts + [len(answer)])])
+    for chunks in chunkings:
+        released, rest = redact_stream(chunks)
+        shown = ''
+        for piece in released:
+            shown += piece
+            if leaked(shown):
+                failures.append(chunks)
+                break
+        if shown + rest != expected:
+            failures.append(chunks)
+print(f"Chunkings: {len(ANSWERS) * 201}, failures: {len(failures)}")
+print("✅ Identical to sanitize_response\n" if not failures else f"❌ Failed for {failures[0]}\n")
+
+# Test 3: Generated text around pattern edges
+print("Test 3: Generated edge cases, random chunk boundaries")
+print("-"*70)
+FRAGMENTS = ['hr@starhub.com', 'x.y@mail.com', '+65', '9123', '4567', '1234 5678 9012 3456', 'S1234567A', 's1234567a',
+             '2024', '12', '@', '.', '-', ' ', '\n', '\t', 'call', 'A', '_', '１２３４ ５６７８']
+mismatches = 0
+for _ in range(5000):
+    text = ''.join(rng.choice(FRAGMENTS) + rng.choice(['', ' ', '-', '\n']) for _ in range(rng.randint(1, 10)))
+    cuts = sorted(set(rng.randint(0, len(text)) for _ in range(rng.randint(0, 6))))
+    chunks = [text[i:j] for i, j in zip([0] + cuts, cuts + [len(text)])]
+    released, rest = redact_stream(chunks)
+    if ''.join(released) + rest != sanitize_response(text):
+        mismatches += 1
+print(f"Texts: 5000, mismatches: {mismatches}")
+print("✅ Equivalent\n" if not mismatches else "❌ Streamed redaction differs\n")
+
+# Test 4: Safe text is not held back
+print("Test 4: Text without PII candidates is released immediately")
+print("-"*70)
+redactor = StreamingRedactor()
+first = redactor.feed("Annual leave is 14 days ")
+second = redactor.feed("for new staff; call 9123")
+third = redactor.feed("-4567 for help.")
+print(f"Released: {first!r} | {second!r} | {third!r} | held: {redactor.pending!r}")
+print("✅ Only the unfinished token waits\n" if first == "Annual leave is 14 days " and second == "for new staff; call " and '4567' not in third else "❌ Release wrong\n")
+
+# Test 5: Slack renderer only shows released text
+print("Test 5: Stream renderer never shows partial PII")
+print("-"*70)
+
+class FakeSlack:
+    def __init__(self):
+        self.updates = []
+
+    def update_message(self, channel, ts, text, final=True):
+        self.updates.append(text)
+
+    def discard_pending(self, channel, ts):
+        pass
+
+slack = FakeSlack()
+renderer = SlackStreamRenderer('C1', '1.0', client=slack, interval_ms=0, redactor=StreamingRedactor())
+for chunk in ["Please call John on 91", "23-45", "67 or email john", ".doe@pers", "onal.com today."]:
+    renderer.on_chunk(chunk)
+renderer.finish()
+shown = [leaked(text) for text in slack.updates]
+print(f"Updates: {slack.updates}")
+print("✅ No partial PII rendered\n" if slack.updates and not any(shown) else "❌ PII rendered\n")
+
+# Test 6: Partials are marked as drafts and only confidently routed answers stream
+print("Test 6: Unverified partials")
+print("-"*70)
+def streaming_invoke_agent(agent_id, query, session_id, alias_id='TSTALIASID', on_chunk=None, cancel_event=None):
+    for chunk in ["Restart the VPN ", "client and try again."]:
+        if on_chunk:
+            on_chunk(chunk)
+    return {'response': "Restart the VPN client and try again.", 'citations': [], 'confidence': 0.9}
+
+renderers = []
+
+def recording_renderer(channel, ts, redactor=None):
+    renderer = SlackStreamRenderer(channel, ts, client=slack, interval_ms=0, redactor=redactor)
+    renderers.append(renderer)
+    return renderer
+
+supervisor.invoke_agent = streaming_invoke_agent
+supervisor.SlackStreamRenderer = recording_renderer
+supervisor.FANOUT_ENABLED = False
+supervisor.ANSWER_PATH = 'agent'
+slack.updates = []
+supervisor.answer_query("vpn not working", 's1', 'it', 0.55, 'classifier', stream_to={'channel': 'C1', 'ts': '1.0'})
+low_confidence_updates = len(slack.updates)
+supervisor.answer_query("vpn not working", 's2', 'it', 0.9, 'classifier', stream_to={'channel': 'C1', 'ts': '2.0'})
+print(f"Updates at 0.55: {low_confidence_updates} | at 0.9: {slack.updates}")
+print("✅ Drafts marked, uncertain routes not streamed\n" if low_confidence_updates == 0 and len(renderers) == 1 and slack.updates
+      and all(text.endswith(STREAM_DRAFT_NOTE) for text in slack.updates) else "❌ Unverified partials shown\n")
@@ -0,0 +1,168 @@
+import sys
+sys.path.append('.')
+
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+import safe_failure_handler as handler
+from grounding import score_grounding as grounding_of
+import threshold_replay as replay
+
+print("="*70)
+print("🧪 Testing Vectorized Threshold Replay")
+print("="*70 + "\n")
+
+PASSAGES = [
+    "Employees are entitled to 14 days of annual leave in their first year of service.",
+    "Submit your leave request in Workday at least two weeks in advance.",
+    "Expense claims above SGD 500 require approval from your department head.",
+    "If the VPN client fails to connect, restart it and check your network settings."
+]
+ANSWERS = [
+    "Employees are entitled to 14 days of annual leave in their first year.",
+    "I think you probably need approval for claims above SGD 500.",
+    "Restart the VPN client and check your network settings.",
+    "Maybe 21 days. Possibly more, it might be 30.",
+    "Submit the request in Workday two weeks in advance, or email boss@x.com by 3 May.",
+    "Yes."
+]
+
+def random_record(rng):
+    citations = [
+        {'content': {'text': rng.choice(PASSAGES)}, 'score': round(rng.random(), 3)} if rng.random() < 0.8
+        else {'content': {'text': rng.choice(PASSAGES)}}
+        for _ in range(rng.choice([0, 0, 1, 2, 3, 5]))
+    ]
+    return {
+        'query': 'q',
+        'response': rng.choice(ANSWERS),
+        'citations': citations,
+        'query_confidence': round(rng.random(), 2),
+        'feedback': rng.choice(['helpful', 'not_helpful', None, None])
+    }
+
+rng = random.Random(24)
+records = [random_record(rng) for _ in range(1500)]
+with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as f:
+    for record in records:
+        f.write(json.dumps(record) + '\n')
+arrays = replay.load_records([f.name])
+
+# Test 1: Vectorized scores equal the scalar functions
+print("Test 1: kb confidence and hallucination scores match per-record calls")
+print("-"*70)
+kb = replay.kb_confidence(arrays)
+hallucination = replay.hallucination_scores(arrays)
+kb_expected = np.array([handler.calculate_kb_confidence(r['citations']) for r in records])
+hallucination_expected = np.array([handler.check_hallucination_indicators(r['response'], r['citations']) for r in records])
+print(f"Records: {len(records)}, kb mismatches: {np.count_nonzero(kb != kb_expected)}, "
+      f"hallucination mismatches: {np.count_nonzero(hallucination != hallucination_expected)}")
+print("✅ Bit-identical\n" if np.array_equal(kb, kb_expected) and np.array_equal(hallucination, hallucination_expected) else "❌ Scores differ\n")
+
+# Test 2: Grid counts equal validate_response at each setting
+print("Test 2: Every grid cell agrees with validate_response")
+print("-"*70)
+lows = np.array([0.3, 0.4, 0.55])
+cutoffs = np.array([0.5, 0.7, 0.9])
+weights = np.array([0.25, 0.5])
+rows = replay.replay(arrays, lows, cutoffs, weights)
+original = (handler.CONFIDENCE_THRESHOLD_LOW, handler.HALLUCINATION_THRESHOLD, handler.GROUNDING_WEIGHT)
+mismatches = []
+for row in rows:
+    handler.CONFIDENCE_THRESHOLD_LOW, handler.HALLUCINATION_THRESHOLD, handler.GROUNDING_WEIGHT = row['low'], row['cutoff'], row['grounding_weight']
+    results = [handler.validate_response(r['response'], r['citations'], r['query_confidence'], 'hr') for r in records]
+    answered = [r for r, result in zip(records, results) if result['safe_to_respond']]
+    rated = [r for r in answered if r['feedback']]
+    escalation_rate = 1 - len(answered) / len(records)
+    thumbs_down_rate = sum(r['feedback'] == 'not_helpful' for r in rated) / len(rated) if rated else None
+    if abs(row['escalation_rate'] - escalation_rate) > 1e-12 or (thumbs_down_rate is None) != (row['thumbs_down_rate'] is None) \
+            or (thumbs_down_rate is not None and abs(row['thumbs_down_rate'] - thumbs_down_rate) > 1e-12):
+        mismatches.append(row)
+handler.CONFIDENCE_THRESHOLD_LOW, handler.HALLUCINATION_THRESHOLD, handler.GROUNDING_WEIGHT = original
+print(f"Settings: {len(rows)}, mismatches: {len(mismatches)}")
+print("✅ Identical decisions\n" if not mismatches else f"❌ Differs at {mismatches[0]}\n")
+
+# Test 3: The current thresholds are always in the grid
+print("Test 3: Current setting is part of every grid")
+print("-"*70)
+current = [row for row in replay.replay(arrays, np.array([0.5]), np.array([0.9]), np.array([1.0])) if replay.is_current(row)]
+print(f"Current rows: {len(current)}")
+print("✅ Included\n" if len(current) == 1 else "❌ Current setting missing\n")
+
+# Test 4: Escalation budgets
+print("Test 4: Best setting within each escalation budget")
+print("-"*70)
+best = replay.best_within(rows, budgets=(0.1, 0.5, 1.0))
+ok = all(row['escalation_rate'] <= budget for budget, row in best.items())
+ok = ok and all(row['thumbs_down_rate'] >= best[budget]['thumbs_down_rate'] for budget in best for row in rows
+                if row['escalation_rate'] <= budget and row['thumbs_down_rate'] is not None)
+print(f"Budgets: {[(budget, round(row['escalation_rate'], 3), round(row['thumbs_down_rate'], 3)) for budget, row in best.items()]}")
+print("✅ Within budget and lowest\n" if ok and best else "❌ Wrong choice\n")
+
+# Test 5: A million records in seconds
+print("Test 5: One million records")
+print("-"*70)
+big = replay.synthetic_records(1000000)
+start = time.perf_counter()
+rows = replay.replay(big)
+elapsed = time.perf_counter() - start
+print(f"Settings: {len(rows)}, replay: {elapsed:.2f}s")
+print("✅ Fast\n" if elapsed < 5 else "❌ Too slow\n")
+
+# Test 6: Raw logs load fast when grounding was logged, and in parallel when it was not
+print("Test 6: Logged grounding is reused, the rest scored in worker processes")
+print("-"*70)
+with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as logged:
+    for record in records:
+        grounding = grounding_of(record['response'], record['citations'])
+        logged.write(json.dumps(dict(record, grounding=grounding) if grounding else record) + '\n')
+scored = []
+score_grounding = replay.score_grounding
+replay.score_grounding = lambda response, citations: scored.append(response) or score_grounding(response, citations)
+from_logged = replay.load_records([logged.name], workers=1)
+replay.score_grounding = score_grounding
+replay.PARALLEL_MIN_RECORDS = 0
+parallel = replay.load_records([f.name], workers=2)
+os.unlink(f.name)
+os.unlink(logged.name)
+same = all(np.array_equal(arrays[field], other[field], equal_nan=field == 'top_scores')
+           for other in (from_logged, parallel) for field in replay.FIELDS)
+unlogged = sum(1 for r in records if not grounding_of(r['response'], r['citations']))
+print(f"Scored while loading logged file: {len(scored)} (records without grounding: {unlogged}), identical arrays: {same}")
+print("✅ Logged scores reused, parallel load identical\n" if same and len(scored) == unlogged else "❌ Loading differs\n")
+
+# Test 7: The supervisor's answer log lines are replay input
+print("Test 7: Supervisor answer log line loads with its feedback")
+print("-"*70)
+import contextlib
+import io
+
+import lambda_supervisor_agent as supervisor
+
+record = records[0]
+validation = handler.validate_response(record['response'], record['citations'], record['query_confidence'], 'hr')
+out = io.StringIO()
+with contextlib.redirect_stdout(out):
+    supervisor.log_answer(record['query'], 'hr', record['query_confidence'],
+                          {'response': record['response'], 'citations': record['citations']},
+                          validation, {'session_id': 'C1_1700000000.1', 'message_ts': '1700000000.2'})
+line = json.loads(out.getvalue())
+# Feedback row for the same message (hcg-demo-feedback sessionId / messageTs)
+feedback = {'sessionId': 'C1_1700000000.1', 'messageTs': '1700000000.2', 'feedback': 'not_helpful'}
+joined = dict(line, feedback=feedback['feedback']) if (line['session_id'], line['message_ts']) == (feedback['sessionId'], feedback['messageTs']) else line
+with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as exported:
+    exported.write(f"2026-10-17T02:00:00.000Z\tabc-123\tINFO\t{json.dumps(joined)}\n")
+scored = []
+replay.score_grounding = lambda response, citations: scored.append(response) or score_grounding(response, citations)
+one = replay.load_records([exported.name], workers=1)
+replay.score_grounding = score_grounding
+os.unlink(exported.name)
+print(f"Logged keys: {sorted(line)} | thumbs_down: {one['thumbs_down'].tolist()} | re-scored: {len(scored)}")
+ok = (line['type'] == 'answer' and 'grounding' in line and one['thumbs_down'].tolist() == [True]
+      and one['query_confidence'].tolist() == [record['query_confidence']] and not scored)
+print("✅ Joined on session and message, grounding reused\n" if ok else "❌ Answer log not replayable\n")
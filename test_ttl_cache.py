@@ -0,0 +1,65 @@
+import sys
+sys.path.append('.')
+
+from ttl_cache import TTLCache
+
+print("="*70)
+print("🧪 Testing TTL Cache")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Test 1: Expiry
+print("Test 1: Entries expire after their TTL")
+print("-"*70)
+clock = FakeClock()
+cache = TTLCache(max_size=4, ttl=10, clock=clock)
+cache.set('a', 1)
+clock.now = 9.9
+fresh = cache.get('a')
+clock.now = 10.0
+expired = cache.get('a')
+print(f"At 9.9s: {fresh} | at 10s: {expired} | entries: {len(cache)} | stats: {cache.stats}")
+print("✅ Served until the TTL, dropped at it\n" if fresh == 1 and expired is None and len(cache) == 0
+      and cache.stats['expirations'] == 1 else "❌ Expiry wrong\n")
+
+# Test 2: Per-entry TTL and membership
+print("Test 2: Per-entry TTL override")
+print("-"*70)
+cache = TTLCache(ttl=10, clock=clock)
+cache.set('short', 'x', ttl=1)
+cache.set('long', 'y')
+clock.now += 2
+print(f"short in cache: {'short' in cache} | long in cache: {'long' in cache} | default on miss: {cache.get('short', 'none')}")
+print("✅ Override honoured\n" if 'short' not in cache and 'long' in cache and cache.get('short', 'none') == 'none' else "❌ TTL override wrong\n")
+
+# Test 3: LRU eviction
+print("Test 3: Least recently used entry evicted")
+print("-"*70)
+cache = TTLCache(max_size=2, ttl=60, clock=clock)
+cache.set('a', 1)
+cache.set('b', 2)
+cache.get('a')
+cache.set('c', 3)
+print(f"Kept: {list(cache.entries)} | evictions: {cache.stats['evictions']}")
+print("✅ Read refreshed 'a', 'b' evicted\n" if list(cache.entries) == ['a', 'c'] and cache.stats['evictions'] == 1 else "❌ Wrong eviction\n")
+
+# Test 4: Overwrite refreshes expiry; delete and hit rate
+print("Test 4: Overwrite, delete and hit rate")
+print("-"*70)
+cache = TTLCache(ttl=10, clock=clock)
+start = clock.now
+cache.set('a', 1)
+clock.now = start + 8
+cache.set('a', 2)
+clock.now = start + 15
+value = cache.get('a')
+deleted, missing = cache.delete('a'), cache.delete('a')
+cache.get('a')
+print(f"After overwrite: {value} | delete: {deleted}, again: {missing} | hit rate: {cache.hit_rate():.2f}")
+print("✅ Overwrite restarts the TTL\n" if value == 2 and deleted and not missing and cache.hit_rate() == 0.5 else "❌ Overwrite/delete wrong\n")
@@ -0,0 +1,155 @@
+import sys
+sys.path.append('.')
+
+import copy
+import json
+
+import lambda_webhook_handler_complete as webhook
+from conversation_store import ConversationStore
+from event_dedup import EventDeduplicator
+from work_queue import LocalWorkQueue, is_queue_event, jobs_from_queue_event
+
+print("="*70)
+print("🧪 Testing Ack-Then-Process Work Queue")
+print("="*70 + "\n")
+
+class ConditionalCheckFailed(Exception):
+    response = {'Error': {'Code': 'ConditionalCheckFailedException'}}
+
+class FakeSessionsTable:
+    """In-memory hcg-demo-sessions supporting the store's version-conditioned put"""
+
+    def __init__(self):
+        self.items = {}
+
+    def get_item(self, Key, ConsistentRead=False):
+        item = self.items.get(Key['sessionId'])
+        return {'Item': copy.deepcopy(item)} if item else {}
+
+    def put_item(self, Item, ConditionExpression, ExpressionAttributeNames, ExpressionAttributeValues=None):
+        current = self.items.get(Item['sessionId'])
+        version = current.get('version') if current else None
+        if ConditionExpression == 'attribute_not_exists(#version)':
+            allowed = version is None
+        else:
+            allowed = version is not None and version == ExpressionAttributeValues[':version']
+        if not allowed:
+            raise ConditionalCheckFailed()
+        self.items[Item['sessionId']] = copy.deepcopy(Item)
+
+class FakeSlack:
+    """Records posts and updates; failures can be queued per method"""
+
+    def __init__(self):
+        self.posts = []
+        self.updates = []
+        self.fail = {'post': 0, 'final_update': 0}
+
+    def post(self, channel, text, thread_ts=None, blocks=None):
+        if self.fail['post']:
+            self.fail['post'] -= 1
+            raise TimeoutError('connect timeout')
+        self.posts.append(text)
+        return {'ok': True, 'ts': f'1700000100.{len(self.posts)}'}
+
+    def update(self, channel, ts, text, blocks=None, final=True):
+        if final and self.fail['final_update']:
+            self.fail['final_update'] -= 1
+            # Read timeout: Slack applied the update but the response was lost
+            self.updates.append((ts, text))
+            raise TimeoutError('read timeout')
+        self.updates.append((ts, text))
+        return {'ok': True, 'ts': ts}
+
+    def flush(self):
+        return []
+
+ANSWER = {'domain': 'hr', 'agent_id': 'IEVMSZT1GY', 'routed_by': 'classifier', 'route_confidence': 0.9,
+          'bedrock_session_id': 'C1_1700000000.1', 'safe_to_respond': True, 'confidence_level': 'high',
+          'response': 'You get 14 days of annual leave.', 'citations': []}
+
+def setup():
+    slack = FakeSlack()
+    webhook.post_slack_message = slack.post
+    webhook.update_slack_message = slack.update
+    webhook.get_slack_client = lambda: slack
+    webhook.invoke_supervisor = lambda query, session_id, stream_to=None, route=None, message_ts=None: dict(ANSWER, query=query)
+    webhook.record_question = lambda domain, query: None
+    webhook.event_dedup = EventDeduplicator()
+    webhook.conversation_store = ConversationStore(FakeSessionsTable())
+    webhook.PROCESSING_MODE = 'async'
+    webhook.STREAM_RESPONSES = True
+    webhook.work_queue = LocalWorkQueue()
+    return slack
+
+def slack_event(event_id, ts):
+    return {'body': json.dumps({
+        'type': 'event_callback',
+        'event_id': event_id,
+        'event': {'type': 'message', 'channel': 'C1', 'user': 'U1', 'text': 'How many days of annual leave do I get?', 'ts': ts}
+    })}
+
+def sqs_event(job, receive_count=1):
+    """What the SQS event source mapping delivers for a queued job"""
+    return {'Records': [{
+        'eventSource': 'aws:sqs',
+        'body': json.dumps(job),
+        'attributes': {'ApproximateReceiveCount': str(receive_count)}
+    }]}
+
+def answers(slack):
+    return [text for _, text in slack.updates if text == ANSWER['response']]
+
+# Test 1: Jobs survive the queue unchanged
+print("Test 1: Job serialization")
+print("-"*70)
+job = webhook.build_message_job({'channel': 'C1', 'user': 'U1', 'text': 'VPN not working', 'ts': '1700000000.1'})
+queue = LocalWorkQueue()
+queue.send(job)
+delivered = jobs_from_queue_event(sqs_event(queue.jobs[0], receive_count=2))[0]
+print(f"Queue event: {is_queue_event(sqs_event(job))} | attempt: {delivered.pop('delivery_attempt')} | fields kept: {delivered == job}")
+print("✅ Round-trips through JSON and SQS\n" if delivered == job else "❌ Job changed in the queue\n")
+
+# Test 2: The webhook acks, the worker posts exactly once
+print("Test 2: Enqueue -> process -> one post")
+print("-"*70)
+slack = setup()
+ack = webhook.lambda_handler(slack_event('Ev1', '1700000000.1'), None)
+queued, posted_before = len(webhook.work_queue.jobs), len(slack.posts)
+webhook.lambda_handler(sqs_event(webhook.work_queue.jobs.pop(0)), None)
+print(f"Ack: {ack['statusCode']} | queued: {queued} | posts at ack: {posted_before} | posts: {slack.posts} | answers: {len(answers(slack))}")
+print("✅ Acked before processing, answered once\n" if ack['statusCode'] == 200 and queued == 1 and posted_before == 0
+      and len(slack.posts) == 1 and len(answers(slack)) == 1 else "❌ Ack-then-process wrong\n")
+
+# Test 3: Failing after the answer was posted does not post again
+print("Test 3: Failure after posting, then redelivery")
+print("-"*70)
+slack = setup()
+webhook.lambda_handler(slack_event('Ev2', '1700000000.2'), None)
+job = webhook.work_queue.jobs.pop(0)
+slack.fail['final_update'] = 1
+try:
+    webhook.lambda_handler(sqs_event(job), None)
+    raised = False
+except Exception:
+    raised = True
+webhook.lambda_handler(sqs_event(job, receive_count=2), None)
+recorded = webhook.conversation_store.has_answered(job['session_id'], job['event_key'])
+print(f"Worker raised: {raised} | answered recorded: {recorded} | posts: {len(slack.posts)} | answers: {len(answers(slack))}")
+print("✅ Job completed, redelivery skipped\n" if not raised and recorded and len(slack.posts) == 1 and len(answers(slack)) == 1 else "❌ Answer posted twice\n")
+
+# Test 4: Failing before anything was posted is retried normally
+print("Test 4: Failure before posting is retried")
+print("-"*70)
+slack = setup()
+webhook.lambda_handler(slack_event('Ev3', '1700000000.3'), None)
+job = webhook.work_queue.jobs.pop(0)
+slack.fail['post'] = 1
+try:
+    webhook.lambda_handler(sqs_event(job), None)
+    raised = False
+except Exception:
+    raised = True
+webhook.lambda_handler(sqs_event(job, receive_count=2), None)
+print(f"First attempt raised: {raised} | posts: {len(slack.posts)} | answers: {len(answers(slack))}")
+print("✅ Retried and answered once\n" if raised and len(slack.posts) == 1 and len(answers(slack)) == 1 else "❌ Retry wrong\n")
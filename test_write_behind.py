@@ -0,0 +1,62 @@
+import sys
+sys.path.append('.')
+
+from write_behind import WriteBehindBuffer, LocalTable
+
+print("="*70)
+print("🧪 Testing Write-Behind Buffer")
+print("="*70 + "\n")
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Test 1: Size-triggered flush
+print("Test 1: Size-triggered flush")
+print("-"*70)
+table = LocalTable(['sessionId'])
+buffer = WriteBehindBuffer(table, key_names=['sessionId'], max_items=5, max_age=60, clock=FakeClock())
+for i in range(12):
+    buffer.put({'sessionId': f's{i}', 'query': 'hi'})
+print(f"Written: {len(table.items)}, batches: {table.batch_calls}, buffered: {len(buffer.items)}")
+print("✅ Flushed in batches of 5\n" if len(table.items) == 10 and table.batch_calls == 2 else "❌ Size trigger broken\n")
+
+# Test 2: Time-triggered flush
+print("Test 2: Time-triggered flush")
+print("-"*70)
+clock = FakeClock()
+table = LocalTable(['sessionId'])
+buffer = WriteBehindBuffer(table, max_items=100, max_age=5, clock=clock)
+buffer.put({'sessionId': 'a'})
+clock.now = 6
+buffer.put({'sessionId': 'b'})
+print(f"Written: {len(table.items)}")
+print("✅ Old items flushed\n" if len(table.items) == 2 else "❌ Time trigger broken\n")
+
+# Test 3: Failed flush keeps items, cap drops oldest
+print("Test 3: Failure handling and drop counter")
+print("-"*70)
+
+class BrokenTable(LocalTable):
+    def batch_writer(self, overwrite_by_pkeys=None):
+        raise RuntimeError('throttled')
+
+buffer = WriteBehindBuffer(BrokenTable(['sessionId']), max_items=100, max_buffer=3, clock=FakeClock())
+for i in range(5):
+    buffer.put({'sessionId': f's{i}'})
+buffer.flush()
+print(f"Stats: {buffer.stats}, still buffered: {len(buffer.items)}")
+print("✅ Items retained, overflow counted\n" if len(buffer.items) == 3 and buffer.stats['dropped'] == 2 else "❌ Failure handling broken\n")
+
+# Test 4: Explicit flush (end of job / shutdown)
+print("Test 4: Explicit flush")
+print("-"*70)
+table = LocalTable(['feedbackId', 'timestamp'])
+buffer = WriteBehindBuffer(table, max_items=100, max_age=60, clock=FakeClock())
+buffer.put({'feedbackId': 'u1_1', 'timestamp': 1, 'feedback': 'helpful'})
+buffer.flush()
+print(f"Stats: {buffer.stats}")
+print("✅ Flushed on demand\n" if buffer.stats['flushed'] == 1 else "❌ Flush broken\n")
@@ -0,0 +1,308 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from grounding import score_grounding
+from safe_failure_handler import (
+    CONFIDENCE_THRESHOLD_HIGH, CONFIDENCE_THRESHOLD_MEDIUM, CONFIDENCE_THRESHOLD_LOW, HALLUCINATION_THRESHOLD,
+    GROUNDING_WEIGHT, UNSUPPORTED_FACT_PENALTY, MAX_PENALIZED_FACTS, TOP_SCORES, AGREEING_SOURCES, AGREEMENT_MARGIN,
+    AGREEMENT_BOOST, heuristic_hallucination_score, top_scores
+)
+
+# Replay logged answers against grids of safe_failure_handler thresholds and report
+# how many answers each setting escalates against how many thumbs-downs get through.
+#
+# Usage:
+#   python threshold_replay.py logged_answers.jsonl [...] [--save replay_arrays.npz]
+#   python threshold_replay.py replay_arrays.npz
+#   python threshold_replay.py --synthetic 1000000
+#
+# Logged files hold one object per line: the agent's answer before validation and the
+# feedback it got, {"query", "response", "citations", "query_confidence", "feedback",
+# "grounding" (optional)}. feedback is "helpful", "not_helpful" or missing. The
+# supervisor prints these as {"type":"answer", ...} log lines (log_answer) keyed by
+# session_id and message_ts; add "feedback" from the hcg-demo-feedback row with the
+# same sessionId and messageTs. Lambda log prefixes before the object are skipped.
+#
+# Text is only looked at while loading. Answers logged by the supervisor carry their
+# grounding score and load in microseconds each; older logs without it are scored on
+# every core (~0.2 ms per answer per core), so save them once with --save and replay
+# the .npz afterwards.
+#
+# Everything threshold-dependent works on per-record arrays, and a whole (low threshold
+# x hallucination cutoff) grid comes from one 2-D histogram with cumulative sums, so the
+# cost is O(records + grid).
+RESULTS_PATH = 'threshold_replay_results.json'
+
+LOW_GRID = np.round(np.arange(0.20, 0.71, 0.05), 2)
+CUTOFF_GRID = np.round(np.arange(0.40, 0.96, 0.05), 2)
+HIGH_GRID = np.round(np.arange(0.60, 0.96, 0.05), 2)
+MEDIUM_GRID = np.round(np.arange(0.40, 0.86, 0.05), 2)
+GROUNDING_WEIGHT_GRID = np.array([0.0, 0.25, 0.5, 0.75, 1.0])
+ESCALATION_BUDGETS = (0.01, 0.02, 0.05, 0.10, 0.15, 0.20, 0.30)
+
+# Unlogged grounding is scored in worker processes once there is enough of it
+PARALLEL_MIN_RECORDS = 20000
+SCORING_CHUNK = 2000
+
+FIELDS = ('top_scores', 'citations', 'query_confidence', 'heuristic', 'grounding', 'unsupported_facts', 'thumbs_down', 'rated')
+
+def grid(values, current):
+    """Sorted grid that always contains the current setting"""
+    return np.unique(np.append(values, current))
+
+def grounding_columns(grounding):
+    """(score, unsupported fact count) for a grounding result"""
+    # No grounding adds nothing to the hallucination score, as a perfect one would
+    return (grounding['score'], len(grounding['unsupported_facts'])) if grounding else (1.0, 0)
+
+def score_unlogged(item):
+    return grounding_columns(score_grounding(*item))
+
+def load_records(paths, workers=None):
+    """Per-record arrays from logged answer files
+
+    Grounding is read from the record when the supervisor logged it. The rest are
+    scored after reading, spread over worker processes when there are many.
+    """
+    columns = {field: [] for field in FIELDS}
+    unlogged = []
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                start = line.find('{')
+                if start < 0:
+                    continue
+                record = json.loads(line[start:])
+                response = record.get('response', '')
+                citations = record.get('citations') or []
+                # Best scores first, padded with NaN, as calculate_kb_confidence picks them
+                scores = top_scores(citations) if citations else []
+                columns['top_scores'].append(scores + [np.nan] * (TOP_SCORES - len(scores)))
+                columns['citations'].append(len(citations))
+                columns['query_confidence'].append(record.get('query_confidence', record.get('route_confidence', 0.0)))
+                columns['heuristic'].append(heuristic_hallucination_score(response, citations))
+                if 'grounding' in record:
+                    score, facts = grounding_columns(record['grounding'])
+                else:
+                    score, facts = np.nan, np.nan
+                    unlogged.append((len(columns['grounding']), response, citations))
+                columns['grounding'].append(score)
+                columns['unsupported_facts'].append(facts)
+                columns['thumbs_down'].append(record.get('feedback') == 'not_helpful')
+                columns['rated'].append(record.get('feedback') in ('helpful', 'not_helpful'))
+
+    items = [(response, citations) for _, response, citations in unlogged]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(items) >= PARALLEL_MIN_RECORDS:
+        with multiprocessing.Pool(workers) as pool:
+            scored = pool.map(score_unlogged, items, chunksize=SCORING_CHUNK)
+    else:
+        scored = map(score_unlogged, items)
+    for (index, _, _), (score, facts) in zip(unlogged, scored):
+        columns['grounding'][index] = score
+        columns['unsupported_facts'][index] = facts
+
+    return {field: np.array(values, dtype=bool if field in ('thumbs_down', 'rated') else float)
+            for field, values in columns.items()}
+
+def synthetic_records(n, seed=7):
+    """Plausible random arrays for checking scale; thumbs-downs follow low confidence
+    and poor grounding"""
+    rng = np.random.default_rng(seed)
+    citations = rng.choice([0, 1, 2, 3, 4, 5], size=n, p=[0.05, 0.1, 0.15, 0.25, 0.25, 0.2]).astype(float)
+    scores = -np.sort(-rng.beta(5, 2, size=(n, TOP_SCORES)), axis=1)
+    scores[np.arange(TOP_SCORES) >= citations[:, None]] = np.nan
+    grounding = np.where(citations > 0, rng.beta(6, 1.5, size=n), 1.0)
+    facts = np.where(citations > 0, rng.poisson((1 - grounding) * 3), 0).astype(float)
+    heuristic = np.where(citations == 0, 0.5, 0.0) + 0.1 * rng.poisson(0.15, size=n)
+    query_confidence = rng.beta(4, 1.5, size=n)
+    best = np.nan_to_num(scores[:, 0])
+    risk = 0.05 + 0.5 * (1 - grounding) + 0.3 * (1 - best) * (citations > 0) + 0.4 * (citations == 0)
+    rated = rng.random(n) < 0.3
+    return {
+        'top_scores': scores,
+        'citations': citations,
+        'query_confidence': query_confidence,
+        'heuristic': heuristic,
+        'grounding': grounding,
+        'unsupported_facts': facts,
+        'thumbs_down': rated & (rng.random(n) < np.minimum(risk, 1.0)),
+        'rated': rated
+    }
+
+def kb_confidence(arrays):
+    """calculate_kb_confidence for every record"""
+    scores = arrays['top_scores']
+    known = np.count_nonzero(~np.isnan(scores), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        average = np.nansum(scores, axis=1) / known
+    # Boost if several sources are about as relevant as the best one (NaN never agrees)
+    agree = scores[:, AGREEING_SOURCES - 1] >= scores[:, 0] - AGREEMENT_MARGIN
+    average = np.where(agree, np.minimum(average + AGREEMENT_BOOST, 1.0), average)
+    return np.where(known > 0, average, 0.0)
+
+def combined_confidence(arrays):
+    """The confidence should_respond compares with its thresholds"""
+    return (kb_confidence(arrays) + arrays['query_confidence']) / 2
+
+def hallucination_scores(arrays, grounding_weight=GROUNDING_WEIGHT, fact_penalty=UNSUPPORTED_FACT_PENALTY):
+    """check_hallucination_indicators for every record"""
+    score = arrays['heuristic'] + grounding_weight * (1 - arrays['grounding'])
+    score = score + fact_penalty * np.minimum(arrays['unsupported_facts'], MAX_PENALIZED_FACTS)
+    return np.minimum(score, 1.0)
+
+def answered(combined, hallucination, low, cutoff):
+    """Records validate_response would answer at one setting"""
+    return (combined >= low) & (hallucination <= cutoff)
+
+def escalation_grid(combined, hallucination, thumbs_down, rated, lows, cutoffs):
+    """(answered, answered thumbs-downs, answered and rated) counts for every
+    (lows[j], cutoffs[c]) pair
+
+    Each record clears lows[:i] and stays within cutoffs[k:], so the records answered
+    at (j, c) are the histogram cells with i > j and k <= c: a suffix sum over i and
+    a prefix sum over k.
+    """
+    i = np.searchsorted(lows, combined, side='right')
+    k = np.searchsorted(cutoffs, hallucination, side='left')
+    shape = (len(lows) + 1, len(cutoffs) + 1)
+    cells = i * shape[1] + k
+
+    def counts(weights):
+        table = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1]).reshape(shape)
+        return table[::-1].cumsum(axis=0)[::-1][1:].cumsum(axis=1)[:, :-1]
+
+    return counts(None), counts(thumbs_down.astype(float)), counts(rated.astype(float))
+
+def level_table(combined, thumbs_down, rated, answer_mask, highs, mediums):
+    """Disclaimer rate and undisclaimed thumbs-down rate for every (high, medium) pair,
+    over the answered records"""
+    combined, thumbs_down, rated = combined[answer_mask], thumbs_down[answer_mask], rated[answer_mask]
+    rows = []
+    for high in highs:
+        confident = combined >= high
+        confident_rated = np.count_nonzero(confident & rated)
+        confident_down = np.count_nonzero(confident & thumbs_down)
+        for medium in mediums[mediums < high]:
+            rows.append({
+                'high': float(high),
+                'medium': float(medium),
+                'no_disclaimer_rate': float(np.count_nonzero(confident)) / max(len(combined), 1),
+                'low_disclaimer_rate': float(np.count_nonzero(combined < medium)) / max(len(combined), 1),
+                'no_disclaimer_thumbs_down_rate': confident_down / confident_rated if confident_rated else None
+            })
+    return rows
+
+def replay(arrays, lows=LOW_GRID, cutoffs=CUTOFF_GRID, weights=GROUNDING_WEIGHT_GRID):
+    """One row per (grounding weight, low threshold, hallucination cutoff)"""
+    lows = grid(lows, CONFIDENCE_THRESHOLD_LOW)
+    cutoffs = grid(cutoffs, HALLUCINATION_THRESHOLD)
+    weights = grid(weights, GROUNDING_WEIGHT)
+    combined = combined_confidence(arrays)
+    total = len(combined)
+    total_down = int(np.count_nonzero(arrays['thumbs_down']))
+
+    rows = []
+    for weight in weights:
+        hallucination = hallucination_scores(arrays, weight)
+        n_answered, n_down, n_rated = escalation_grid(combined, hallucination, arrays['thumbs_down'], arrays['rated'], lows, cutoffs)
+        for j, low in enumerate(lows):
+            for c, cutoff in enumerate(cutoffs):
+                rows.append({
+                    'grounding_weight': float(weight),
+                    'low': float(low),
+                    'cutoff': float(cutoff),
+                    'escalation_rate': float(1 - n_answered[j, c] / total) if total else 0.0,
+                    'thumbs_down_rate': float(n_down[j, c] / n_rated[j, c]) if n_rated[j, c] else None,
+                    'thumbs_down_caught': float(1 - n_down[j, c] / total_down) if total_down else None
+                })
+    return rows
+
+def best_within(rows, budgets=ESCALATION_BUDGETS):
+    """Lowest thumbs-down rate setting for each escalation-rate budget"""
+    rated = [row for row in rows if row['thumbs_down_rate'] is not None]
+    best = {}
+    for budget in budgets:
+        within = [row for row in rated if row['escalation_rate'] <= budget]
+        if within:
+            best[budget] = min(within, key=lambda r: (r['thumbs_down_rate'], r['escalation_rate']))
+    return best
+
+def is_current(row):
+    return (row['low'] == CONFIDENCE_THRESHOLD_LOW and row['cutoff'] == HALLUCINATION_THRESHOLD
+            and row['grounding_weight'] == GROUNDING_WEIGHT)
+
+def format_row(row):
+    down = f"{row['thumbs_down_rate']*100:5.1f}%" if row['thumbs_down_rate'] is not None else '    -'
+    caught = f"{row['thumbs_down_caught']*100:5.1f}%" if row['thumbs_down_caught'] is not None else '    -'
+    return (f"low {row['low']:.2f}  cutoff {row['cutoff']:.2f}  grounding {row['grounding_weight']:.2f}  "
+            f"escalated {row['escalation_rate']*100:5.1f}%  thumbs-down {down}  thumbs-downs caught {caught}")
+
+if __name__ == '__main__':
+    print("="*70)
+    print("🎯 Confidence Threshold Replay")
+    print("="*70 + "\n")
+
+    args = sys.argv[1:]
+    save_path = None
+    if '--save' in args:
+        i = args.index('--save')
+        save_path = args[i + 1]
+        del args[i:i + 2]
+
+    start = time.perf_counter()
+    if args[:1] == ['--synthetic']:
+        arrays = synthetic_records(int(args[1]) if len(args) > 1 else 1000000)
+        source = 'synthetic'
+    elif args and all(path.endswith('.npz') for path in args):
+        with np.load(args[0]) as data:
+            arrays = {field: data[field] for field in FIELDS}
+        source = args[0]
+    elif args:
+        arrays = load_records(args)
+        source = ', '.join(args)
+    else:
+        print("Usage: python threshold_replay.py logged_answers.jsonl [...] | arrays.npz | --synthetic N")
+        sys.exit(1)
+    load_s = time.perf_counter() - start
+    records = len(arrays['citations'])
+    print(f"1. Loaded {records:,} records from {source} ({load_s:.2f}s)")
+    print(f"   Rated: {np.count_nonzero(arrays['rated']):,}, thumbs-down: {np.count_nonzero(arrays['thumbs_down']):,}")
+
+    if save_path:
+        np.savez_compressed(save_path, **arrays)
+        print(f"   Saved arrays: {save_path}")
+
+    # 2. Escalation against thumbs-downs over the whole grid
+    start = time.perf_counter()
+    rows = replay(arrays)
+    replay_s = time.perf_counter() - start
+    print(f"\n2. Replayed {len(rows):,} settings in {replay_s:.2f}s")
+    current = next(row for row in rows if is_current(row))
+    print(f"   Current:  {format_row(current)}")
+    best = best_within(rows)
+    print("\n   Lowest thumbs-down rate within an escalation budget:")
+    for budget, row in best.items():
+        print(f"   ≤{budget*100:3.0f}%  {format_row(row)}{'  (current)' if is_current(row) else ''}")
+
+    # 3. Disclaimers for the answers the current setting gives
+    combined = combined_confidence(arrays)
+    answer_mask = answered(combined, hallucination_scores(arrays), CONFIDENCE_THRESHOLD_LOW, HALLUCINATION_THRESHOLD)
+    levels = level_table(combined, arrays['thumbs_down'], arrays['rated'], answer_mask,
+                         grid(HIGH_GRID, CONFIDENCE_THRESHOLD_HIGH), grid(MEDIUM_GRID, CONFIDENCE_THRESHOLD_MEDIUM))
+    print(f"\n3. Disclaimers (low {CONFIDENCE_THRESHOLD_LOW}, cutoff {HALLUCINATION_THRESHOLD}):")
+    for row in levels:
+        if row['medium'] == CONFIDENCE_THRESHOLD_MEDIUM or row['high'] == CONFIDENCE_THRESHOLD_HIGH:
+            down = row['no_disclaimer_thumbs_down_rate']
+            print(f"   high {row['high']:.2f}  medium {row['medium']:.2f}  no disclaimer {row['no_disclaimer_rate']*100:5.1f}%  "
+                  f"low-confidence disclaimer {row['low_disclaimer_rate']*100:5.1f}%  "
+                  f"thumbs-down without disclaimer {f'{down*100:5.1f}%' if down is not None else '-'}")
+
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump({'records': records, 'current': current, 'best_within': {str(budget): row for budget, row in best.items()}, 'settings': rows, 'levels': levels}, f, indent=2)
+    print(f"\n✅ Results saved to {RESULTS_PATH}")
@@ -0,0 +1,151 @@
+import json
+import math
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Rebuild per-stage latency percentiles from the trace records emitted by tracing.py.
+#
+# Usage:
+#   python trace_report.py exported_logs.txt [...]       # CloudWatch exports / saved log lines
+#   python trace_report.py --log-group /aws/lambda/hcg-demo-slack-webhook [--hours 24]
+REGION = 'ap-southeast-1'
+PERCENTILES = (50, 90, 99)
+
+def parse_record(line):
+    """Trace record in a log line (Lambda prefixes are skipped), or None"""
+    start = line.find('{"type":"trace"')
+    if start < 0:
+        return None
+    try:
+        return json.loads(line[start:])
+    except ValueError:
+        return None
+
+def read_files(paths):
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                record = parse_record(line)
+                if record:
+                    yield record
+
+def read_log_group(log_group, hours):
+    import boto3
+
+    logs = boto3.client('logs', region_name=REGION)
+    kwargs = {
+        'logGroupName': log_group,
+        'filterPattern': '{ $.type = "trace" }',
+        'startTime': int((time.time() - hours * 3600) * 1000)
+    }
+    while True:
+        response = logs.filter_log_events(**kwargs)
+        for event in response['events']:
+            record = parse_record(event['message'])
+            if record:
+                yield record
+        if 'nextToken' not in response:
+            return
+        kwargs['nextToken'] = response['nextToken']
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile"""
+    index = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def collect(records):
+    """Per-stage duration samples, keyed '<service>:<stage>'"""
+    samples = defaultdict(list)
+    traces = defaultdict(set)
+    # How requests were answered (agent, kb_direct, redirect, hit, semantic, coalesced)
+    paths = defaultdict(Counter)
+    # Per-request routing events (fan-out winners, deadlines, cancelled stragglers, hedges)
+    events = defaultdict(Counter)
+
+    for record in records:
+        service = record.get('service', 'unknown')
+        traces[service].add(record['trace_id'])
+        if record.get('path'):
+            paths[service][record['path']] += 1
+        count_events(events[service], record)
+        samples[f'{service}:total'].append(record['total_ms'])
+        if 'queue_ms' in record:
+            samples[f'{service}:queue'].append(record['queue_ms'])
+
+        # A stage called several times in one request (e.g. chat.update) counts once, summed
+        per_request = defaultdict(float)
+        for name, _, duration_ms in record.get('spans', []):
+            per_request[name] += duration_ms
+        for name, duration_ms in per_request.items():
+            samples[f'{service}:{name}'].append(duration_ms)
+
+        # Marks are offsets from the start of the request (time to first byte, etc.)
+        for name, at_ms in record.get('marks', {}).items():
+            samples[f'{service}:@{name}'].append(at_ms)
+
+    return samples, traces, paths, events
+
+def count_events(counts, record):
+    """Add one trace record's fan-out and hedging outcome to the service's counts"""
+    fanout = record.get('fanout')
+    if fanout:
+        counts['fanout'] += 1
+        counts[f"fanout.won.{fanout['winner']}"] += 1
+        counts['fanout.winner_changed'] += fanout['winner_changed']
+        counts['fanout.deadline_expired'] += fanout['deadline_expired']
+        counts['fanout.cancelled'] += fanout['cancelled']
+
+    # 'fired' when the hedge was sent, 'won' when its answer was used
+    hedge = record.get('hedge')
+    if hedge:
+        counts['hedge.fired'] += 1
+        counts['hedge.won'] += hedge == 'won'
+
+def summarize(samples):
+    summary = {}
+    for stage, values in samples.items():
+        values = sorted(values)
+        summary[stage] = {'count': len(values)}
+        for p in PERCENTILES:
+            summary[stage][f'p{p}'] = round(percentile(values, p), 1)
+    return summary
+
+def main(argv):
+    if argv[:1] == ['--log-group']:
+        hours = float(argv[argv.index('--hours') + 1]) if '--hours' in argv else 24
+        records = read_log_group(argv[1], hours)
+    elif argv:
+        records = read_files(argv)
+    else:
+        records = (r for r in map(parse_record, sys.stdin) if r)
+
+    samples, traces, paths, events = collect(records)
+    if not samples:
+        print("No trace records found")
+        return 1
+
+    summary = summarize(samples)
+
+    print("="*70)
+    print("⏱️  Per-Stage Latency (ms)")
+    print("="*70)
+    for service, ids in sorted(traces.items()):
+        print(f"{service}: {len(ids)} traces")
+        if paths[service]:
+            print("  " + ', '.join(f"{path} {count}" for path, count in paths[service].most_common()))
+        if events[service]:
+            print("  " + ', '.join(f"{event} {count}" for event, count in sorted(events[service].items())))
+    print()
+    print(f"{'stage':40} {'count':>6} " + ' '.join(f"{'p' + str(p):>9}" for p in PERCENTILES))
+    for stage in sorted(summary):
+        row = summary[stage]
+        print(f"{stage:40} {row['count']:6} " + ' '.join(f"{row['p' + str(p)]:9.1f}" for p in PERCENTILES))
+
+    with open('trace_report.json', 'w') as f:
+        json.dump({'stages': summary, 'paths': paths, 'events': events}, f, indent=2)
+    print("\n✅ Results saved to trace_report.json")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,95 @@
+import contextvars
+import json
+import time
+import uuid
+from contextlib import contextmanager
+
+# Lightweight request tracing: a trace id minted in the webhook travels with the job and the
+# supervisor request. Each service emits one compact JSON line per request, which
+# trace_report.py turns back into per-stage latency percentiles.
+
+_current = contextvars.ContextVar('trace', default=None)
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+class Trace:
+    """Spans and point-in-time marks for one request, in ms since the trace started"""
+
+    def __init__(self, trace_id=None, service='webhook', clock=time.perf_counter):
+        self.trace_id = trace_id or new_trace_id()
+        self.service = service
+        self.clock = clock
+        self.started_at = clock()
+        self.spans = []
+        self.marks = {}
+        self.fields = {}
+
+    def _ms(self, at):
+        return round((at - self.started_at) * 1000, 1)
+
+    @contextmanager
+    def span(self, name):
+        start = self.clock()
+        try:
+            yield
+        finally:
+            end = self.clock()
+            self.spans.append([name, self._ms(start), round((end - start) * 1000, 1)])
+
+    def mark(self, name):
+        """Record when something happened (first mark of a name wins)"""
+        self.marks.setdefault(name, self._ms(self.clock()))
+
+    def record(self):
+        record = {
+            'type': 'trace',
+            'trace_id': self.trace_id,
+            'service': self.service,
+            'total_ms': self._ms(self.clock()),
+            'spans': self.spans
+        }
+        if self.marks:
+            record['marks'] = self.marks
+        record.update(self.fields)
+        return record
+
+def start_trace(trace_id=None, service='webhook'):
+    """Begin a trace for this request and make it current"""
+    trace = Trace(trace_id, service)
+    _current.set(trace)
+    return trace
+
+def current_trace():
+    return _current.get()
+
+def finish_trace(trace=None):
+    """Emit the current trace as one log line and clear it"""
+    trace = trace or _current.get()
+    if trace is None:
+        return None
+    _current.set(None)
+    record = trace.record()
+    print(json.dumps(record, separators=(',', ':')))
+    return record
+
+@contextmanager
+def span(name):
+    """Time a block in the current trace (no-op when nothing is being traced)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.span(name):
+        yield
+
+def mark(name):
+    trace = _current.get()
+    if trace is not None:
+        trace.mark(name)
+
+def annotate(**fields):
+    """Attach small fields (domain, path, cache) to the current trace record"""
+    trace = _current.get()
+    if trace is not None:
+        trace.fields.update(fields)
@@ -0,0 +1,94 @@
+import json
+import sys
+import time
+import random
+
+from statistical_router import StatisticalRouter, ROUTER_MODEL_PATH
+
+# Usage: python train_router.py [logged_queries.jsonl ...]
+# Logged files hold one {"query": ..., "domain": ...} object per line.
+FOLDS = 5
+SEED = 42
+
+def load_validation_queries(path='validation_dataset.json'):
+    with open(path, 'r') as f:
+        dataset = json.load(f)
+    return [(item['query'], item['expected_domain']) for items in dataset.values() for item in items]
+
+def load_logged_queries(path):
+    examples = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                examples.append((record['query'], record['domain']))
+    return examples
+
+def cross_validate(examples, classes):
+    """Out-of-fold accuracy, plus the held-out examples used for calibration"""
+    shuffled = examples[:]
+    random.Random(SEED).shuffle(shuffled)
+    folds = [shuffled[i::FOLDS] for i in range(FOLDS)]
+
+    correct = 0
+    out_of_fold = []
+    for i, held_out in enumerate(folds):
+        train = [ex for j, fold in enumerate(folds) if j != i for ex in fold]
+        model = StatisticalRouter.train([q for q, _ in train], [d for _, d in train], classes=classes)
+        for query, domain in held_out:
+            correct += model.classify(query)[0] == domain
+        out_of_fold.append((model, held_out))
+
+    return correct / len(examples), out_of_fold
+
+print("="*70)
+print("🧠 Training Statistical Query Router")
+print("="*70 + "\n")
+
+examples = load_validation_queries()
+print(f"Validation dataset: {len(examples)} queries")
+for path in sys.argv[1:]:
+    logged = load_logged_queries(path)
+    examples += logged
+    print(f"Logged queries ({path}): {len(logged)}")
+
+classes = sorted({domain for _, domain in examples})
+print(f"Classes: {classes}\n")
+
+# 1. Cross-validated accuracy
+accuracy, out_of_fold = cross_validate(examples, classes)
+print(f"1. {FOLDS}-fold accuracy: {accuracy*100:.1f}%")
+
+# 2. Calibrate temperature on out-of-fold scores, averaged over folds
+temperatures = []
+for model, held_out in out_of_fold:
+    t, _ = model.calibrate([q for q, _ in held_out], [d for _, d in held_out])
+    temperatures.append(t)
+temperature = sum(temperatures) / len(temperatures)
+print(f"2. Calibrated temperature: {temperature:.2f}")
+
+# 3. Final model on all data
+router = StatisticalRouter.train([q for q, _ in examples], [d for _, d in examples], classes=classes)
+router.temperature = temperature
+router.save(ROUTER_MODEL_PATH)
+print(f"3. Saved model: {ROUTER_MODEL_PATH}")
+
+# 4. Latency and batch inference check
+queries = [q for q, _ in examples]
+start = time.perf_counter()
+for query in queries * 10:
+    router.classify(query)
+per_query_ms = (time.perf_counter() - start) * 1000 / (len(queries) * 10)
+
+start = time.perf_counter()
+router.predict_proba_batch(queries * 100)
+batch_per_query_ms = (time.perf_counter() - start) * 1000 / (len(queries) * 100)
+
+print(f"4. Inference: {per_query_ms:.3f} ms/query, batch {batch_per_query_ms:.3f} ms/query")
+print("   ✅ Under 1 ms budget" if per_query_ms < 1.0 else "   ❌ Over 1 ms budget")
+
+print("\nExamples:")
+for query in ["How do I reset my password?", "expense for a new laptop", "Where can I park?"]:
+    ranked = ', '.join(f"{d}={p:.2f}" for d, p in router.rank(query))
+    print(f"  {query:35} {ranked}")
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Size-bounded in-container cache with per-entry expiry (LRU eviction)"""
+
+    def __init__(self, max_size=1024, ttl=300, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return default
+
+        value, expires_at = entry
+        if self.clock() >= expires_at:
+            del self.entries[key]
+            self.stats['expirations'] += 1
+            self.stats['misses'] += 1
+            return default
+
+        self.entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        self.entries[key] = (value, self.clock() + (self.ttl if ttl is None else ttl))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def delete(self, key):
+        return self.entries.pop(key, None) is not None
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        entry = self.entries.get(key)
+        return entry is not None and self.clock() < entry[1]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
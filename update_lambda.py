@@ -9,6 +9,8 @@ zip_buffer = io.BytesIO()
 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
     with open('lambda_deep_linking.py', 'r') as f:
         zip_file.writestr('lambda_function.py', f.read())
+    with open('aws_clients.py', 'r') as f:
+        zip_file.writestr('aws_clients.py', f.read())
 
 zip_buffer.seek(0)
 
@@ -72,6 +72,8 @@ for func in functions:
     with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
         with open(func['file'], 'r') as f:
             zip_file.writestr(func['file'], f.read())
+        with open('aws_clients.py', 'r') as f:
+            zip_file.writestr('aws_clients.py', f.read())
     
     zip_buffer.seek(0)
     
@@ -0,0 +1,71 @@
+import json
+import os
+
+from aws_clients import get_client
+
+# Work queue for the webhook's background processing stage.
+# LOCAL keeps jobs in-process (tests, local runs); SQS is the durable
+# production queue that feeds the webhook Lambda through an event source mapping.
+
+class LocalWorkQueue:
+    """In-process work queue for tests and local runs"""
+
+    def __init__(self, worker=None):
+        self.jobs = []
+        self.worker = worker
+
+    def send(self, job):
+        """Enqueue a job, running it immediately if a worker is attached"""
+        # Round-trip through JSON so local jobs match what SQS would deliver
+        job = json.loads(json.dumps(job))
+        if self.worker:
+            self.worker(job)
+        else:
+            self.jobs.append(job)
+
+    def drain(self, worker):
+        """Run all pending jobs through the worker"""
+        processed = 0
+        while self.jobs:
+            worker(self.jobs.pop(0))
+            processed += 1
+        return processed
+
+class SqsWorkQueue:
+    """Durable work queue backed by SQS"""
+
+    def __init__(self, queue_url, region_name='ap-southeast-1'):
+        self.queue_url = queue_url
+        self.sqs = get_client('sqs', region_name)
+
+    def send(self, job):
+        """Enqueue a job as an SQS message"""
+        self.sqs.send_message(
+            QueueUrl=self.queue_url,
+            MessageBody=json.dumps(job)
+        )
+
+def get_work_queue(worker=None):
+    """Build the configured work queue (SQS when WORK_QUEUE_URL is set)"""
+    queue_url = os.environ.get('WORK_QUEUE_URL')
+    if queue_url:
+        return SqsWorkQueue(queue_url)
+    return LocalWorkQueue(worker)
+
+def is_queue_event(event):
+    """Check if a Lambda event is an SQS delivery"""
+    records = event.get('Records') or []
+    return bool(records) and records[0].get('eventSource') == 'aws:sqs'
+
+def jobs_from_queue_event(event):
+    """Extract jobs from an SQS Lambda event
+
+    delivery_attempt is SQS's receive count: above 1, an earlier attempt failed or
+    timed out, possibly after it had already posted its answer.
+    """
+    jobs = []
+    for record in event.get('Records', []):
+        job = json.loads(record['body'])
+        job['delivery_attempt'] = int(record.get('attributes', {}).get('ApproximateReceiveCount', 1))
+        jobs.append(job)
+    return jobs
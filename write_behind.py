@@ -0,0 +1,130 @@
+import atexit
+import os
+import signal
+import time
+
+# Flush when this many items are buffered or the oldest is this old
+WRITE_BEHIND_MAX_ITEMS = int(os.environ.get('WRITE_BEHIND_MAX_ITEMS', '25'))
+WRITE_BEHIND_MAX_AGE_SECONDS = float(os.environ.get('WRITE_BEHIND_MAX_AGE_SECONDS', '5'))
+
+# Hard cap so a DynamoDB outage cannot exhaust container memory
+WRITE_BEHIND_MAX_BUFFER = 1000
+
+class WriteBehindBuffer:
+    """Buffers DynamoDB puts in the container and flushes them with batch_writer"""
+
+    def __init__(self, table, key_names=None, max_items=WRITE_BEHIND_MAX_ITEMS,
+                 max_age=WRITE_BEHIND_MAX_AGE_SECONDS, max_buffer=WRITE_BEHIND_MAX_BUFFER,
+                 clock=time.monotonic):
+        self.table = table
+        self.key_names = key_names
+        self.max_items = max_items
+        self.max_age = max_age
+        self.max_buffer = max_buffer
+        self.clock = clock
+        self.items = []
+        self.oldest_at = None
+        self.stats = {'buffered': 0, 'flushed': 0, 'dropped': 0, 'flush_errors': 0}
+
+    def put(self, item):
+        """Buffer an item; flush if the size or age limit is reached"""
+        if len(self.items) >= self.max_buffer:
+            self.items.pop(0)
+            self.stats['dropped'] += 1
+
+        if not self.items:
+            self.oldest_at = self.clock()
+
+        self.items.append(item)
+        self.stats['buffered'] += 1
+
+        if self.is_due():
+            self.flush()
+
+    def is_due(self):
+        if not self.items:
+            return False
+        return len(self.items) >= self.max_items or self.clock() - self.oldest_at >= self.max_age
+
+    def flush(self):
+        """Write all buffered items; failed items stay buffered for the next flush"""
+        if not self.items:
+            return 0
+
+        items = self.items
+        self.items = []
+        self.oldest_at = None
+
+        batch_args = {'overwrite_by_pkeys': self.key_names} if self.key_names else {}
+
+        try:
+            with self.table.batch_writer(**batch_args) as batch:
+                for item in items:
+                    batch.put_item(Item=item)
+        except Exception:
+            self.stats['flush_errors'] += 1
+            # Requeue ahead of anything buffered meanwhile, within the cap
+            requeued = (items + self.items)[-self.max_buffer:]
+            self.stats['dropped'] += len(items) + len(self.items) - len(requeued)
+            self.items = requeued
+            self.oldest_at = self.clock()
+            return 0
+
+        self.stats['flushed'] += len(items)
+        return len(items)
+
+def register_shutdown_flush(*buffers):
+    """Flush buffers on SIGTERM (Lambda shutdown) and interpreter exit"""
+    def flush_all():
+        for buffer in buffers:
+            buffer.flush()
+
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        flush_all()
+        if callable(previous):
+            previous(signum, frame)
+
+    try:
+        signal.signal(signal.SIGTERM, on_sigterm)
+    except ValueError:
+        # Not on the main thread; atexit still covers normal exit
+        pass
+
+    atexit.register(flush_all)
+
+class LocalTable:
+    """Minimal DynamoDB Table stand-in for tests"""
+
+    def __init__(self, key_names):
+        self.key_names = key_names
+        self.items = {}
+        self.batch_calls = 0
+
+    def _key(self, item):
+        return tuple(item[k] for k in self.key_names)
+
+    def put_item(self, Item, **kwargs):
+        self.items[self._key(Item)] = Item
+        return {}
+
+    def get_item(self, Key, **kwargs):
+        item = self.items.get(self._key(Key))
+        return {'Item': item} if item is not None else {}
+
+    def batch_writer(self, overwrite_by_pkeys=None):
+        table = self
+
+        class _Batch:
+            def __enter__(self):
+                table.batch_calls += 1
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def put_item(self, Item):
+                table.put_item(Item=Item)
+
+        return _Batch()